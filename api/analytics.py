@@ -0,0 +1,321 @@
+"""
+Racket Pro Analyzer - Analytics Engine
+Builds chart-ready series for the analytics modal with vectorized NumPy,
+cached per user data version
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.database import get_db_connection, get_data_version, dict_from_row
+from api.game_store import get_game_store, parse_score, parse_detailed_score, WIN
+
+# Chart cache: (user_id, sport, period, today, data_version) -> chart data (LRU)
+CHART_CACHE_SIZE = 512
+MOVING_AVERAGE_WINDOWS = (10, 30)
+# Recent form in the summary: record over the last N games
+RECENT_WINDOWS = (10, 20, 30)
+H2H_ROLES = ["opponent", "partner"]
+H2H_MAX_MEETINGS = 100
+
+_chart_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_chart_cache_lock = threading.Lock()
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def round_half_up(values) -> np.ndarray:
+    """Round like JavaScript's Math.round so numbers match the old client charts."""
+    return np.floor(np.asarray(values, dtype=float) + 0.5).astype(int)
+
+
+def moving_win_rate(wins: np.ndarray, window: int) -> np.ndarray:
+    """Win rate (%) over the last `window` games at each position, via a cumulative sum."""
+    cumulative = np.concatenate(([0], np.cumsum(wins)))
+    n = len(wins)
+    end = np.arange(1, n + 1)
+    start = np.maximum(0, end - window)
+    return round_half_up((cumulative[end] - cumulative[start]) / (end - start) * 100)
+
+
+def run_positions(codes: np.ndarray) -> np.ndarray:
+    """1-based position of each element inside its run of equal consecutive values."""
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=int)
+    index = np.arange(n)
+    run_start = np.where(np.concatenate(([True], codes[1:] != codes[:-1])), index, 0)
+    return index - np.maximum.accumulate(run_start) + 1
+
+
+# =============================================================================
+# DATA LOADING
+# =============================================================================
+
+def period_cutoff(period: str) -> Optional[str]:
+    """ISO date of the first day included in a period ("all" or a number of days)."""
+    if period == "all":
+        return None
+    return (date.today() - timedelta(days=int(period))).isoformat()
+
+
+# =============================================================================
+# CHART DATA
+# =============================================================================
+
+def build_chart_data(games: Dict[str, np.ndarray]) -> Dict:
+    """Compute every overview chart series from game store columns sorted by date."""
+    n = len(games["id"])
+    if n == 0:
+        return {"total_games": 0}
+
+    day_numbers = games["day"].astype(np.int64)
+    days = day_numbers.astype("datetime64[D]")
+    game_dates = np.datetime_as_string(days).tolist()
+    results = games["result"]
+    is_doubles = games["doubles"]
+    wins = (results == WIN).astype(np.int64)
+    losses = 1 - wins  # draws count as losses, as in the charts
+
+    sets_won, sets_lost = games["sets_won"].astype(np.int64), games["sets_lost"].astype(np.int64)
+
+    # Type chart: wins/losses for singles and doubles
+    type_chart = {
+        "singles": {"wins": int(wins[~is_doubles].sum()), "losses": int(losses[~is_doubles].sum())},
+        "doubles": {"wins": int(wins[is_doubles].sum()), "losses": int(losses[is_doubles].sum())},
+    }
+
+    # Evolution chart: moving win rates per game
+    evolution = {
+        "dates": game_dates,
+        "results": wins.tolist(),
+    }
+    for window in MOVING_AVERAGE_WINDOWS:
+        evolution[f"moving_avg_{window}"] = moving_win_rate(wins, window).tolist()
+
+    # Streak chart: signed run length of identical results
+    streak_length = run_positions(results)
+    streaks = np.where(wins == 1, streak_length, -streak_length)
+
+    # Day of week chart (0 = Sunday, 1970-01-01 was a Thursday)
+    weekday = (day_numbers + 4) % 7
+    weekday_totals = np.bincount(weekday, minlength=7)
+    weekday_wins = np.bincount(weekday, weights=wins, minlength=7)
+    weekday_rates = round_half_up(np.divide(
+        weekday_wins * 100, weekday_totals, out=np.zeros(7), where=weekday_totals > 0
+    ))
+
+    # Set balance chart by month; games without a score count as 2-0 / 0-2
+    no_score = (sets_won + sets_lost) == 0
+    sets_won = np.where(no_score, 2 * wins, sets_won)
+    sets_lost = np.where(no_score, 2 * losses, sets_lost)
+    months, month_index = np.unique(days.astype("datetime64[M]"), return_inverse=True)
+    month_games = np.bincount(month_index)
+    month_won = np.bincount(month_index, weights=sets_won).astype(int)
+    month_lost = np.bincount(month_index, weights=sets_lost).astype(int)
+    month_total = month_won + month_lost
+    month_rates = round_half_up(np.divide(
+        month_won * 100, month_total, out=np.zeros(len(months)), where=month_total > 0
+    ))
+
+    # Frequency chart: games per week (weeks start on Monday)
+    week_start = day_numbers - (day_numbers + 3) % 7
+    weeks, week_counts = np.unique(week_start, return_counts=True)
+    # Span in whole weeks from the first game, and how many of them had a game
+    total_days = max(1, int(day_numbers[-1] - day_numbers[0]))
+    total_weeks = -(-total_days // 7)
+    weeks_played = len(np.unique((day_numbers - day_numbers[0]) // 7))
+
+    # Summary: current streak, record streaks (with the date they ended) and recent form
+    current_streak = int(streak_length[-1])
+    last_is_win = bool(wins[-1])
+    win_runs = np.where(wins == 1, streak_length, 0)
+    loss_runs = np.where(losses == 1, streak_length, 0)
+    best_win_streak = int(win_runs.max())
+    worst_loss_streak = int(loss_runs.max())
+
+    total_wins = int(wins.sum())
+    return {
+        "total_games": n,
+        "summary": {
+            "wins": total_wins,
+            "losses": n - total_wins,
+            "win_rate": int(round_half_up(total_wins / n * 100)),
+            "sets_won": int(games["sets_won"].sum()),
+            "sets_lost": int(games["sets_lost"].sum()),
+            "current_streak": current_streak,
+            "streak_type": "win" if last_is_win else "loss",
+            "best_win_streak": best_win_streak,
+            "best_win_streak_end": game_dates[int(win_runs.argmax())] if best_win_streak else None,
+            "worst_loss_streak": worst_loss_streak,
+            "worst_loss_streak_end": game_dates[int(loss_runs.argmax())] if worst_loss_streak else None,
+            "streak_count": int((streak_length == 1).sum()),
+            "recent": {
+                str(window): {"games": min(window, n), "wins": int(wins[-window:].sum())}
+                for window in RECENT_WINDOWS
+            },
+        },
+        "type": type_chart,
+        "evolution": evolution,
+        "streak": {"dates": game_dates, "values": streaks.tolist()},
+        "day_of_week": {
+            "totals": weekday_totals.tolist(),
+            "wins": weekday_wins.astype(int).tolist(),
+            "win_rates": weekday_rates.tolist(),
+        },
+        "set_balance": {
+            "months": [str(m) for m in months],
+            "games": month_games.tolist(),
+            "sets_won": month_won.tolist(),
+            "sets_lost": month_lost.tolist(),
+            "win_rates": month_rates.tolist(),
+        },
+        "frequency": {
+            "weeks": [str(np.datetime64(int(w), "D")) for w in weeks],
+            "counts": week_counts.tolist(),
+            "average": round(float(week_counts.mean()), 1),
+            "total_days": total_days,
+            "total_weeks": total_weeks,
+            "weeks_played": weeks_played,
+            "last_30_days": int((day_numbers >= day_numbers[-1] - 30).sum()),
+        },
+    }
+
+
+def get_chart_data(user_id: int, sport: Optional[str] = None, period: str = "all") -> Dict:
+    """Get chart data for a user, recomputing only when their games changed."""
+    today = date.today().isoformat()
+    key = (user_id, sport, period, today, get_data_version(user_id))
+
+    with _chart_cache_lock:
+        cached = _chart_cache.get(key)
+        if cached is not None:
+            _chart_cache.move_to_end(key)
+            return cached
+
+    data = build_chart_data(get_game_store().get(user_id).select(sport, period_cutoff(period)))
+    data["period"] = period
+    data["sport"] = sport
+
+    with _chart_cache_lock:
+        _chart_cache[key] = data
+        if len(_chart_cache) > CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+
+    return data
+
+
+# =============================================================================
+# HEAD-TO-HEAD
+# =============================================================================
+
+_GAME_WITH_NAMES = """
+    SELECT g.*,
+           p1.name as opponent_name,
+           p2.name as opponent2_name,
+           p3.name as partner_name
+    FROM games g
+    LEFT JOIN players p1 ON g.opponent_id = p1.id
+    LEFT JOIN players p2 ON g.opponent2_id = p2.id
+    LEFT JOIN players p3 ON g.partner_id = p3.id
+"""
+
+
+def load_player_games(
+    user_id: int,
+    player_id: int,
+    role: str,
+    game_type: Optional[str] = None,
+    since: Optional[str] = None
+) -> List[Dict]:
+    """
+    Fetch every game with a player in a role (from `since`, an ISO date), most recent first.
+    Each player column is looked up through its own (user_id, column) index.
+    """
+    columns = ["opponent_id", "opponent2_id"] if role == "opponent" else ["partner_id"]
+    type_filter = (" AND g.game_type = ?" if game_type else "") + (" AND g.game_date >= ?" if since else "")
+    branch_params = [user_id, player_id] + ([game_type] if game_type else []) + ([since] if since else [])
+
+    query = " UNION ALL ".join(
+        f"{_GAME_WITH_NAMES} WHERE g.user_id = ? AND g.{column} = ?{type_filter}"
+        for column in columns
+    )
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT * FROM ({query}) ORDER BY game_date DESC, created_at DESC",
+        branch_params * len(columns)
+    )
+    games = [dict_from_row(row) for row in cursor.fetchall()]
+    conn.close()
+    return games
+
+
+def summarize_meetings(games: List[Dict]) -> Dict:
+    """Record, set/point totals and streaks for games sorted most recent first."""
+    wins = sum(1 for g in games if g["result"] == "win")
+    draws = sum(1 for g in games if g["result"] == "draw")
+    total = len(games)
+
+    sets_won = sets_lost = points_won = points_lost = 0
+    for game in games:
+        set_scores = parse_detailed_score(game["detailed_score"])
+        won, lost = parse_score(game["score"])
+        if won == 0 and lost == 0:
+            won = sum(1 for a, b in set_scores if a > b)
+            lost = sum(1 for a, b in set_scores if b > a)
+        sets_won += won
+        sets_lost += lost
+        points_won += sum(a for a, _ in set_scores)
+        points_lost += sum(b for _, b in set_scores)
+
+    # Streaks over the chronological sequence (oldest first)
+    is_win = np.array([g["result"] == "win" for g in reversed(games)], dtype=np.int64)
+    runs = run_positions(is_win)
+    current_streak = int(runs[-1]) if total else 0
+    best_win_streak = int(runs[is_win == 1].max()) if wins else 0
+    worst_loss_streak = int(runs[is_win == 0].max()) if total - wins else 0
+
+    return {
+        "games": total,
+        "wins": wins,
+        "losses": total - wins - draws,
+        "draws": draws,
+        "win_rate": round(wins / total * 100, 1) if total else 0,
+        "sets_won": sets_won,
+        "sets_lost": sets_lost,
+        "points_won": points_won,
+        "points_lost": points_lost,
+        "current_streak": current_streak,
+        "streak_type": ("win" if is_win[-1] else "loss") if total else None,
+        "best_win_streak": best_win_streak,
+        "worst_loss_streak": worst_loss_streak,
+        "first_meeting": games[-1]["game_date"] if total else None,
+        "last_meeting": games[0]["game_date"] if total else None,
+    }
+
+
+def get_head_to_head(
+    user_id: int,
+    player_id: int,
+    role: str = "opponent",
+    game_type: Optional[str] = None,
+    last: int = 10,
+    period: str = "all"
+) -> Dict:
+    """Head-to-head record against (or with, for partners) one player over a period ("all" or days)."""
+    games = load_player_games(user_id, player_id, role, game_type, period_cutoff(period))
+    return {
+        "player_id": player_id,
+        "role": role,
+        "game_type": game_type,
+        "period": period,
+        **summarize_meetings(games),
+        "last_meetings": games[:last],
+    }
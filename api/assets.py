@@ -0,0 +1,156 @@
+"""
+Racket Pro Analyzer - Asset Pipeline
+Minifies and fingerprints the files under static/, rewrites /static/ URLs in
+pages, stylesheets and scripts to the fingerprinted names and fills in the
+service worker's precache manifest. Run by the static cache when it is built
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from api.images import default_variant
+
+try:
+    import rjsmin
+    import rcssmin
+except ImportError:  # served unminified
+    rjsmin = rcssmin = None
+
+FINGERPRINT_LENGTH = 10
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Files whose /static/ URLs are rewritten (everything else is hashed as-is)
+REWRITTEN_EXTENSIONS = {".html", ".css", ".js", ".json"}
+# Kept at a stable URL: a service worker's script URL must not change
+SERVICE_WORKER = "js/service-worker.js"
+# Pages precached by the service worker, besides the assets they reference
+PRECACHE_PAGES = ["/", "/index.html", "/login.html", "/games.html", "/manifest.json"]
+
+_STATIC_URL = re.compile(r"/static/([\w\-./]+\.\w+)")
+_PRECACHE_MANIFEST = re.compile(r"/\* precache-manifest \*/.*?;$", re.S | re.M)
+
+
+def minify(path: str, data: bytes) -> bytes:
+    """Minified JS or CSS (already minified files and other types are returned unchanged)."""
+    if rjsmin is None or path.endswith((".min.js", ".min.css")):
+        return data
+    if path.endswith(".js"):
+        return rjsmin.jsmin(data.decode("utf-8")).encode("utf-8")
+    if path.endswith(".css"):
+        return rcssmin.cssmin(data.decode("utf-8")).encode("utf-8")
+    return data
+
+
+def fingerprint(path: str, data: bytes) -> str:
+    """Path with a content hash before the extension ("js/app.js" -> "js/app.1a2b3c4d5e.js")."""
+    base, ext = os.path.splitext(path)
+    return f"{base}.{hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def rewrite_urls(data: bytes, urls: Dict[str, str]) -> bytes:
+    """Replace /static/ URLs of known assets with their fingerprinted URLs."""
+    def replace(match):
+        return "/static/" + urls.get(match.group(1), match.group(1))
+    return _STATIC_URL.sub(replace, data.decode("utf-8")).encode("utf-8")
+
+
+def referenced_assets(data: bytes, urls: Dict[str, str]) -> List[str]:
+    """Fingerprinted /static/ URLs found in already rewritten text."""
+    fingerprinted = set(urls.values())
+    return sorted({
+        "/static/" + path for path in _STATIC_URL.findall(data.decode("utf-8")) if path in fingerprinted
+    })
+
+
+def _build_order(sources: Dict[str, bytes], aliases: Dict[str, str]) -> List[str]:
+    """
+    Paths ordered so each file comes after the files it references (a source
+    image counts as a reference to its default variant), the service worker last.
+    Files in a reference cycle keep each other's plain URLs.
+    """
+    order: List[str] = []
+    seen = set()
+
+    def visit(path):
+        if path in seen:
+            return
+        seen.add(path)
+        if os.path.splitext(path)[1] in REWRITTEN_EXTENSIONS and path != SERVICE_WORKER:
+            for ref in sorted(set(_STATIC_URL.findall(sources[path].decode("utf-8")))):
+                ref = aliases.get(ref, ref)
+                if ref in sources:
+                    visit(ref)
+        order.append(path)
+
+    for path in sorted(sources, key=lambda p: (p == SERVICE_WORKER, p)):
+        visit(path)
+    return order
+
+
+def build_assets(static_dir: str, paths: Iterable[str], variants: Optional[Dict] = None) -> Dict:
+    """
+    Process the given static files (paths relative to static_dir).
+
+    variants ({source: {width: {format: path}}}, see images.py) makes plain
+    references to a source image point at its default variant, and
+    fingerprints each variant PNG together with its AVIF/WebP alternatives.
+
+    Returns:
+        {"files": {path: processed bytes}, "urls": {path: fingerprinted path},
+         "refs": urls plus source images mapped to their default variant}
+        (the service worker is returned unprocessed; see render_service_worker)
+    """
+    alternatives = {}
+    aliases = {}
+    for source, widths in (variants or {}).items():
+        for formats in widths.values():
+            if "png" in formats:
+                alternatives[formats["png"]] = [path for fmt, path in formats.items() if fmt != "png"]
+        default = default_variant(source, widths)
+        if default:
+            aliases[source] = default
+
+    sources: Dict[str, bytes] = {}
+    for path in paths:
+        with open(os.path.join(static_dir, path), "rb") as f:
+            sources[path] = f.read()
+
+    def current_refs():
+        return {**urls, **{source: urls[v] for source, v in aliases.items() if v in urls}}
+
+    files: Dict[str, bytes] = {}
+    urls: Dict[str, str] = {}
+    for path in _build_order(sources, aliases):
+        data = sources[path]
+        if path == SERVICE_WORKER:
+            files[path] = data
+            continue
+        if os.path.splitext(path)[1] in REWRITTEN_EXTENSIONS:
+            data = rewrite_urls(minify(path, data), current_refs())
+        files[path] = data
+
+        hashed = data
+        for alternative in alternatives.get(path, []):
+            hashed += sources.get(alternative, b"")
+        urls[path] = fingerprint(path, hashed)
+    return {"files": files, "urls": urls, "refs": current_refs()}
+
+
+def render_service_worker(source: bytes, pages: Dict[str, bytes], urls: Dict[str, str]) -> bytes:
+    """
+    Fill the service worker's precache manifest: the pages plus every
+    fingerprinted asset they reference, versioned by the pages' contents.
+    """
+    assets = sorted({url for data in pages.values() for url in referenced_assets(data, urls)})
+    version = hashlib.sha256(
+        b"".join(pages[name] for name in sorted(pages)) + "\n".join(assets).encode("utf-8")
+    ).hexdigest()[:FINGERPRINT_LENGTH]
+    manifest = {"version": version, "urls": PRECACHE_PAGES + assets}
+    text = _PRECACHE_MANIFEST.sub(
+        lambda _: f"/* precache-manifest */ {json.dumps(manifest, indent=4)};",
+        source.decode("utf-8"), count=1
+    )
+    return minify(SERVICE_WORKER, text.encode("utf-8"))
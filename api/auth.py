@@ -4,12 +4,16 @@ Handles JWT token generation, password hashing, and user authentication
 """
 
 import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from passlib.context import CryptContext
-from jose import JWTError, jwt
-from fastapi import HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import JWTError, ExpiredSignatureError, jwt
+from fastapi import HTTPException, Header, status
 
 # Security configuration
 SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production-2025")
@@ -21,10 +25,30 @@ if SECRET_KEY == "dev-secret-key-change-in-production-2025":
     print("[WARNING] Using default SECRET_KEY! Set SECRET_KEY environment variable in production!")
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# JWT Bearer token
-security = HTTPBearer()
+# BCRYPT_ROUNDS pins the cost factor; otherwise the first instance calibrates it
+# so that one hash takes roughly BCRYPT_TARGET_MS, and stores it for the others.
+BCRYPT_ROUNDS = os.environ.get("BCRYPT_ROUNDS")
+BCRYPT_TARGET_MS = int(os.environ.get("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 15
+BCRYPT_DEFAULT_ROUNDS = 12
+BCRYPT_ROUNDS_SETTING = "bcrypt_rounds"  # app_settings key of the shared calibrated cost
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_DEFAULT_ROUNDS)
+bcrypt_rounds = BCRYPT_DEFAULT_ROUNDS
+
+# bcrypt releases the GIL while hashing, so a small thread pool keeps the
+# event loop free and bounds how many hashes run at the same time.
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+# Verified token claims, keyed by the raw token (LRU, entries expire with the token)
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "4096"))
+DEV_MOCK_TOKEN = "dev-token-mock"
+# The mock token signs in as user 2; only for local testing, never on by default
+ALLOW_DEV_MOCK_TOKEN = os.environ.get("ALLOW_DEV_MOCK_TOKEN", "false").lower() == "true"
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_token_cache_lock = threading.Lock()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -37,6 +61,71 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Extract the bcrypt cost factor from a hash like $2b$12$..."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check if a stored hash was created with a lower cost factor (never downgrade)"""
+    rounds = get_hash_rounds(hashed_password)
+    return rounds is None or rounds < bcrypt_rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Set the bcrypt cost factor used for new hashes"""
+    global bcrypt_rounds
+    bcrypt_rounds = max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, rounds))
+    if bcrypt_rounds != rounds:
+        print(f"[WARNING] bcrypt rounds {rounds} outside {BCRYPT_MIN_ROUNDS}..{BCRYPT_MAX_ROUNDS}, using {bcrypt_rounds}")
+    pwd_context.update(bcrypt__rounds=bcrypt_rounds)
+
+
+def calibrate_password_hashing(stored_rounds: Optional[str] = None) -> int:
+    """
+    Choose the bcrypt cost factor (called on app startup).
+    Uses BCRYPT_ROUNDS if set, then the cost already stored for every instance
+    (stored_rounds), otherwise the highest cost whose hash time stays under
+    BCRYPT_TARGET_MS. Each extra round doubles the work.
+    """
+    if BCRYPT_ROUNDS:
+        set_bcrypt_rounds(int(BCRYPT_ROUNDS))
+        print(f"[AUTH] bcrypt rounds set from BCRYPT_ROUNDS: {bcrypt_rounds}")
+        return bcrypt_rounds
+
+    if stored_rounds:
+        set_bcrypt_rounds(int(stored_rounds))
+        print(f"[AUTH] bcrypt rounds from stored calibration: {bcrypt_rounds}")
+        return bcrypt_rounds
+
+    start = time.perf_counter()
+    pwd_context.hash("calibration-password", rounds=BCRYPT_MIN_ROUNDS)
+    base_ms = (time.perf_counter() - start) * 1000
+
+    rounds = BCRYPT_MIN_ROUNDS
+    while rounds < BCRYPT_MAX_ROUNDS and base_ms * 2 ** (rounds + 1 - BCRYPT_MIN_ROUNDS) <= BCRYPT_TARGET_MS:
+        rounds += 1
+
+    set_bcrypt_rounds(rounds)
+    print(f"[AUTH] bcrypt rounds calibrated: {bcrypt_rounds} (target {BCRYPT_TARGET_MS} ms, base {base_ms:.1f} ms)")
+    return bcrypt_rounds
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -55,55 +144,99 @@ def decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token expirado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Token inválido",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+def get_token_claims(token: str) -> dict:
     """
-    Dependency to get the current authenticated user from JWT token
-    Usage: current_user = Depends(get_current_user)
+    Get the verified claims of a token, decoding it only on a cache miss.
+    Cached entries are dropped once their exp has passed.
     """
-    token = credentials.credentials
-
-    # DEVELOPMENT MODE: Accept mock token for localhost testing
-    if token == "dev-token-mock":
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+        if cached is not None:
+            claims, expires_at = cached
+            if expires_at > now:
+                _token_cache.move_to_end(token)
+                return claims
+            del _token_cache[token]
+
+    # DEVELOPMENT MODE: Accept mock token for localhost testing (explicit opt-in)
+    if (token == DEV_MOCK_TOKEN and ALLOW_DEV_MOCK_TOKEN
+            and os.environ.get("ENVIRONMENT", "development") != "production"):
         print("[AUTH] Development mode - using mock user")
-        return {
-            "user_id": 2,
-            "email": "dev@localhost",
-            "plan": "free"
-        }
+        return {"sub": "2", "email": "dev@localhost", "plan": "free"}
+
+    claims = decode_token(token)
+    expires_at = claims.get("exp") or now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    with _token_cache_lock:
+        _token_cache[token] = (claims, expires_at)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
 
-    payload = decode_token(token)
+    return claims
 
-    user_id: str = payload.get("sub")
+
+def _claims_from_header(authorization: Optional[str]) -> dict:
+    """Extract the bearer token from an Authorization header and verify it"""
+    if not authorization:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token não fornecido")
+
+    return get_token_claims(authorization.replace("Bearer ", ""))
+
+
+def _user_id_from_claims(claims: dict) -> int:
+    """Support both "user_id" (Google auth) and "sub" (email/password auth) formats"""
+    user_id = claims.get("user_id") or claims.get("sub")
     if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-        )
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
+    return int(user_id)
+
+
+async def verify_token(authorization: Optional[str] = Header(None)) -> int:
+    """
+    Dependency to get the authenticated user id from the JWT token
+    Usage: user_id: int = Depends(verify_token)
+    """
+    return _user_id_from_claims(_claims_from_header(authorization))
+
+
+async def get_current_user(authorization: Optional[str] = Header(None)) -> dict:
+    """
+    Dependency to get the current authenticated user from JWT token
+    Usage: current_user = Depends(get_current_user)
+    """
+    claims = _claims_from_header(authorization)
 
     return {
-        "user_id": int(user_id),
-        "email": payload.get("email"),
-        "plan": payload.get("plan", "free")
+        "user_id": _user_id_from_claims(claims),
+        "email": claims.get("email"),
+        "plan": claims.get("plan", "free")
     }
 
 
-async def get_current_user_optional(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)) -> Optional[dict]:
+async def get_current_user_optional(authorization: Optional[str] = Header(None)) -> Optional[dict]:
     """
     Optional authentication - returns None if no token provided
     Useful for endpoints that work with or without authentication
     """
-    if not credentials:
+    if not authorization:
         return None
 
     try:
-        return await get_current_user(credentials)
+        return await get_current_user(authorization)
     except HTTPException:
         return None
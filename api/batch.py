@@ -0,0 +1,311 @@
+"""
+Racket Pro Analyzer - Batch Mutations
+Applies a list of create/update/delete operations on games and players in one
+transaction: ownership is checked once per entity set and the joined rows are
+read back once at the end
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from pydantic import ValidationError
+
+from api.database import get_db_connection, dict_from_row, get_or_create_venue, normalize_name
+from api.models import (
+    BatchOperation, GameCreate, GameUpdate, PlayerCreate, PlayerUpdate,
+    SPORTS, GAME_TYPES, RESULTS
+)
+
+MAX_BATCH_OPERATIONS = 500
+BATCH_ACTIONS = ["create", "update", "delete"]
+BATCH_ENTITIES = ["game", "player"]
+PLAYER_ROLES = ("opponent_id", "opponent2_id", "partner_id")
+
+_DATA_MODELS = {
+    ("create", "game"): GameCreate,
+    ("update", "game"): GameUpdate,
+    ("create", "player"): PlayerCreate,
+    ("update", "player"): PlayerUpdate,
+}
+
+
+class BatchError(ValueError):
+    """An operation failed; the whole batch is rolled back"""
+
+    def __init__(self, index: int, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.index = index
+        self.status_code = status_code
+
+
+def validate_new_game(game: GameCreate) -> Optional[str]:
+    """Error message for an invalid new game, or None."""
+    if game.sport not in SPORTS:
+        return f"Esporte inválido: {game.sport}"
+    if game.game_type not in GAME_TYPES:
+        return f"Tipo de jogo inválido: {game.game_type}"
+    if game.result not in RESULTS:
+        return f"Resultado inválido: {game.result}"
+
+    error = validate_game_date(game.game_date)
+    if error:
+        return error
+
+    sport_config = SPORTS[game.sport]
+    if game.game_type not in sport_config["game_types"]:
+        return f"{sport_config['name']} não suporta jogos de {game.game_type}"
+
+    if game.game_type == "doubles":
+        if not game.partner_id:
+            return "Parceiro é obrigatório para jogos de duplas"
+        if not game.opponent2_id:
+            return "Segundo adversário é obrigatório para jogos de duplas"
+    return None
+
+
+def validate_game_date(game_date: str) -> Optional[str]:
+    """Error message unless the date starts with an ISO date (YYYY-MM-DD), or None."""
+    try:
+        date.fromisoformat(str(game_date)[:10])
+    except ValueError:
+        return f"Data inválida: {game_date}"
+    return None
+
+
+def validate_game_update(game: GameUpdate) -> Optional[str]:
+    """Error message for invalid fields of a game update, or None."""
+    if game.result is not None and game.result not in RESULTS:
+        return f"Resultado inválido: {game.result}"
+    if game.game_date is not None:
+        return validate_game_date(game.game_date)
+    return None
+
+
+def _parse_operations(operations: List[BatchOperation]) -> List[tuple]:
+    """(index, operation, parsed data model or None) for each operation, validated."""
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(MAX_BATCH_OPERATIONS, f"máximo de {MAX_BATCH_OPERATIONS} operações por lote")
+
+    parsed = []
+    for index, op in enumerate(operations):
+        if op.action not in BATCH_ACTIONS:
+            raise BatchError(index, f"Ação inválida: {op.action}")
+        if op.entity not in BATCH_ENTITIES:
+            raise BatchError(index, f"Entidade inválida: {op.entity}")
+        if op.action != "create" and op.id is None:
+            raise BatchError(index, "id é obrigatório para update e delete")
+
+        model = _DATA_MODELS.get((op.action, op.entity))
+        data = None
+        if model:
+            try:
+                data = model(**(op.data or {}))
+            except ValidationError as e:
+                raise BatchError(index, f"Dados inválidos: {e.errors()[0]['loc'][0]} {e.errors()[0]['msg']}")
+
+            if op.action == "create" and op.entity == "game":
+                error = validate_new_game(data)
+                if error:
+                    raise BatchError(index, error)
+            elif op.action == "create" and data.sport not in SPORTS:
+                raise BatchError(index, f"Esporte inválido: {data.sport}")
+            elif op.entity == "game":
+                error = validate_game_update(data)
+                if error:
+                    raise BatchError(index, error)
+        parsed.append((index, op, data))
+    return parsed
+
+
+def _check_ownership(cursor, user_id: int, parsed: List[tuple]):
+    """One query per table: every game and player the batch touches or references must be the user's."""
+    game_refs: Dict[int, int] = {}
+    player_refs: Dict[int, int] = {}
+    for index, op, data in parsed:
+        if op.entity == "game":
+            if op.id is not None:
+                game_refs.setdefault(op.id, index)
+            if data is not None:
+                for role in PLAYER_ROLES:
+                    player_id = getattr(data, role)
+                    if player_id:
+                        player_refs.setdefault(player_id, index)
+        elif op.id is not None:
+            player_refs.setdefault(op.id, index)
+
+    for table, refs, message in (
+        ("games", game_refs, "Jogo não encontrado"),
+        ("players", player_refs, "Jogador não encontrado"),
+    ):
+        if not refs:
+            continue
+        ids = list(refs)
+        cursor.execute(
+            f"SELECT id FROM {table} WHERE user_id = ? AND id IN ({', '.join('?' * len(ids))})",
+            [user_id] + ids
+        )
+        owned = {row["id"] for row in cursor.fetchall()}
+        missing = [refs[entity_id] for entity_id in ids if entity_id not in owned]
+        if missing:
+            raise BatchError(min(missing), message, 404)
+
+
+def _check_player_name(cursor, index: int, user_id: int, sport: str, name: str, exclude_id: int = 0):
+    """Reject a name already used by another of the user's players in the sport."""
+    cursor.execute("""
+        SELECT id FROM players
+        WHERE user_id = ? AND sport = ? AND normalized_name = ? AND id != ?
+    """, (user_id, sport, normalize_name(name), exclude_id))
+    if cursor.fetchone():
+        raise BatchError(index, f"Já existe um jogador com o nome '{name}' neste esporte")
+
+
+def _apply(cursor, user_id: int, index: int, op: BatchOperation, data) -> int:
+    """Run one operation on the batch's cursor; returns the affected id."""
+    if op.entity == "player":
+        if op.action == "create":
+            _check_player_name(cursor, index, user_id, data.sport, data.name)
+            cursor.execute("""
+                INSERT INTO players (user_id, sport, name, normalized_name, dominant_hand, level, play_style, age_group, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (user_id, data.sport, data.name, normalize_name(data.name), data.dominant_hand,
+                  data.level, data.play_style, data.age_group, data.notes))
+            return cursor.lastrowid
+
+        cursor.execute("SELECT sport FROM players WHERE id = ?", (op.id,))
+        player = cursor.fetchone()
+        if not player:
+            raise BatchError(index, "Jogador não encontrado", 404)
+
+        if op.action == "delete":
+            cursor.execute("""
+                SELECT COUNT(*) as count FROM games
+                WHERE opponent_id = ? OR opponent2_id = ? OR partner_id = ?
+            """, (op.id, op.id, op.id))
+            if cursor.fetchone()["count"] > 0:
+                raise BatchError(index, "Não é possível excluir jogador com jogos registrados")
+            cursor.execute("DELETE FROM players WHERE id = ?", (op.id,))
+            return op.id
+
+        updates = []
+        values = []
+        for field, value in data.dict(exclude_unset=True).items():
+            if value is not None:
+                updates.append(f"{field} = ?")
+                values.append(value)
+                if field == "name":
+                    _check_player_name(cursor, index, user_id, player["sport"], value, op.id)
+                    updates.append("normalized_name = ?")
+                    values.append(normalize_name(value))
+        if updates:
+            updates.append("updated_at = ?")
+            values.append(datetime.utcnow())
+            cursor.execute(f"UPDATE players SET {', '.join(updates)} WHERE id = ?", values + [op.id])
+        return op.id
+
+    if op.action == "create":
+        cursor.execute("""
+            INSERT INTO games (user_id, sport, game_type, opponent_id, opponent2_id, partner_id,
+                              game_date, result, score, detailed_score, location, venue_id, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (user_id, data.sport, data.game_type, data.opponent_id, data.opponent2_id,
+              data.partner_id, data.game_date, data.result, data.score, data.detailed_score,
+              data.location, get_or_create_venue(cursor, user_id, data.location), data.notes))
+        return cursor.lastrowid
+
+    if op.action == "delete":
+        cursor.execute("DELETE FROM games WHERE id = ?", (op.id,))
+        if cursor.rowcount == 0:
+            raise BatchError(index, "Jogo não encontrado", 404)
+        return op.id
+
+    updates = []
+    values = []
+    for field, value in data.dict(exclude_unset=True).items():
+        if value is not None:
+            updates.append(f"{field} = ?")
+            values.append(value)
+            if field == "location":
+                updates.append("venue_id = ?")
+                values.append(get_or_create_venue(cursor, user_id, value))
+    if updates:
+        updates.append("updated_at = ?")
+        values.append(datetime.utcnow())
+        cursor.execute(f"UPDATE games SET {', '.join(updates)} WHERE id = ?", values + [op.id])
+        if cursor.rowcount == 0:
+            raise BatchError(index, "Jogo não encontrado", 404)
+    return op.id
+
+
+def _load_rows(cursor, table: str, ids: List[int]) -> Dict[int, Dict]:
+    """Current rows (games with player names joined) by id."""
+    if not ids:
+        return {}
+    placeholders = ", ".join("?" * len(ids))
+    if table == "games":
+        cursor.execute(f"""
+            SELECT g.*,
+                   p1.name as opponent_name,
+                   p2.name as opponent2_name,
+                   p3.name as partner_name
+            FROM games g
+            LEFT JOIN players p1 ON g.opponent_id = p1.id
+            LEFT JOIN players p2 ON g.opponent2_id = p2.id
+            LEFT JOIN players p3 ON g.partner_id = p3.id
+            WHERE g.id IN ({placeholders})
+        """, ids)
+    else:
+        cursor.execute(f"SELECT * FROM players WHERE id IN ({placeholders})", ids)
+    return {row["id"]: dict_from_row(row) for row in cursor.fetchall()}
+
+
+def apply_batch(user_id: int, operations: List[BatchOperation]) -> Dict:
+    """
+    Apply operations in order, all or nothing.
+
+    Returns:
+        {"results": [...], "games": {id: row or None}, "dates_changed": bool}
+        where "games" holds the final state of every game touched (None if deleted)
+
+    Raises:
+        BatchError: For the first operation that fails (nothing is written)
+    """
+    parsed = _parse_operations(operations)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        _check_ownership(cursor, user_id, parsed)
+
+        affected = []
+        dates_changed = False
+        for index, op, data in parsed:
+            affected.append(_apply(cursor, user_id, index, op, data))
+            if op.entity == "game" and (op.action != "update" or data.game_date is not None):
+                dates_changed = True
+
+        game_ids = list({entity_id for (_, op, _), entity_id in zip(parsed, affected) if op.entity == "game"})
+        player_ids = list({entity_id for (_, op, _), entity_id in zip(parsed, affected) if op.entity == "player"})
+        rows = {"game": _load_rows(cursor, "games", game_ids), "player": _load_rows(cursor, "players", player_ids)}
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    results = []
+    for (index, op, _), entity_id in zip(parsed, affected):
+        result = {"index": index, "action": op.action, "entity": op.entity, "id": entity_id}
+        if op.action == "delete":
+            result["deleted"] = True
+        else:
+            result["data"] = rows[op.entity].get(entity_id)
+        results.append(result)
+
+    return {
+        "results": results,
+        "games": {game_id: rows["game"].get(game_id) for game_id in game_ids},
+        "dates_changed": dates_changed,
+    }
@@ -5,11 +5,20 @@ Uses Google Cloud Storage for persistence across container restarts
 
 import sqlite3
 import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict
 
-from api.auth import get_password_hash, verify_password
+from starlette.concurrency import run_in_threadpool
+
+from api.auth import get_password_hash_async, verify_password_async, password_needs_rehash
 
 # Check if running in production (Cloud Run)
 IS_PRODUCTION = os.environ.get("K_SERVICE") is not None or os.environ.get("ENVIRONMENT") == "production"
@@ -25,10 +34,26 @@ else:
 DB_DIR.mkdir(parents=True, exist_ok=True)
 DATABASE_PATH = str(DB_DIR / "racket_analyzer.db")
 
+# User rows by id (LRU), invalidated whenever a users row is written
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "1024"))
+_user_cache: "OrderedDict[int, Dict]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+# Per-user data version, bumped on every games/players write; derived caches
+# (analytics, etc.) include it in their keys so stale entries are never served
+_data_versions: Dict[int, int] = {}
+_data_versions_lock = threading.Lock()
+
+# How long a create response is replayed for a retried Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_HOURS", "24")) * 3600
 
-def get_db_connection():
-    """Get a database connection with row factory."""
-    conn = sqlite3.connect(DATABASE_PATH)
+
+def get_db_connection(check_same_thread: bool = True):
+    """
+    Get a database connection with row factory. Pass check_same_thread=False
+    for a connection used by one thread at a time but not always the same one.
+    """
+    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -105,6 +130,52 @@ def init_db():
     except sqlite3.OperationalError:
         pass  # Column already exists
 
+    # Migration: Add normalized_name column (accent/case folded) if it doesn't exist
+    try:
+        cursor.execute("ALTER TABLE players ADD COLUMN normalized_name TEXT")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+    # (also names that normalized to "" when non-Latin letters were dropped)
+    cursor.execute("SELECT id, name FROM players WHERE normalized_name IS NULL OR normalized_name = ''")
+    for row in cursor.fetchall():
+        cursor.execute(
+            "UPDATE players SET normalized_name = ? WHERE id = ?",
+            (normalize_name(row["name"]), row["id"])
+        )
+
+    # Trigram full-text index over normalized names for fuzzy player search
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'players_fts'")
+    needs_fts_rebuild = cursor.fetchone() is None
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS players_fts USING fts5(
+            normalized_name, content='players', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_players_fts_insert AFTER INSERT ON players
+        BEGIN
+            INSERT INTO players_fts (rowid, normalized_name) VALUES (NEW.id, NEW.normalized_name);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_players_fts_delete AFTER DELETE ON players
+        BEGIN
+            INSERT INTO players_fts (players_fts, rowid, normalized_name)
+            VALUES ('delete', OLD.id, OLD.normalized_name);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_players_fts_update AFTER UPDATE OF normalized_name ON players
+        BEGIN
+            INSERT INTO players_fts (players_fts, rowid, normalized_name)
+            VALUES ('delete', OLD.id, OLD.normalized_name);
+            INSERT INTO players_fts (rowid, normalized_name) VALUES (NEW.id, NEW.normalized_name);
+        END
+    """)
+    if needs_fts_rebuild:
+        cursor.execute("INSERT INTO players_fts (players_fts) VALUES ('rebuild')")
+
     # Games table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS games (
@@ -136,12 +207,290 @@ def init_db():
     except sqlite3.OperationalError:
         pass  # Column already exists
 
+    # Migration: Add venue_id column to games if it doesn't exist
+    try:
+        cursor.execute("ALTER TABLE games ADD COLUMN venue_id INTEGER REFERENCES venues (id)")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+    # Venues table - one row per distinct (normalized) location per user
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS venues (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            canonical_name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            UNIQUE (user_id, canonical_name)
+        )
+    """)
+
     # Create indexes for better performance
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_players_user_sport ON players (user_id, sport)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_players_user_sport_name ON players (user_id, sport, normalized_name)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_user_sport ON games (user_id, sport)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_opponent ON games (opponent_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_partner ON games (partner_id)")
 
+    # Opponent-centric indexes for head-to-head lookups (one per player column)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_user_opponent ON games (user_id, opponent_id, game_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_user_opponent2 ON games (user_id, opponent2_id, game_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_user_partner ON games (user_id, partner_id, game_date)")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_user_date ON games (user_id, game_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_user_venue ON games (user_id, venue_id)")
+
+    # Migration: Link games saved before venues existed
+    cursor.execute("""
+        SELECT DISTINCT user_id, location FROM games
+        WHERE venue_id IS NULL AND location IS NOT NULL AND TRIM(location) != ''
+    """)
+    for row in cursor.fetchall():
+        venue_id = get_or_create_venue(cursor, row["user_id"], row["location"])
+        cursor.execute(
+            "UPDATE games SET venue_id = ? WHERE user_id = ? AND location = ? AND venue_id IS NULL",
+            (venue_id, row["user_id"], row["location"])
+        )
+
+    # =============================================================================
+    # DAILY ROLLUP (games per user/day/sport, maintained by triggers on games)
+    # =============================================================================
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_daily_stats'")
+    needs_backfill = cursor.fetchone() is None
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS game_daily_stats (
+            user_id INTEGER NOT NULL,
+            game_date TEXT NOT NULL,
+            sport TEXT NOT NULL,
+            games INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            draws INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, game_date, sport)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_daily_insert AFTER INSERT ON games
+        BEGIN
+            INSERT INTO game_daily_stats (user_id, game_date, sport, games, wins, losses, draws)
+            VALUES (NEW.user_id, NEW.game_date, NEW.sport, 1,
+                    NEW.result = 'win', NEW.result = 'loss', NEW.result = 'draw')
+            ON CONFLICT (user_id, game_date, sport) DO UPDATE SET
+                games = games + 1,
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                draws = draws + excluded.draws;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_daily_delete AFTER DELETE ON games
+        BEGIN
+            UPDATE game_daily_stats SET
+                games = games - 1,
+                wins = wins - (OLD.result = 'win'),
+                losses = losses - (OLD.result = 'loss'),
+                draws = draws - (OLD.result = 'draw')
+            WHERE user_id = OLD.user_id AND game_date = OLD.game_date AND sport = OLD.sport;
+            DELETE FROM game_daily_stats
+            WHERE user_id = OLD.user_id AND game_date = OLD.game_date AND sport = OLD.sport AND games <= 0;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_daily_update
+        AFTER UPDATE OF user_id, game_date, sport, result ON games
+        BEGIN
+            UPDATE game_daily_stats SET
+                games = games - 1,
+                wins = wins - (OLD.result = 'win'),
+                losses = losses - (OLD.result = 'loss'),
+                draws = draws - (OLD.result = 'draw')
+            WHERE user_id = OLD.user_id AND game_date = OLD.game_date AND sport = OLD.sport;
+            DELETE FROM game_daily_stats
+            WHERE user_id = OLD.user_id AND game_date = OLD.game_date AND sport = OLD.sport AND games <= 0;
+            INSERT INTO game_daily_stats (user_id, game_date, sport, games, wins, losses, draws)
+            VALUES (NEW.user_id, NEW.game_date, NEW.sport, 1,
+                    NEW.result = 'win', NEW.result = 'loss', NEW.result = 'draw')
+            ON CONFLICT (user_id, game_date, sport) DO UPDATE SET
+                games = games + 1,
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                draws = draws + excluded.draws;
+        END
+    """)
+
+    # Migration: Fill the rollup from existing games the first time it is created
+    if needs_backfill:
+        cursor.execute("""
+            INSERT INTO game_daily_stats (user_id, game_date, sport, games, wins, losses, draws)
+            SELECT user_id, game_date, sport, COUNT(*),
+                   SUM(result = 'win'), SUM(result = 'loss'), SUM(result = 'draw')
+            FROM games
+            GROUP BY user_id, game_date, sport
+        """)
+
+    # =============================================================================
+    # FULL-TEXT SEARCH over game notes and locations (kept in sync by triggers)
+    # =============================================================================
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'games_fts'")
+    needs_games_fts_rebuild = cursor.fetchone() is None
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5(
+            notes, location, user_id UNINDEXED, sport UNINDEXED,
+            content='games', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_fts_insert AFTER INSERT ON games
+        BEGIN
+            INSERT INTO games_fts (rowid, notes, location, user_id, sport)
+            VALUES (NEW.id, NEW.notes, NEW.location, NEW.user_id, NEW.sport);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_fts_delete AFTER DELETE ON games
+        BEGIN
+            INSERT INTO games_fts (games_fts, rowid, notes, location, user_id, sport)
+            VALUES ('delete', OLD.id, OLD.notes, OLD.location, OLD.user_id, OLD.sport);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_fts_update AFTER UPDATE OF notes, location, user_id, sport ON games
+        BEGIN
+            INSERT INTO games_fts (games_fts, rowid, notes, location, user_id, sport)
+            VALUES ('delete', OLD.id, OLD.notes, OLD.location, OLD.user_id, OLD.sport);
+            INSERT INTO games_fts (rowid, notes, location, user_id, sport)
+            VALUES (NEW.id, NEW.notes, NEW.location, NEW.user_id, NEW.sport);
+        END
+    """)
+    if needs_games_fts_rebuild:
+        cursor.execute("INSERT INTO games_fts (games_fts) VALUES ('rebuild')")
+
+    # =============================================================================
+    # MONTHLY ROLLUP AND PERIOD REPORTS (maintained by triggers on the daily rollup)
+    # =============================================================================
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_monthly_stats'")
+    needs_monthly_backfill = cursor.fetchone() is None
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS game_monthly_stats (
+            user_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            sport TEXT NOT NULL,
+            games INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            draws INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, month, sport)
+        ) WITHOUT ROWID
+    """)
+
+    # Reports for closed periods, dropped when a game that affects them changes
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS period_reports (
+            user_id INTEGER NOT NULL,
+            sport TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            report TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, sport, start_date, end_date)
+        ) WITHOUT ROWID
+    """)
+
+    # A game also changes later reports (their new opponents depend on first
+    # meetings), and its player columns change the matchups: drop every report
+    # of the user ending after the game's date
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_games_reports_insert'")
+    needs_report_purge = cursor.fetchone() is None
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_reports_insert AFTER INSERT ON games
+        BEGIN
+            DELETE FROM period_reports WHERE user_id = NEW.user_id AND end_date > NEW.game_date;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_reports_delete AFTER DELETE ON games
+        BEGIN
+            DELETE FROM period_reports WHERE user_id = OLD.user_id AND end_date > OLD.game_date;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_games_reports_update
+        AFTER UPDATE OF user_id, game_date, sport, result, opponent_id, opponent2_id, partner_id ON games
+        BEGIN
+            DELETE FROM period_reports WHERE user_id = OLD.user_id AND end_date > OLD.game_date;
+            DELETE FROM period_reports WHERE user_id = NEW.user_id AND end_date > NEW.game_date;
+        END
+    """)
+    # Migration: Reports stored before these triggers may be stale
+    if needs_report_purge:
+        cursor.execute("DELETE FROM period_reports")
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_monthly_insert AFTER INSERT ON game_daily_stats
+        BEGIN
+            INSERT INTO game_monthly_stats (user_id, month, sport, games, wins, losses, draws)
+            VALUES (NEW.user_id, substr(NEW.game_date, 1, 7), NEW.sport,
+                    NEW.games, NEW.wins, NEW.losses, NEW.draws)
+            ON CONFLICT (user_id, month, sport) DO UPDATE SET
+                games = games + excluded.games,
+                wins = wins + excluded.wins,
+                losses = losses + excluded.losses,
+                draws = draws + excluded.draws;
+            DELETE FROM period_reports
+            WHERE user_id = NEW.user_id AND start_date <= NEW.game_date AND end_date > NEW.game_date;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_monthly_update AFTER UPDATE ON game_daily_stats
+        BEGIN
+            UPDATE game_monthly_stats SET
+                games = games + NEW.games - OLD.games,
+                wins = wins + NEW.wins - OLD.wins,
+                losses = losses + NEW.losses - OLD.losses,
+                draws = draws + NEW.draws - OLD.draws
+            WHERE user_id = NEW.user_id AND month = substr(NEW.game_date, 1, 7) AND sport = NEW.sport;
+            DELETE FROM period_reports
+            WHERE user_id = NEW.user_id AND start_date <= NEW.game_date AND end_date > NEW.game_date;
+        END
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_monthly_delete AFTER DELETE ON game_daily_stats
+        BEGIN
+            UPDATE game_monthly_stats SET
+                games = games - OLD.games,
+                wins = wins - OLD.wins,
+                losses = losses - OLD.losses,
+                draws = draws - OLD.draws
+            WHERE user_id = OLD.user_id AND month = substr(OLD.game_date, 1, 7) AND sport = OLD.sport;
+            DELETE FROM game_monthly_stats
+            WHERE user_id = OLD.user_id AND month = substr(OLD.game_date, 1, 7) AND sport = OLD.sport
+              AND games <= 0;
+            DELETE FROM period_reports
+            WHERE user_id = OLD.user_id AND start_date <= OLD.game_date AND end_date > OLD.game_date;
+        END
+    """)
+
+    # Migration: Fill the monthly rollup from the daily one the first time it is created
+    if needs_monthly_backfill:
+        cursor.execute("""
+            INSERT INTO game_monthly_stats (user_id, month, sport, games, wins, losses, draws)
+            SELECT user_id, substr(game_date, 1, 7), sport,
+                   SUM(games), SUM(wins), SUM(losses), SUM(draws)
+            FROM game_daily_stats
+            GROUP BY user_id, substr(game_date, 1, 7), sport
+        """)
+
     # =============================================================================
     # GAMIFICATION TABLES (Achievements System)
     # =============================================================================
@@ -192,10 +541,91 @@ def init_db():
     # Initialize default achievements
     _init_default_achievements(cursor)
 
+    # =============================================================================
+    # EMAIL OUTBOX (delivered by the background worker in email_outbox.py)
+    # =============================================================================
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            to_email TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at)")
+
+    # =============================================================================
+    # IDEMPOTENCY KEYS (responses of create requests replayed on retry)
+    # =============================================================================
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            user_id INTEGER NOT NULL,
+            idempotency_key TEXT NOT NULL,
+            request_hash TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            PRIMARY KEY (user_id, idempotency_key)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created ON idempotency_keys (created_at)")
+
+    # =============================================================================
+    # APP SETTINGS (values shared by every instance, e.g. the bcrypt cost)
+    # =============================================================================
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID
+    """)
+
     conn.commit()
     conn.close()
 
 
+def get_app_setting(key: str) -> Optional[str]:
+    """Get a shared app setting, or None if it was never stored."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
+    row = cursor.fetchone()
+    conn.close()
+    return row["value"] if row else None
+
+
+def store_app_setting(key: str, value: str) -> None:
+    """Store a shared app setting unless one is already stored."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("INSERT OR IGNORE INTO app_settings (key, value) VALUES (?, ?)", (key, value))
+    inserted = cursor.rowcount > 0
+    conn.commit()
+    conn.close()
+    if inserted:
+        save_to_cloud()
+
+
+def get_data_version(user_id: int) -> int:
+    """Get the current data version for a user's games and players."""
+    return _data_versions.get(user_id, 0)
+
+
+def bump_data_version(user_id: int) -> int:
+    """Mark a user's games/players as changed (call after every write)."""
+    with _data_versions_lock:
+        _data_versions[user_id] = _data_versions.get(user_id, 0) + 1
+        return _data_versions[user_id]
+
+
 def dict_from_row(row):
     """Convert sqlite3.Row to dictionary."""
     if row is None:
@@ -245,20 +675,19 @@ def ensure_db_initialized():
 
 def create_user(
     email: str,
-    password: str,
+    password_hash: str,
     name: str = None,
     plan: str = "free"
 ) -> Optional[Dict]:
     """
     Create a new user with email/password authentication.
+    The password must already be hashed (see auth.get_password_hash_async).
     Returns user dict if successful, None if email already exists.
     """
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
 
-        password_hash = get_password_hash(password)
-
         cursor.execute("""
             INSERT INTO users (email, password_hash, name, plan)
             VALUES (?, ?, ?, ?)
@@ -285,9 +714,10 @@ def create_user(
         return None
 
 
-def authenticate_user(email: str, password: str) -> Optional[Dict]:
+async def authenticate_user(email: str, password: str) -> Optional[Dict]:
     """
     Authenticate a user by email and password.
+    Hashes created with a lower bcrypt cost are transparently upgraded.
     Returns user dict if successful, None if invalid credentials.
     """
     conn = get_db_connection()
@@ -304,9 +734,15 @@ def authenticate_user(email: str, password: str) -> Optional[Dict]:
     if not user["password_hash"]:
         return None
 
-    if not verify_password(password, user["password_hash"]):
+    if not await verify_password_async(password, user["password_hash"]):
         return None
 
+    if password_needs_rehash(user["password_hash"]):
+        new_hash = await get_password_hash_async(password)
+        # The write ends with a full Cloud Storage upload; keep it off the event loop
+        await run_in_threadpool(update_user_password, user["id"], new_hash)
+        print(f"[DB] Password rehashed for user {user['id']}")
+
     return {
         "id": user["id"],
         "email": user["email"],
@@ -317,6 +753,38 @@ def authenticate_user(email: str, password: str) -> Optional[Dict]:
     }
 
 
+def get_user_by_id(user_id: int) -> Optional[Dict]:
+    """Get user by id, served from the in-memory user cache when possible."""
+    with _user_cache_lock:
+        user = _user_cache.get(user_id)
+        if user is not None:
+            _user_cache.move_to_end(user_id)
+            return dict(user)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+    user = dict_from_row(cursor.fetchone())
+    conn.close()
+
+    if not user:
+        return None
+
+    with _user_cache_lock:
+        _user_cache[user_id] = user
+        if len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+    return dict(user)
+
+
+def invalidate_user_cache(user_id: int):
+    """Drop a user from the in-memory user cache (call after updating the users row)."""
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+
 def get_user_by_email(email: str) -> Optional[Dict]:
     """Get user by email address."""
     conn = get_db_connection()
@@ -346,6 +814,7 @@ def set_verification_code(user_id: int, code: str, expires_at: datetime) -> bool
 
         conn.commit()
         conn.close()
+        invalidate_user_cache(user_id)
 
         save_to_cloud()
         return True
@@ -409,6 +878,7 @@ def verify_email(user_id: int, code: str) -> bool:
 
     conn.commit()
     conn.close()
+    invalidate_user_cache(user_id)
 
     save_to_cloud()
     print(f"[DB] Email verified for user {user_id}")
@@ -444,6 +914,7 @@ def update_user_password(user_id: int, hashed_password: str) -> bool:
 
         conn.commit()
         conn.close()
+        invalidate_user_cache(user_id)
 
         save_to_cloud()
         return True
@@ -452,6 +923,90 @@ def update_user_password(user_id: int, hashed_password: str) -> bool:
         return False
 
 
+# =============================================================================
+# NAME AND VENUE FUNCTIONS
+# =============================================================================
+
+KANA_VOICING_MARKS = {"\u3099", "\u309a"}
+
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical form of a player or venue name: casefolded, no accents or
+    punctuation, single spaces. Letters and digits of any script are kept.
+    """
+    text = unicodedata.normalize("NFD", name.casefold())
+    # Kana voicing marks are part of the letter (か/が), not an accent
+    text = "".join(ch for ch in text if not unicodedata.combining(ch) or ch in KANA_VOICING_MARKS)
+    text = re.sub(r"[^\w\s]|_", "", unicodedata.normalize("NFC", text))
+    return " ".join(text.split())
+
+
+def get_or_create_venue(cursor, user_id: int, location: Optional[str]) -> Optional[int]:
+    """
+    Get the venue id for a free-text location, creating the venue on first use.
+    Runs on the caller's cursor so it shares the game write's transaction.
+    """
+    if not location or not location.strip():
+        return None
+    canonical = normalize_name(location)
+    if not canonical:
+        return None
+
+    cursor.execute(
+        "SELECT id FROM venues WHERE user_id = ? AND canonical_name = ?",
+        (user_id, canonical)
+    )
+    venue = cursor.fetchone()
+    if venue:
+        return venue["id"]
+
+    cursor.execute(
+        "INSERT INTO venues (user_id, name, canonical_name) VALUES (?, ?, ?)",
+        (user_id, location.strip(), canonical)
+    )
+    return cursor.lastrowid
+
+
+class IdempotencyConflict(ValueError):
+    """An Idempotency-Key was reused for a different request"""
+
+
+def idempotency_fingerprint(scope: str, payload: Dict) -> str:
+    """Hash identifying a request (endpoint and body), stored with its key."""
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{scope}\n{body}".encode("utf-8")).hexdigest()[:32]
+
+
+def get_idempotent_response(cursor, user_id: int, key: str, request_hash: str) -> Optional[Dict]:
+    """
+    The stored response for a key, or None if unseen or expired.
+
+    Raises:
+        IdempotencyConflict: If the key was used for a different request
+    """
+    cursor.execute("""
+        SELECT request_hash, response, created_at FROM idempotency_keys
+        WHERE user_id = ? AND idempotency_key = ?
+    """, (user_id, key))
+    row = cursor.fetchone()
+    if not row or row["created_at"] < time.time() - IDEMPOTENCY_TTL_SECONDS:
+        return None
+    if row["request_hash"] != request_hash:
+        raise IdempotencyConflict(key)
+    return json.loads(row["response"])
+
+
+def save_idempotent_response(cursor, user_id: int, key: str, request_hash: str, response: Dict):
+    """Store a response for replay, in the caller's transaction, and drop expired keys."""
+    now = int(time.time())
+    cursor.execute("DELETE FROM idempotency_keys WHERE created_at < ?", (now - IDEMPOTENCY_TTL_SECONDS,))
+    cursor.execute("""
+        INSERT OR REPLACE INTO idempotency_keys (user_id, idempotency_key, request_hash, response, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, (user_id, key, request_hash, json.dumps(response, default=str), now))
+
+
 # =============================================================================
 # GAMIFICATION FUNCTIONS (Achievements System)
 # =============================================================================
@@ -503,8 +1058,13 @@ def _init_default_achievements(cursor):
 def get_user_stats(user_id: int) -> Dict:
     """Get user statistics for achievement checking."""
     conn = get_db_connection()
-    cursor = conn.cursor()
+    stats = _user_stats(conn.cursor(), user_id)
+    conn.close()
+    return stats
 
+
+def _user_stats(cursor, user_id: int) -> Dict:
+    """get_user_stats on the caller's cursor (sees its uncommitted writes)."""
     # Total games
     cursor.execute("SELECT COUNT(*) as count FROM games WHERE user_id = ?", (user_id,))
     total_games = cursor.fetchone()['count']
@@ -528,8 +1088,6 @@ def get_user_stats(user_id: int) -> Dict:
     current_streak = streak_row['current_streak'] if streak_row else 0
     best_streak = streak_row['best_streak'] if streak_row else 0
 
-    conn.close()
-
     return {
         'total_games': total_games,
         'total_wins': total_wins,
@@ -542,10 +1100,17 @@ def get_user_stats(user_id: int) -> Dict:
 
 def update_user_streak(user_id: int, game_date: str) -> Dict:
     """Update user's streak based on game date."""
-    from datetime import date, timedelta
-
     conn = get_db_connection()
-    cursor = conn.cursor()
+    streak = _advance_streak(conn.cursor(), user_id, game_date)
+    conn.commit()
+    conn.close()
+    save_to_cloud()
+    return streak
+
+
+def _advance_streak(cursor, user_id: int, game_date: str) -> Dict:
+    """Apply one new game date to the user's streak on the caller's cursor (no commit)."""
+    from datetime import date
 
     # Parse game date
     try:
@@ -563,9 +1128,6 @@ def update_user_streak(user_id: int, game_date: str) -> Dict:
             INSERT INTO user_streaks (user_id, current_streak, best_streak, last_game_date)
             VALUES (?, 1, 1, ?)
         """, (user_id, game_date))
-        conn.commit()
-        conn.close()
-        save_to_cloud()
         return {'current_streak': 1, 'best_streak': 1, 'last_game_date': game_date}
 
     current_streak = streak_row['current_streak']
@@ -600,14 +1162,55 @@ def update_user_streak(user_id: int, game_date: str) -> Dict:
         WHERE user_id = ?
     """, (current_streak, best_streak, game_date, user_id))
 
+    return {
+        'current_streak': current_streak,
+        'best_streak': best_streak,
+        'last_game_date': game_date
+    }
+
+
+def recompute_user_streak(user_id: int) -> Dict:
+    """Rebuild a user's streak from every day they played (used after bulk writes)."""
+    from datetime import date
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT DISTINCT game_date FROM game_daily_stats WHERE user_id = ? ORDER BY game_date",
+        (user_id,)
+    )
+    days = []
+    for row in cursor.fetchall():
+        try:
+            days.append(date.fromisoformat(row["game_date"][:10]))
+        except ValueError:
+            continue
+
+    current_streak = best_streak = 0
+    previous = None
+    for day in days:
+        if previous is not None and (day - previous).days == 0:
+            continue
+        current_streak = current_streak + 1 if previous is not None and (day - previous).days == 1 else 1
+        best_streak = max(best_streak, current_streak)
+        previous = day
+
+    last_game_date = days[-1].isoformat() if days else None
+    cursor.execute("""
+        INSERT INTO user_streaks (user_id, current_streak, best_streak, last_game_date)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET
+            current_streak = excluded.current_streak,
+            best_streak = MAX(user_streaks.best_streak, excluded.best_streak),
+            last_game_date = excluded.last_game_date
+    """, (user_id, current_streak, best_streak, last_game_date))
     conn.commit()
     conn.close()
-    save_to_cloud()
 
     return {
         'current_streak': current_streak,
         'best_streak': best_streak,
-        'last_game_date': game_date
+        'last_game_date': last_game_date
     }
 
 
@@ -675,29 +1278,36 @@ def get_user_achievements(user_id: int) -> list:
 
 def check_and_unlock_achievements(user_id: int) -> list:
     """Check and unlock any new achievements for user."""
-    stats = get_user_stats(user_id)
-    newly_unlocked = []
-
     conn = get_db_connection()
-    cursor = conn.cursor()
+    newly_unlocked = _unlock_achievements(conn.cursor(), user_id)
+
+    if newly_unlocked:
+        conn.commit()
+        save_to_cloud()
+
+    conn.close()
+    return newly_unlocked
 
-    # Get all achievements
-    cursor.execute("SELECT * FROM achievements")
-    all_achievements = cursor.fetchall()
 
-    for achievement in all_achievements:
+def _unlock_achievements(cursor, user_id: int) -> list:
+    """Unlock achievements whose condition the user now meets, on the caller's cursor (no commit)."""
+    stats = _user_stats(cursor, user_id)
+    newly_unlocked = []
+
+    # Achievements not yet unlocked by the user
+    cursor.execute("""
+        SELECT a.* FROM achievements a
+        WHERE NOT EXISTS (
+            SELECT 1 FROM user_achievements ua WHERE ua.user_id = ? AND ua.achievement_id = a.id
+        )
+    """, (user_id,))
+    locked_achievements = cursor.fetchall()
+
+    for achievement in locked_achievements:
         achievement_id = achievement['id']
         condition_type = achievement['condition_type']
         condition_value = achievement['condition_value']
 
-        # Check if already unlocked
-        cursor.execute("""
-            SELECT id FROM user_achievements WHERE user_id = ? AND achievement_id = ?
-        """, (user_id, achievement_id))
-
-        if cursor.fetchone():
-            continue  # Already unlocked
-
         # Check condition
         unlocked = False
 
@@ -732,9 +1342,61 @@ def check_and_unlock_achievements(user_id: int) -> list:
             except sqlite3.IntegrityError:
                 pass  # Already unlocked (race condition)
 
-    if newly_unlocked:
+    return newly_unlocked
+
+
+# =============================================================================
+# GAME WRITE PIPELINE
+# =============================================================================
+
+def create_game_with_effects(user_id: int, game: Dict, idempotency_key: Optional[str] = None) -> Dict:
+    """
+    Insert a game and apply everything that follows from it in one transaction:
+    venue, streak and achievements (daily/monthly rollups and search indexes
+    are kept by triggers). The row comes back from RETURNING with player names.
+    With an idempotency key, a retry returns the first result without writing.
+
+    Returns:
+        {"game": row, "streak": {...}, "newly_unlocked": [...], "replayed": bool}
+
+    Raises:
+        IdempotencyConflict: If the key was used for a different game
+    """
+    request_hash = idempotency_fingerprint("POST /api/games", game)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        if idempotency_key:
+            previous = get_idempotent_response(cursor, user_id, idempotency_key, request_hash)
+            if previous is not None:
+                conn.rollback()
+                return {**previous, "replayed": True}
+
+        venue_id = get_or_create_venue(cursor, user_id, game.get("location"))
+        cursor.execute("""
+            INSERT INTO games (user_id, sport, game_type, opponent_id, opponent2_id, partner_id,
+                              game_date, result, score, detailed_score, location, venue_id, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING *,
+                (SELECT name FROM players WHERE id = opponent_id) as opponent_name,
+                (SELECT name FROM players WHERE id = opponent2_id) as opponent2_name,
+                (SELECT name FROM players WHERE id = partner_id) as partner_name
+        """, (user_id, game["sport"], game["game_type"], game["opponent_id"], game.get("opponent2_id"),
+              game.get("partner_id"), game["game_date"], game["result"], game.get("score"),
+              game.get("detailed_score"), game.get("location"), venue_id, game.get("notes")))
+        new_game = dict_from_row(cursor.fetchone())
+
+        streak = _advance_streak(cursor, user_id, game["game_date"])
+        newly_unlocked = _unlock_achievements(cursor, user_id)
+        result = {"game": new_game, "streak": streak, "newly_unlocked": newly_unlocked}
+        if idempotency_key:
+            save_idempotent_response(cursor, user_id, idempotency_key, request_hash, result)
         conn.commit()
-        save_to_cloud()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
-    conn.close()
-    return newly_unlocked
+    return {**result, "replayed": False}
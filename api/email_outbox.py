@@ -0,0 +1,255 @@
+"""
+Email outbox for Racket Pro Analyzer
+Auth endpoints enqueue emails in the email_outbox table and return immediately;
+a background worker delivers them with retries, backoff and a concurrency limit
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from api.database import get_db_connection
+from api.email_service import send_verification_email, send_welcome_email, send_password_reset_email
+
+# Configuration
+EMAIL_TRANSPORT = os.environ.get("EMAIL_TRANSPORT", "sendgrid")  # sendgrid or file
+EMAIL_SINK_PATH = os.environ.get("EMAIL_SINK_PATH", "email_sink.jsonl")
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", "20"))
+EMAIL_WORKER_CONCURRENCY = int(os.environ.get("EMAIL_WORKER_CONCURRENCY", "4"))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE_SECONDS = 30
+EMAIL_RETRY_MAX_SECONDS = 3600
+EMAIL_POLL_SECONDS = 5
+# Delivered rows are kept briefly for debugging, dead letters a little longer;
+# payloads (which hold verification and reset codes) are cleared as soon as a row is done
+EMAIL_SENT_RETENTION_HOURS = int(os.environ.get("EMAIL_SENT_RETENTION_HOURS", "24"))
+EMAIL_FAILED_RETENTION_DAYS = int(os.environ.get("EMAIL_FAILED_RETENTION_DAYS", "7"))
+EMAIL_PURGE_SECONDS = 3600
+
+# Email kinds and the email_service function that renders and sends each one
+EMAIL_SENDERS = {
+    "verification": send_verification_email,
+    "password_reset": send_password_reset_email,
+    "welcome": send_welcome_email,
+}
+
+
+# =============================================================================
+# TRANSPORTS
+# =============================================================================
+
+class SendGridTransport:
+    """Deliver through SendGrid using the templates in email_service"""
+
+    def send(self, kind: str, to_email: str, params: dict) -> bool:
+        return EMAIL_SENDERS[kind](to_email, **params)
+
+
+class FileTransport:
+    """Append each email as a JSON line to a local file (tests and local development)"""
+
+    def __init__(self, path: str = EMAIL_SINK_PATH):
+        self.path = path
+
+    def send(self, kind: str, to_email: str, params: dict) -> bool:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"kind": kind, "to_email": to_email, "params": params}) + "\n")
+        return True
+
+
+_transport = None
+
+
+def get_transport():
+    """Get the configured email transport (EMAIL_TRANSPORT=sendgrid|file)"""
+    global _transport
+    if _transport is None:
+        _transport = FileTransport() if EMAIL_TRANSPORT == "file" else SendGridTransport()
+    return _transport
+
+
+def set_transport(transport):
+    """Replace the email transport (e.g. with a FileTransport in tests)"""
+    global _transport
+    _transport = transport
+
+
+# =============================================================================
+# OUTBOX
+# =============================================================================
+
+_wakeup: Optional[asyncio.Event] = None
+
+
+def enqueue_email(kind: str, to_email: str, **params) -> int:
+    """
+    Store an email in the outbox for background delivery
+
+    Returns:
+        The outbox row id
+    """
+    if kind not in EMAIL_SENDERS:
+        raise ValueError(f"Unknown email kind: {kind}")
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO email_outbox (kind, to_email, payload, next_attempt_at)
+        VALUES (?, ?, ?, ?)
+    """, (kind, to_email, json.dumps(params), datetime.utcnow()))
+    conn.commit()
+    outbox_id = cursor.lastrowid
+    conn.close()
+
+    print(f"[OUTBOX] Queued {kind} email to {to_email} (ID: {outbox_id})")
+    if _wakeup is not None:
+        _wakeup.set()
+    return outbox_id
+
+
+def _claim_batch() -> list:
+    """Mark a batch of due emails as sending and return them"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE email_outbox
+        SET status = 'sending', attempts = attempts + 1
+        WHERE id IN (
+            SELECT id FROM email_outbox
+            WHERE status = 'pending' AND next_attempt_at <= ?
+            ORDER BY id
+            LIMIT ?
+        )
+        RETURNING id, kind, to_email, payload, attempts
+    """, (datetime.utcnow(), EMAIL_BATCH_SIZE))
+    rows = [dict(row) for row in cursor.fetchall()]
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def _record_results(results: list):
+    """Mark delivered emails as sent and schedule retries (or give up) for failures"""
+    now = datetime.utcnow()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    for row, error in results:
+        if error is None:
+            cursor.execute(
+                "UPDATE email_outbox SET status = 'sent', sent_at = ?, last_error = NULL, payload = '' WHERE id = ?",
+                (now, row["id"])
+            )
+        elif row["attempts"] >= EMAIL_MAX_ATTEMPTS:
+            cursor.execute(
+                "UPDATE email_outbox SET status = 'failed', last_error = ?, payload = '' WHERE id = ?",
+                (error, row["id"])
+            )
+            print(f"[OUTBOX] Giving up on email {row['id']} to {row['to_email']}: {error}")
+        else:
+            delay = min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1))
+            cursor.execute(
+                "UPDATE email_outbox SET status = 'pending', next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (now + timedelta(seconds=delay), error, row["id"])
+            )
+
+    conn.commit()
+    conn.close()
+
+
+def recover_stuck_emails():
+    """Return emails left in 'sending' by a crashed worker to the queue"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE email_outbox SET status = 'pending' WHERE status = 'sending'")
+    conn.commit()
+    conn.close()
+
+
+def purge_outbox() -> int:
+    """
+    Delete sent emails older than EMAIL_SENT_RETENTION_HOURS and failed ones older
+    than EMAIL_FAILED_RETENTION_DAYS
+
+    Returns:
+        Number of rows deleted
+    """
+    now = datetime.utcnow()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        DELETE FROM email_outbox
+        WHERE (status = 'sent' AND sent_at < ?)
+           OR (status = 'failed' AND created_at < ?)
+    """, (now - timedelta(hours=EMAIL_SENT_RETENTION_HOURS), now - timedelta(days=EMAIL_FAILED_RETENTION_DAYS)))
+    deleted = cursor.rowcount
+    conn.commit()
+    conn.close()
+
+    if deleted:
+        print(f"[OUTBOX] Purged {deleted} old emails")
+    return deleted
+
+
+async def _deliver(row: dict, semaphore: asyncio.Semaphore):
+    """Send one email on a worker thread; returns (row, error or None)"""
+    async with semaphore:
+        try:
+            loop = asyncio.get_running_loop()
+            sent = await loop.run_in_executor(
+                None, get_transport().send, row["kind"], row["to_email"], json.loads(row["payload"])
+            )
+            return row, None if sent else "transport returned failure"
+        except Exception as e:
+            return row, f"{type(e).__name__}: {e}"
+
+
+async def process_outbox_once() -> int:
+    """
+    Deliver one batch of due emails
+
+    Returns:
+        Number of emails attempted
+    """
+    rows = _claim_batch()
+    if not rows:
+        return 0
+
+    semaphore = asyncio.Semaphore(EMAIL_WORKER_CONCURRENCY)
+    results = await asyncio.gather(*(_deliver(row, semaphore) for row in rows))
+    _record_results(results)
+
+    sent = sum(1 for _, error in results if error is None)
+    print(f"[OUTBOX] Delivered {sent}/{len(rows)} emails")
+    return len(rows)
+
+
+async def run_outbox_worker():
+    """Background loop: deliver due emails, then sleep until woken or the poll interval passes"""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    recover_stuck_emails()
+    print("[OUTBOX] Email worker started")
+    last_purge = 0.0
+
+    while True:
+        _wakeup.clear()
+        try:
+            if time.monotonic() - last_purge >= EMAIL_PURGE_SECONDS:
+                purge_outbox()
+                last_purge = time.monotonic()
+            # Keep draining while full batches come back
+            while await process_outbox_once() >= EMAIL_BATCH_SIZE:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[OUTBOX] Worker error: {e}")
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=EMAIL_POLL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
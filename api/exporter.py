@@ -0,0 +1,148 @@
+"""
+Racket Pro Analyzer - Export
+Streams a user's full game history as NDJSON, CSV or Parquet, reading the
+database in fixed-size chunks so memory stays constant for any history size
+"""
+
+import csv
+import io
+import json
+from typing import Iterator, List, Optional
+
+from api.database import get_db_connection
+
+EXPORT_CHUNK_SIZE = 1000
+PARQUET_ROW_GROUP_SIZE = 10000
+UTF8_BOM = "\ufeff"  # Lets spreadsheets detect UTF-8 CSV
+
+# Columns in export order; the *_name columns import back through /api/import
+EXPORT_COLUMNS = [
+    "id", "sport", "game_type", "game_date", "result", "score", "detailed_score",
+    "opponent_name", "opponent2_name", "partner_name", "location", "notes", "created_at",
+]
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def iter_game_chunks(user_id: int, sport: Optional[str] = None, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[List[tuple]]:
+    """Yield the user's games (oldest first, player names joined) in chunks of rows."""
+    query = """
+        SELECT g.id, g.sport, g.game_type, g.game_date, g.result, g.score, g.detailed_score,
+               p1.name as opponent_name,
+               p2.name as opponent2_name,
+               p3.name as partner_name,
+               g.location, g.notes, g.created_at
+        FROM games g
+        LEFT JOIN players p1 ON g.opponent_id = p1.id
+        LEFT JOIN players p2 ON g.opponent2_id = p2.id
+        LEFT JOIN players p3 ON g.partner_id = p3.id
+        WHERE g.user_id = ?
+    """
+    params = [user_id]
+    if sport:
+        query += " AND g.sport = ?"
+        params.append(sport)
+    query += " ORDER BY g.game_date ASC, g.id ASC"
+
+    # StreamingResponse advances this generator on whichever threadpool worker is free
+    conn = get_db_connection(check_same_thread=False)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [tuple(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def stream_ndjson(user_id: int, sport: Optional[str] = None) -> Iterator[bytes]:
+    """One JSON object per line."""
+    for rows in iter_game_chunks(user_id, sport):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+def stream_csv(user_id: int, sport: Optional[str] = None) -> Iterator[bytes]:
+    """CSV with a header row (and a BOM so spreadsheets detect UTF-8)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield (UTF8_BOM + buffer.getvalue()).encode("utf-8")
+
+    for rows in iter_game_chunks(user_id, sport):
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file that hands written bytes to the stream instead of keeping them"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def take(self) -> bytes:
+        """Return and forget everything written since the last call."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_parquet(user_id: int, sport: Optional[str] = None) -> Iterator[bytes]:
+    """Parquet file written one row group at a time."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [pa.field("id", pa.int64())] + [pa.field(name, pa.string()) for name in EXPORT_COLUMNS[1:]]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in iter_game_chunks(user_id, sport, PARQUET_ROW_GROUP_SIZE):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(columns[0], pa.int64())]
+                + [pa.array([None if v is None else str(v) for v in column], pa.string()) for column in columns[1:]],
+                schema=schema
+            ))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+STREAMERS = {
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+    "parquet": stream_parquet,
+}
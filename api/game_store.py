@@ -0,0 +1,288 @@
+"""
+Racket Pro Analyzer - Game Store
+Per-user columnar copy of the games table (one NumPy array per field) shared
+by the analytics modules. Loaded lazily, patched in place on writes and
+evicted least-recently-used under a global memory budget
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.database import get_db_connection, get_data_version
+from api.models import SPORTS, RESULTS
+
+# Configuration
+GAME_STORE_ENABLED = os.environ.get("GAME_STORE_ENABLED", "true").lower() != "false"
+GAME_STORE_MAX_BYTES = int(os.environ.get("GAME_STORE_MAX_MB", "64")) * 1024 * 1024
+
+# Codes stored in the sport and result columns (index into these lists)
+SPORT_CODES = list(SPORTS)
+RESULT_CODES = RESULTS
+WIN, LOSS, DRAW = (RESULT_CODES.index(r) for r in ("win", "loss", "draw"))
+
+COLUMN_TYPES = {
+    "id": np.int64,
+    "day": np.int32,           # days since 1970-01-01
+    "sport": np.int8,          # index into SPORT_CODES
+    "doubles": np.bool_,
+    "result": np.int8,         # index into RESULT_CODES
+    "opponent_id": np.int64,   # 0 when empty
+    "opponent2_id": np.int64,
+    "partner_id": np.int64,
+    "sets_won": np.int16,      # from score
+    "sets_lost": np.int16,
+    "detail_sets_won": np.int16,  # from detailed_score
+    "detail_sets_lost": np.int16,
+    "points_won": np.int32,    # summed over detailed_score sets
+    "points_lost": np.int32,
+}
+
+_SET_COUNT_IN_PARENS = re.compile(r"\(([^),]+)\)")
+_LEADING_PAIR = re.compile(r"^(\d+)-(\d+)")
+_PAIR = re.compile(r"(\d+)-(\d+)")
+
+
+# =============================================================================
+# SCORE PARSING
+# =============================================================================
+
+def parse_score(score: Optional[str]) -> tuple:
+    """
+    Get (sets won, sets lost) from a score string.
+    Accepts "2-1", "1-0 (3-0)" (set count in parentheses) and
+    "3-0 (11-5, 11-3, 11-7)" (set count before the per-set points).
+    """
+    if not score:
+        return 0, 0
+
+    paren = _SET_COUNT_IN_PARENS.search(score)
+    if paren:
+        pair = _PAIR.search(paren.group(1))
+        if pair:
+            return int(pair.group(1)), int(pair.group(2))
+
+    pair = _LEADING_PAIR.match(score)
+    if pair:
+        return int(pair.group(1)), int(pair.group(2))
+    return 0, 0
+
+
+def parse_detailed_score(detailed_score: Optional[str]) -> List[tuple]:
+    """Get per-set (points won, points lost) from a score like "11-5,8-11,12-10"."""
+    if not detailed_score:
+        return []
+    return [(int(a), int(b)) for a, b in _PAIR.findall(detailed_score)]
+
+
+# =============================================================================
+# COLUMNS
+# =============================================================================
+
+def _column_values(game) -> tuple:
+    """One game row (sqlite3.Row or dict) as a tuple in COLUMN_TYPES order."""
+    set_scores = parse_detailed_score(game["detailed_score"])
+    sets_won, sets_lost = parse_score(game["score"])
+    return (
+        game["id"],
+        np.datetime64(game["game_date"][:10], "D").astype(np.int64),
+        SPORT_CODES.index(game["sport"]),
+        game["game_type"] == "doubles",
+        RESULT_CODES.index(game["result"]),
+        game["opponent_id"] or 0,
+        game["opponent2_id"] or 0,
+        game["partner_id"] or 0,
+        sets_won,
+        sets_lost,
+        sum(1 for a, b in set_scores if a > b),
+        sum(1 for a, b in set_scores if b > a),
+        sum(a for a, _ in set_scores),
+        sum(b for _, b in set_scores),
+    )
+
+
+def build_columns(games: list) -> Dict[str, np.ndarray]:
+    """Columns for games already sorted by (game_date, id)."""
+    values = [_column_values(game) for game in games]
+    return {
+        name: np.array([row[i] for row in values], dtype=dtype)
+        for i, (name, dtype) in enumerate(COLUMN_TYPES.items())
+    }
+
+
+class UserGames:
+    """A user's games as parallel arrays sorted by (day, id)."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], version: int):
+        self.columns = columns
+        self.version = version
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays."""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def _order_keys(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Sort keys combining day and id."""
+        return (columns["day"].astype(np.int64) << 32) | columns["id"]
+
+    def remove(self, game_id: int):
+        """Drop a game if present (arrays are replaced, never mutated, so readers keep a consistent view)."""
+        keep = self.columns["id"] != game_id
+        if not keep.all():
+            self.columns = {name: column[keep] for name, column in self.columns.items()}
+
+    def upsert(self, game):
+        """Insert or replace one game at its sorted position."""
+        self.remove(game["id"])
+        new = build_columns([game])
+        position = int(np.searchsorted(self._order_keys(self.columns), self._order_keys(new)[0]))
+        self.columns = {
+            name: np.insert(column, position, new[name]) for name, column in self.columns.items()
+        }
+
+    def select(self, sport: Optional[str] = None, since: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Columns filtered by sport and first date (ISO), still sorted by date."""
+        columns = self.columns
+        mask = np.ones(len(columns["id"]), dtype=bool)
+        if sport:
+            mask &= columns["sport"] == SPORT_CODES.index(sport)
+        if since:
+            mask &= columns["day"] >= np.datetime64(since, "D").astype(np.int64)
+        if mask.all():
+            return columns
+        return {name: column[mask] for name, column in columns.items()}
+
+
+def load_user_games(user_id: int) -> UserGames:
+    """Read a user's games from SQLite into columns."""
+    version = get_data_version(user_id)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, game_date, sport, game_type, result, opponent_id, opponent2_id, partner_id,
+               score, detailed_score
+        FROM games WHERE user_id = ?
+        ORDER BY game_date ASC, id ASC
+    """, (user_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return UserGames(build_columns(rows), version)
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+class GameStore:
+    """
+    LRU of UserGames under GAME_STORE_MAX_BYTES. Each entry remembers the
+    data version it reflects: writes that patch it advance the version, and
+    an entry left behind by any other write is reloaded on the next read.
+    """
+
+    def __init__(self, max_bytes: int = GAME_STORE_MAX_BYTES, enabled: bool = GAME_STORE_ENABLED):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._users: "OrderedDict[int, UserGames]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> UserGames:
+        """Get a user's games, loading them on first use or after an unpatched write."""
+        if self.enabled:
+            with self._lock:
+                games = self._users.get(user_id)
+                if games is not None and games.version == get_data_version(user_id):
+                    self._users.move_to_end(user_id)
+                    return games
+
+        games = load_user_games(user_id)
+        if self.enabled:
+            with self._lock:
+                self._discard(user_id)
+                if games.version == get_data_version(user_id):
+                    self._users[user_id] = games
+                    self._bytes += games.nbytes
+                    self._evict()
+        return games
+
+    def record_upsert(self, user_id: int, game, version: int):
+        """Apply a created or updated game row (call with the version returned by bump_data_version)."""
+        self._patch(user_id, version, lambda games: games.upsert(game))
+
+    def record_delete(self, user_id: int, game_id: int, version: int):
+        """Apply a deleted game."""
+        self._patch(user_id, version, lambda games: games.remove(game_id))
+
+    def record_batch(self, user_id: int, games: Dict[int, Optional[dict]], version: int):
+        """Apply the final state of several games at once (None for deleted ones)."""
+        def change(user_games):
+            for game_id, game in games.items():
+                if game is None:
+                    user_games.remove(game_id)
+                else:
+                    user_games.upsert(game)
+        self._patch(user_id, version, change)
+
+    def record_unchanged(self, user_id: int, version: int):
+        """Keep an entry current across a write that did not touch games (e.g. players)."""
+        self._patch(user_id, version, lambda games: None)
+
+    def _patch(self, user_id: int, version: int, change):
+        """Apply change to a cached entry that is exactly one version behind."""
+        with self._lock:
+            games = self._users.get(user_id)
+            if games is None:
+                return
+            if games.version != version - 1:
+                # Missed a write in between - reload on next read
+                self._discard(user_id)
+                return
+            self._bytes -= games.nbytes
+            try:
+                change(games)
+            except (ValueError, KeyError, TypeError) as e:
+                # A row the columns cannot hold - drop the entry, never fail the write
+                print(f"[GAME_STORE] Could not patch user {user_id}, evicting: {e}")
+                self._users.pop(user_id, None)
+                return
+            games.version = version
+            self._bytes += games.nbytes
+            self._evict()
+
+    def _discard(self, user_id: int):
+        """Remove a user's entry, if cached."""
+        games = self._users.pop(user_id, None)
+        if games is not None:
+            self._bytes -= games.nbytes
+
+    def _evict(self):
+        """Drop least recently used users until under budget (the newest always stays)."""
+        while self._bytes > self.max_bytes and len(self._users) > 1:
+            _, games = self._users.popitem(last=False)
+            self._bytes -= games.nbytes
+
+    def stats(self) -> Dict:
+        """Cached users and bytes used."""
+        with self._lock:
+            return {"users": len(self._users), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+# Singleton instance
+_game_store = None
+
+
+def get_game_store():
+    """Get singleton GameStore instance"""
+    global _game_store
+    if _game_store is None:
+        _game_store = GameStore()
+    return _game_store
@@ -0,0 +1,148 @@
+"""
+Google Sign-In verification for Racket Pro Analyzer
+Verifies Google ID tokens against an in-memory cache of Google's signing certs
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from google.auth import jwt as google_jwt
+
+# Configuration
+GOOGLE_CERTS_URL = os.environ.get("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+# Point at a local JSON file of {"key id": "x509 certificate"} to skip the network (tests/offline dev)
+GOOGLE_CERTS_FILE = os.environ.get("GOOGLE_CERTS_FILE", "")
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+DEFAULT_MAX_AGE = 3600  # Used when Google sends no Cache-Control max-age
+REFRESH_MARGIN = 300  # Start a background refresh this many seconds before expiry
+MIN_FORCED_REFRESH_INTERVAL = 60  # Unknown key ids refetch at most this often
+CLOCK_SKEW_SECONDS = 10
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleCertVerifier:
+    def __init__(self, certs_url: str = GOOGLE_CERTS_URL, certs_file: str = GOOGLE_CERTS_FILE):
+        """Initialize the verifier with an empty cert cache"""
+        self.certs_url = certs_url
+        self.certs_file = certs_file
+        self.session = requests.Session()
+        self._certs: Dict[str, str] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()  # Single-flight: one fetch at a time
+        self._refreshing = False
+
+    def _fetch(self):
+        """
+        Fetch certs from Google (or the local file) and store them
+
+        Returns:
+            The fetched certs mapping
+        """
+        if self.certs_file:
+            with open(self.certs_file, "r", encoding="utf-8") as f:
+                certs = json.load(f)
+            expires_at = float("inf")
+        else:
+            response = self.session.get(self.certs_url, timeout=10)
+            response.raise_for_status()
+            certs = response.json()
+            match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+            max_age = int(match.group(1)) if match else DEFAULT_MAX_AGE
+            expires_at = time.time() + max_age
+
+        with self._lock:
+            self._certs = certs
+            self._expires_at = expires_at
+            self._fetched_at = time.time()
+        source = self.certs_file or f"{self.certs_url} (max-age {expires_at - time.time():.0f}s)"
+        print(f"[GOOGLE] Loaded {len(certs)} signing certs from {source}")
+        return certs
+
+    def _background_refresh(self):
+        """Refresh the certs in a daemon thread, keeping the current ones on failure"""
+        try:
+            with self._fetch_lock:
+                self._fetch()
+        except Exception as e:
+            print(f"[GOOGLE] Background cert refresh failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def _needs_fetch(self, force_refresh: bool) -> bool:
+        """Cache is empty or expired, or a forced refetch is allowed (at most once per MIN_FORCED_REFRESH_INTERVAL)"""
+        now = time.time()
+        if not self._certs or now >= self._expires_at:
+            return True
+        return force_refresh and now - self._fetched_at >= MIN_FORCED_REFRESH_INTERVAL
+
+    def get_certs(self, force_refresh: bool = False) -> Dict[str, str]:
+        """
+        Get Google's signing certs from cache
+
+        Blocks on a fetch only when the cache is empty, expired or forced;
+        close to expiry it serves the cached certs and refreshes in the background.
+        Concurrent callers wait for the one fetch in flight instead of starting their own.
+        """
+        if self._needs_fetch(force_refresh):
+            with self._fetch_lock:
+                # Another caller may have fetched while we waited
+                if self._needs_fetch(force_refresh):
+                    return self._fetch()
+                return self._certs
+
+        now = time.time()
+
+        if now >= self._expires_at - REFRESH_MARGIN:
+            with self._lock:
+                start_refresh = not self._refreshing
+                self._refreshing = True
+            if start_refresh:
+                threading.Thread(target=self._background_refresh, daemon=True).start()
+
+        return self._certs
+
+    def verify(self, token: str, audience: Optional[str] = None) -> dict:
+        """
+        Verify a Google ID token (blocking: may fetch certs, call from a worker thread)
+
+        Raises:
+            ValueError: If the token is invalid, expired or from a wrong issuer
+        """
+        certs = self.get_certs()
+
+        # Unknown key id usually means Google rotated its keys - refetch once
+        key_id = google_jwt.decode_header(token).get("kid")
+        if key_id and key_id not in certs:
+            certs = self.get_certs(force_refresh=True)
+
+        idinfo = google_jwt.decode(
+            token,
+            certs=certs,
+            audience=audience,
+            clock_skew_in_seconds=CLOCK_SKEW_SECONDS,
+        )
+
+        if idinfo.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+
+        return idinfo
+
+
+# Singleton instance
+_google_verifier = None
+
+
+def get_google_verifier():
+    """Get singleton GoogleCertVerifier instance"""
+    global _google_verifier
+    if _google_verifier is None:
+        _google_verifier = GoogleCertVerifier()
+    return _google_verifier
@@ -0,0 +1,182 @@
+"""
+Racket Pro Analyzer - Image Variants
+Resized AVIF/WebP/PNG copies of the sport icons and app icons at the sizes the
+pages render them. Generated at build time (python -m api.images, run by the
+Dockerfile) into static/images/variants; the asset pipeline points references
+at them and the server picks AVIF or WebP from the request's Accept header
+"""
+
+import fnmatch
+import io
+import mimetypes
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+VARIANTS_DIR = "images/variants"
+
+# Source image -> widths to generate (rendered CSS width at 1x and 2x) and the
+# width used where there is no srcset (<link> icons, manifest.json, scripts)
+IMAGE_VARIANTS = {
+    "images/sports/*.png": {"widths": [40, 80, 160], "default": 80},
+    # App icons: the default size stays PNG-only for the manifest and touch icons
+    "images/icon-192.png": {"widths": [48, 96, 120, 192, 240], "default": 192, "png_default": True},
+    "images/icon-512.png": {"widths": [512], "default": 512, "png_default": True},
+}
+
+# Best first; PNG is the fallback every variant has
+IMAGE_FORMATS = ["avif", "webp", "png"]
+ENCODER_OPTIONS = {
+    "avif": {"quality": 60},
+    "webp": {"quality": 80, "method": 6},
+    "png": {"optimize": True},
+}
+
+mimetypes.add_type("image/avif", ".avif")
+mimetypes.add_type("image/webp", ".webp")
+
+_VARIANT_NAME = re.compile(r"^(.+)-(\d+)w\.(avif|webp|png)$")
+_IMG_TAG = re.compile(r"<img\b[^>]*>")
+_IMG_SRC = re.compile(r'\bsrc="/static/([^"]+)"')
+_IMG_WIDTH = re.compile(r'\bwidth="(\d+)"')
+
+
+def variant_spec(source: str) -> Optional[Dict]:
+    """IMAGE_VARIANTS entry for a source path relative to static/, if any."""
+    for pattern, spec in IMAGE_VARIANTS.items():
+        if fnmatch.fnmatch(source, pattern):
+            return spec
+    return None
+
+
+def variant_path(source: str, width: int, fmt: str) -> str:
+    """Path of one variant ("images/sports/tennis.png" -> "images/variants/sports/tennis-80w.webp")."""
+    stem = os.path.splitext(source[len("images/"):])[0]
+    return f"{VARIANTS_DIR}/{stem}-{width}w.{fmt}"
+
+
+def find_variants(static_dir: str = STATIC_DIR) -> Dict[str, Dict[int, Dict[str, str]]]:
+    """Generated variants on disk: {source: {width: {format: path}}}."""
+    variants: Dict[str, Dict[int, Dict[str, str]]] = {}
+    root = os.path.join(static_dir, VARIANTS_DIR)
+    if not os.path.isdir(root):
+        return variants
+    for directory, _, files in os.walk(root):
+        for name in files:
+            match = _VARIANT_NAME.match(name)
+            if not match:
+                continue
+            path = os.path.relpath(os.path.join(directory, name), static_dir).replace(os.sep, "/")
+            stem = os.path.dirname(path)[len(VARIANTS_DIR):].strip("/")
+            source = "/".join(filter(None, ["images", stem, match.group(1) + ".png"]))
+            variants.setdefault(source, {}).setdefault(int(match.group(2)), {})[match.group(3)] = path
+    return variants
+
+
+def default_variant(source: str, widths: Dict[int, Dict[str, str]]) -> Optional[str]:
+    """PNG variant to use where there is no srcset."""
+    spec = variant_spec(source)
+    if not spec or spec["default"] not in widths:
+        return None
+    return widths[spec["default"]].get("png")
+
+
+def add_srcset(html: bytes, variants: Dict[str, Dict[int, Dict[str, str]]]) -> bytes:
+    """
+    Point <img> tags with a width attribute at the smallest variants covering
+    1x and 2x screens (src plus an x-descriptor srcset).
+    """
+    def rewrite(match):
+        tag = match.group(0)
+        src, width = _IMG_SRC.search(tag), _IMG_WIDTH.search(tag)
+        if not src or not width or "srcset=" in tag or src.group(1) not in variants:
+            return tag
+        available = sorted(w for w, formats in variants[src.group(1)].items() if "png" in formats)
+        candidates = []
+        for density in (1, 2):
+            needed = int(width.group(1)) * density
+            chosen = next((w for w in available if w >= needed), available[-1] if available else None)
+            if chosen is not None and chosen not in [c for c, _ in candidates]:
+                candidates.append((chosen, density))
+        if not candidates:
+            return tag
+        paths = {w: variants[src.group(1)][w]["png"] for w, _ in candidates}
+        srcset = ", ".join(f"/static/{paths[w]} {density}x" for w, density in candidates)
+        tag = tag.replace(src.group(0), f'src="/static/{paths[candidates[0][0]]}"', 1)
+        return tag[:-1].rstrip("/").rstrip() + f' srcset="{srcset}">'
+    return _IMG_TAG.sub(rewrite, html.decode("utf-8")).encode("utf-8")
+
+
+def negotiate_image(accept: Optional[str], alternatives: Dict[str, str]) -> Optional[str]:
+    """Best alternative format the client accepts ("avif" or "webp"), or None."""
+    accept = accept or ""
+    for fmt in IMAGE_FORMATS[:-1]:
+        if fmt in alternatives and f"image/{fmt}" in accept:
+            return alternatives[fmt]
+    return None
+
+
+# =============================================================================
+# GENERATION (build time)
+# =============================================================================
+
+def generate_variants(static_dir: str = STATIC_DIR) -> List[Dict]:
+    """
+    Write every variant in IMAGE_VARIANTS under static_dir.
+
+    Returns:
+        One report row per source: original bytes and bytes per format
+    """
+    from PIL import Image, features
+
+    formats = [fmt for fmt in IMAGE_FORMATS if fmt == "png" or features.check(fmt)]
+    report = []
+    for directory, _, files in os.walk(os.path.join(static_dir, "images")):
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            source = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            spec = variant_spec(source)
+            if not spec or source.startswith(VARIANTS_DIR + "/"):
+                continue
+
+            image = Image.open(path)
+            image.load()
+            row = {"source": source, "original": os.path.getsize(path), "formats": {}}
+            for width in spec["widths"]:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+                png_only = spec.get("png_default") and width == spec["default"]
+                for fmt in (["png"] if png_only else formats):
+                    buffer = io.BytesIO()
+                    resized.save(buffer, fmt.upper(), **ENCODER_OPTIONS[fmt])
+                    target = os.path.join(static_dir, variant_path(source, width, fmt))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, "wb") as f:
+                        f.write(buffer.getvalue())
+                    sizes = row["formats"].setdefault(fmt, {})
+                    sizes[width] = buffer.tell()
+            report.append(row)
+    return report
+
+
+def print_report(report: List[Dict]):
+    """Bytes per source: original vs. the variant served at the default width in each format."""
+    total_original = total_served = 0
+    print(f"{'source':<36}{'original':>12}" + "".join(f"{fmt:>10}" for fmt in IMAGE_FORMATS))
+    for row in report:
+        default = variant_spec(row["source"])["default"]
+        sizes = {fmt: by_width.get(default) for fmt, by_width in row["formats"].items()}
+        best = next(sizes[fmt] for fmt in IMAGE_FORMATS if sizes.get(fmt))
+        total_original += row["original"]
+        total_served += best
+        print(f"{row['source']:<36}{row['original']:>12}"
+              + "".join(f"{sizes.get(fmt) or '-':>10}" for fmt in IMAGE_FORMATS))
+    saved = total_original - total_served
+    print(f"\nOriginals {total_original} bytes, best default variants {total_served} bytes: "
+          f"{saved} bytes saved ({saved * 100 // max(total_original, 1)}%)")
+
+
+if __name__ == "__main__":
+    print_report(generate_variants(sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR))
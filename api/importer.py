@@ -0,0 +1,221 @@
+"""
+Racket Pro Analyzer - Bulk Import
+Imports games (and the players they reference, by name) from CSV or JSON in
+one transaction with batched inserts
+"""
+
+import csv
+import io
+import json
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from api.database import get_db_connection, get_or_create_venue, normalize_name
+from api.models import SPORTS, GAME_TYPES, RESULTS
+
+MAX_IMPORT_BYTES = 10 * 1024 * 1024
+# Request body limit: the file plus room for multipart headers and boundaries
+MAX_IMPORT_REQUEST_BYTES = MAX_IMPORT_BYTES + 64 * 1024
+MAX_IMPORT_ROWS = 20000
+
+GAME_FIELDS = [
+    "sport", "game_type", "game_date", "result", "opponent", "opponent2", "partner",
+    "score", "detailed_score", "location", "notes",
+]
+
+# Column name aliases, so files exported by this app (opponent_name, ...) import as-is
+FIELD_ALIASES = {
+    "opponent_name": "opponent",
+    "opponent2_name": "opponent2",
+    "partner_name": "partner",
+}
+
+# JSON rows may hold lists or objects; only single values are importable
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class ImportFileError(ValueError):
+    """The import file as a whole could not be read"""
+
+
+def parse_import(data: bytes, fmt: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Parse an import file into (players, games).
+
+    CSV: one game per row with a header (see GAME_FIELDS).
+    JSON: a list of games, or {"players": [...], "games": [...]}.
+
+    Raises:
+        ImportFileError: If the file is too large or malformed
+    """
+    if len(data) > MAX_IMPORT_BYTES:
+        raise ImportFileError(f"arquivo maior que {MAX_IMPORT_BYTES // (1024 * 1024)} MB")
+
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportFileError("o arquivo deve estar em UTF-8")
+
+    players: List[Dict] = []
+    if fmt == "csv":
+        games = list(csv.DictReader(io.StringIO(text)))
+    elif fmt == "json":
+        try:
+            payload = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ImportFileError(f"JSON inválido: {e}")
+        if isinstance(payload, dict):
+            players = payload.get("players") or []
+            games = payload.get("games") or []
+        else:
+            games = payload
+        if not isinstance(games, list) or not isinstance(players, list):
+            raise ImportFileError("esperado uma lista de jogos")
+    else:
+        raise ImportFileError(f"formato não suportado: {fmt}")
+
+    if len(games) + len(players) > MAX_IMPORT_ROWS:
+        raise ImportFileError(f"máximo de {MAX_IMPORT_ROWS} linhas por importação")
+
+    def clean(row) -> Dict:
+        """Trim values, turn blanks into None and map column aliases."""
+        if not isinstance(row, dict):
+            return {}
+        cleaned = {}
+        for key, value in row.items():
+            key = FIELD_ALIASES.get(str(key).strip(), str(key).strip())
+            if isinstance(value, str):
+                value = value.strip() or None
+            cleaned[key] = value
+        return cleaned
+
+    return [clean(row) for row in players], [clean(row) for row in games]
+
+
+def validate_scalars(row: Dict) -> Optional[str]:
+    """Error message if a field holds a list or object (JSON) instead of a single value, or None."""
+    for key, value in row.items():
+        if not isinstance(value, SCALAR_TYPES):
+            return f"Valor inválido para {key}: esperado texto ou número"
+    return None
+
+
+def validate_game(row: Dict) -> Optional[str]:
+    """Error message for an invalid game row, or None."""
+    sport = row.get("sport")
+    if sport not in SPORTS:
+        return f"Esporte inválido: {sport}"
+
+    game_type = row.get("game_type") or "singles"
+    if game_type not in GAME_TYPES:
+        return f"Tipo de jogo inválido: {game_type}"
+    if game_type not in SPORTS[sport]["game_types"]:
+        return f"{SPORTS[sport]['name']} não suporta jogos de {game_type}"
+
+    if row.get("result") not in RESULTS:
+        return f"Resultado inválido: {row.get('result')}"
+
+    try:
+        date.fromisoformat(str(row.get("game_date") or "")[:10])
+    except ValueError:
+        return f"Data inválida: {row.get('game_date')}"
+
+    if not row.get("opponent"):
+        return "Adversário é obrigatório"
+    if game_type == "doubles":
+        if not row.get("partner"):
+            return "Parceiro é obrigatório para jogos de duplas"
+        if not row.get("opponent2"):
+            return "Segundo adversário é obrigatório para jogos de duplas"
+    return None
+
+
+def import_records(user_id: int, players: List[Dict], games: List[Dict]) -> Dict:
+    """
+    Validate games, create missing players by name and insert everything in one
+    transaction. Invalid rows are skipped and reported.
+    """
+    started = time.perf_counter()
+
+    rejected = []
+    valid_games = []
+    for number, row in enumerate(games, start=1):
+        error = validate_scalars(row) or validate_game(row)
+        if error:
+            rejected.append({"row": number, "error": error})
+        else:
+            row["game_type"] = row.get("game_type") or "singles"
+            valid_games.append(row)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Existing players by (sport, normalized name)
+        cursor.execute("SELECT id, sport, normalized_name FROM players WHERE user_id = ?", (user_id,))
+        player_ids = {(row["sport"], row["normalized_name"]): row["id"] for row in cursor.fetchall()}
+
+        # Players listed explicitly, then any name referenced by a game
+        new_players: Dict[tuple, Dict] = {}
+        for player in players:
+            if validate_scalars(player) is None and player.get("sport") in SPORTS and player.get("name"):
+                player["name"] = str(player["name"])
+                key = (player["sport"], normalize_name(player["name"]))
+                if key[1] and key not in player_ids:
+                    new_players.setdefault(key, player)
+        for game in valid_games:
+            for role in ("opponent", "opponent2", "partner"):
+                if game.get(role):
+                    key = (game["sport"], normalize_name(str(game[role])))
+                    if key[1] and key not in player_ids:
+                        new_players.setdefault(key, {"sport": game["sport"], "name": str(game[role])})
+
+        cursor.executemany("""
+            INSERT INTO players (user_id, sport, name, normalized_name, dominant_hand, level, play_style, age_group, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (user_id, sport, player["name"].strip(), normalized_name,
+             player.get("dominant_hand") or "right", player.get("level") or "intermediate",
+             player.get("play_style") or "all_around", player.get("age_group") or "20_39",
+             player.get("notes"))
+            for (sport, normalized_name), player in new_players.items()
+        ])
+        cursor.execute("SELECT id, sport, normalized_name FROM players WHERE user_id = ?", (user_id,))
+        player_ids = {(row["sport"], row["normalized_name"]): row["id"] for row in cursor.fetchall()}
+
+        def player_id(game, role):
+            name = game.get(role)
+            return player_ids.get((game["sport"], normalize_name(str(name)))) if name else None
+
+        venue_ids = {}
+        for game in valid_games:
+            location = game.get("location")
+            if location and location not in venue_ids:
+                venue_ids[location] = get_or_create_venue(cursor, user_id, location)
+
+        cursor.executemany("""
+            INSERT INTO games (user_id, sport, game_type, opponent_id, opponent2_id, partner_id,
+                              game_date, result, score, detailed_score, location, venue_id, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (user_id, game["sport"], game["game_type"], player_id(game, "opponent"),
+             player_id(game, "opponent2"), player_id(game, "partner"),
+             str(game["game_date"])[:10], game["result"], game.get("score"), game.get("detailed_score"),
+             game.get("location"), venue_ids.get(game.get("location")), game.get("notes"))
+            for game in valid_games
+        ])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - started
+    return {
+        "games_imported": len(valid_games),
+        "players_created": len(new_players),
+        "rejected": rejected,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(len(valid_games) / seconds) if seconds > 0 else None,
+    }
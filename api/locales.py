@@ -0,0 +1,127 @@
+"""
+Racket Pro Analyzer - Locale Bundles
+Per-page translation bundles built with the static cache: only the keys a page
+and its scripts use, each locale merged over the pt-BR fallback. The page is
+served with the visitor's bundle inlined; the others are fingerprinted assets
+"""
+
+import json
+import os
+import re
+from typing import Dict, Iterable, Optional
+
+DEFAULT_LANGUAGE = "pt-BR"
+# Source locales under static/ and where the page bundles are served from
+LOCALES_DIR = "locales"
+BUNDLES_DIR = "locales/pages"
+# Set by i18n.js so the server can inline the right bundle
+LANGUAGE_COOKIE = "language"
+MAX_LOOKUP_KEYS = 100
+
+# Quoted keys ('games.title', data-i18n="nav.charts") and template prefixes (`achievements.names.${key}`)
+_KEY_LITERAL = re.compile(r"""["'`]([A-Za-z_]\w*(?:\.\w+)+)["'`]""")
+_KEY_PREFIX = re.compile(r"""`([A-Za-z_]\w*(?:\.\w+)*)\.\$\{""")
+_I18N_SCRIPT = re.compile(r'<script\b[^>]*\bsrc="/static/js/i18n[.\w]*\.js"')
+
+
+def load_locales(static_dir: str) -> Dict[str, Dict]:
+    """Every locale file, merged over the default language."""
+    directory = os.path.join(static_dir, LOCALES_DIR)
+    raw = {}
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    raw[name[:-len(".json")]] = json.load(f)
+    fallback = raw.get(DEFAULT_LANGUAGE, {})
+    return {language: merge(fallback, tree) for language, tree in raw.items()}
+
+
+def merge(fallback: Dict, overrides: Dict) -> Dict:
+    """Deep merge: overrides win, missing keys come from fallback."""
+    merged = dict(fallback)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def lookup(tree: Dict, key: str):
+    """Value (string or subtree) at a dotted key, or None."""
+    value = tree
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def referenced_keys(texts: Iterable[str]) -> tuple:
+    """(quoted keys, template prefixes) found in the given pages and scripts."""
+    literals, prefixes = set(), set()
+    for text in texts:
+        literals.update(_KEY_LITERAL.findall(text))
+        prefixes.update(_KEY_PREFIX.findall(text))
+    return literals, prefixes
+
+
+def select(tree: Dict, keys: Iterable[str]) -> Dict:
+    """Nested subset of tree holding only the given keys."""
+    selected: Dict = {}
+    for key in keys:
+        value = lookup(tree, key)
+        if value is None:
+            continue
+        *parents, last = key.split(".")
+        node = selected
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[last] = value
+    return selected
+
+
+def page_bundle(language: str, tree: Dict, referenced: tuple) -> Dict:
+    """
+    A page's bundle: the referenced keys of the language's tree (prefixes
+    stand for their subtree), plus the referenced keys under a known section
+    that no locale defines, so the client does not ask the server for them.
+    """
+    literals, prefixes = referenced
+    keys = {key for key in literals if lookup(tree, key) is not None}
+    keys |= {prefix for prefix in prefixes if isinstance(lookup(tree, prefix), dict)}
+    missing = {key for key in literals - keys if key.split(".")[0] in tree}
+    return {"language": language, "translations": select(tree, sorted(keys)), "missing": sorted(missing)}
+
+
+def uses_i18n(html: bytes) -> bool:
+    """Whether a page loads i18n.js (and so gets locale bundles)."""
+    return bool(_I18N_SCRIPT.search(html.decode("utf-8")))
+
+
+def bundle_path(page: str, language: str) -> str:
+    """Static path of a page's bundle ("games.html" -> "locales/pages/games/en-US.json")."""
+    return f"{BUNDLES_DIR}/{os.path.splitext(page)[0]}/{language}.json"
+
+
+def encode_bundle(bundle: Dict) -> bytes:
+    """Compact JSON for a bundle."""
+    return json.dumps(bundle, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def inline_bundle(html: bytes, bundle: Dict, bundles: Dict[str, str]) -> bytes:
+    """
+    Page with its bundle in window.I18N_BUNDLE (before i18n.js), plus the
+    URLs of every language's bundle for switching without a reload.
+    """
+    payload = encode_bundle({**bundle, "bundles": bundles}).decode("utf-8").replace("</", "<\\/")
+    script = f"<script>window.I18N_BUNDLE = {payload};</script>\n    "
+    text = html.decode("utf-8")
+    match = _I18N_SCRIPT.search(text)
+    return (text[:match.start()] + script + text[match.start():]).encode("utf-8")
+
+
+def resolve_language(requested: Optional[str], languages: Iterable[str]) -> str:
+    """Requested language if available, else the default."""
+    return requested if requested in set(languages) else DEFAULT_LANGUAGE
@@ -3,36 +3,53 @@ Racket Pro Analyzer - FastAPI Backend
 """
 
 import os
+import re
+import html
 import json
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
-import jwt
-from google.oauth2 import id_token
-from google.auth.transport import requests
+from starlette.concurrency import run_in_threadpool
 
 from api.database import (
-    get_db_connection, dict_from_row, ensure_db_initialized, save_to_cloud,
-    create_user, authenticate_user, get_user_by_email,
-    set_verification_code, verify_email as db_verify_email, is_email_verified,
-    update_user_password
+    get_db_connection, dict_from_row, ensure_db_initialized, save_to_cloud, bump_data_version,
+    create_user, authenticate_user, get_user_by_email, get_user_by_id,
+    invalidate_user_cache, set_verification_code, verify_email as db_verify_email, is_email_verified,
+    update_user_password, get_or_create_venue, normalize_name, create_game_with_effects,
+    get_idempotent_response, save_idempotent_response, idempotency_fingerprint, IdempotencyConflict,
+    get_app_setting, store_app_setting
 )
 from api.models import (
     UserCreate, UserResponse,
     PlayerCreate, PlayerUpdate, PlayerResponse,
-    GameCreate, GameUpdate, GameResponse,
+    GameCreate, GameUpdate, GameResponse, BatchRequest,
     SportStatistics, OverallStatistics,
     SPORTS, LEVELS, PLAY_STYLES, HANDS, GAME_TYPES, RESULTS
 )
-from api.auth import create_access_token as auth_create_token, get_password_hash
-from api.email_service import (
-    generate_verification_code, get_verification_code_expiry,
-    send_verification_email, send_welcome_email, send_password_reset_email
+from api.auth import (
+    create_access_token as auth_create_token, get_password_hash_async,
+    calibrate_password_hashing, verify_token, BCRYPT_ROUNDS_SETTING
 )
+from api.game_store import get_game_store
+from api.analytics import get_chart_data, get_head_to_head, H2H_ROLES, H2H_MAX_MEETINGS
+from api.match_simulator import predict_match
+from api.player_search import search_players
+from api.batch import apply_batch, validate_new_game, validate_game_update, BatchError
+from api.importer import parse_import, import_records, ImportFileError, MAX_IMPORT_BYTES, MAX_IMPORT_REQUEST_BYTES
+from api.exporter import STREAMERS, EXPORT_FORMATS
+from api.rollups import get_calendar, get_period_report, parse_period, MIN_YEAR, MAX_YEAR
+from api.timeseries import get_timeseries, parse_windows, GROUP_BY_OPTIONS, MAX_GAME_WINDOW, MAX_DAY_WINDOW
+from api.static_cache import get_static_cache, CachedStaticFiles, CompressionMiddleware
+from api.locales import lookup, LANGUAGE_COOKIE, MAX_LOOKUP_KEYS
+from api.google_auth import get_google_verifier
+from api.rate_limiter import check_rate_limit, record_failed_attempt
+from api.email_service import generate_verification_code, get_verification_code_expiry
+from api.email_outbox import enqueue_email, run_outbox_worker
 
 # =============================================================================
 # APP CONFIGURATION
@@ -53,17 +70,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON API responses (pages and assets are precompressed in the static cache)
+app.add_middleware(CompressionMiddleware)
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on application startup."""
     ensure_db_initialized()
+    # Calibrate once and share the cost, so every instance hashes with the same one
+    stored_rounds = get_app_setting(BCRYPT_ROUNDS_SETTING)
+    rounds = calibrate_password_hashing(stored_rounds)
+    if stored_rounds is None:
+        store_app_setting(BCRYPT_ROUNDS_SETTING, str(rounds))
+
+    # Read and precompress pages and text assets
+    get_static_cache()
+
+    # Warm the Google signing cert cache so the first sign-in skips the fetch
+    try:
+        get_google_verifier().get_certs()
+    except Exception as e:
+        print(f"[GOOGLE] Could not prefetch signing certs: {e}")
+
+    # Deliver queued emails in the background
+    app.state.outbox_worker = asyncio.create_task(run_outbox_worker())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers on application shutdown."""
+    app.state.outbox_worker.cancel()
 
 # Configuration
-# Import SECRET_KEY from auth module to ensure consistency
-from api.auth import SECRET_KEY
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID", "")
-ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_DAYS = 30
 
 # =============================================================================
@@ -72,29 +112,7 @@ ACCESS_TOKEN_EXPIRE_DAYS = 30
 
 def create_access_token(data: dict):
     """Create JWT access token."""
-    to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-
-
-def verify_token(authorization: Optional[str] = Header(None)):
-    """Verify JWT token and return user_id."""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Token não fornecido")
-
-    try:
-        token = authorization.replace("Bearer ", "")
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        # Support both "user_id" (Google auth) and "sub" (email/password auth) formats
-        user_id = payload.get("user_id") or payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-        return int(user_id)
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expirado")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Token inválido")
+    return auth_create_token(data, expires_delta=timedelta(days=ACCESS_TOKEN_EXPIRE_DAYS))
 
 
 def get_or_create_user(email: str, name: str = None, picture: str = None):
@@ -114,6 +132,7 @@ def get_or_create_user(email: str, name: str = None, picture: str = None):
                 (name, picture, datetime.utcnow(), user_id)
             )
             conn.commit()
+            invalidate_user_cache(user_id)
     else:
         cursor.execute(
             "INSERT INTO users (email, name, picture) VALUES (?, ?, ?)",
@@ -175,10 +194,8 @@ async def google_auth(data: dict):
         if not token:
             raise HTTPException(status_code=400, detail="Token não fornecido")
 
-        # Verify Google token
-        idinfo = id_token.verify_oauth2_token(
-            token, requests.Request(), GOOGLE_CLIENT_ID
-        )
+        # Verify Google token (signing certs are cached in memory; a fetch blocks, so off the event loop)
+        idinfo = await run_in_threadpool(get_google_verifier().verify, token, GOOGLE_CLIENT_ID)
 
         email = idinfo.get("email")
         name = idinfo.get("name")
@@ -228,13 +245,14 @@ async def dev_auth(data: dict):
 # =============================================================================
 
 @app.post("/api/auth/register")
-async def register(data: RegisterRequest):
+async def register(data: RegisterRequest, request: Request):
     """Register a new user with email/password - email verification is optional"""
+    check_rate_limit(request, "register", data.email)
 
     # Create user (email_verified=False by default)
     user = create_user(
         email=data.email,
-        password=data.password,
+        password_hash=await get_password_hash_async(data.password),
         name=data.name,
         plan="free"
     )
@@ -249,15 +267,11 @@ async def register(data: RegisterRequest):
     verification_code = generate_verification_code()
     expires_at = get_verification_code_expiry()
 
-    # Save verification code
+    # Queue verification email (delivered in the background, doesn't block registration),
+    # then save the code: that write syncs the database, queued email included
+    enqueue_email("verification", data.email, verification_code=verification_code, user_name=data.name or "")
     set_verification_code(user["id"], verification_code, expires_at)
 
-    # Send verification email (best effort, don't block registration)
-    email_sent = send_verification_email(data.email, verification_code, data.name or "")
-
-    if not email_sent:
-        print(f"[REGISTER] WARNING: Failed to send verification email to {data.email}")
-
     # Create access token immediately - user can login without verification
     access_token = auth_create_token(
         data={"sub": str(user["id"]), "email": user["email"], "plan": user["plan"]}
@@ -274,18 +288,20 @@ async def register(data: RegisterRequest):
             "plan": user["plan"],
             "email_verified": user.get("email_verified", False)
         },
-        "email_verification_sent": email_sent
+        "email_verification_sent": True
     }
 
 
 @app.post("/api/auth/login", response_model=LoginResponse)
-async def login(data: LoginRequest):
+async def login(data: LoginRequest, request: Request):
     """Login with email/password and get JWT access token"""
+    check_rate_limit(request, "login", data.email)
 
     # Authenticate user
-    user = authenticate_user(data.email, data.password)
+    user = await authenticate_user(data.email, data.password)
 
     if not user:
+        record_failed_attempt("login", data.email)
         raise HTTPException(
             status_code=401,
             detail="Email ou senha inválidos"
@@ -336,8 +352,8 @@ async def verify_email_endpoint(data: VerifyEmailRequest):
             detail="Código inválido ou expirado"
         )
 
-    # Send welcome email
-    send_welcome_email(data.email, user.get("name", ""))
+    # Queue welcome email
+    enqueue_email("welcome", data.email, user_name=user.get("name") or "")
 
     # Generate JWT token for automatic login
     access_token = auth_create_token({
@@ -359,8 +375,9 @@ async def verify_email_endpoint(data: VerifyEmailRequest):
 
 
 @app.post("/api/auth/resend-verification")
-async def resend_verification(data: ResendVerificationRequest):
+async def resend_verification(data: ResendVerificationRequest, request: Request):
     """Resend verification code to user email"""
+    check_rate_limit(request, "resend-verification", data.email)
 
     # Get user by email
     user = get_user_by_email(data.email)
@@ -382,18 +399,10 @@ async def resend_verification(data: ResendVerificationRequest):
     verification_code = generate_verification_code()
     expires_at = get_verification_code_expiry()
 
-    # Save new verification code
+    # Queue verification email, then save the new code (and sync both)
+    enqueue_email("verification", data.email, verification_code=verification_code, user_name=user.get("name") or "")
     set_verification_code(user["id"], verification_code, expires_at)
 
-    # Send verification email
-    email_sent = send_verification_email(data.email, verification_code, user.get("name", ""))
-
-    if not email_sent:
-        raise HTTPException(
-            status_code=500,
-            detail="Erro ao enviar email de verificação"
-        )
-
     return {
         "message": "Código reenviado com sucesso",
         "email": data.email
@@ -401,8 +410,9 @@ async def resend_verification(data: ResendVerificationRequest):
 
 
 @app.post("/api/auth/forgot-password")
-async def forgot_password(data: ForgotPasswordRequest):
+async def forgot_password(data: ForgotPasswordRequest, request: Request):
     """Request password reset - sends verification code to email (requires verified email)"""
+    check_rate_limit(request, "forgot-password", data.email)
 
     # Check if user exists
     user = get_user_by_email(data.email)
@@ -426,16 +436,14 @@ async def forgot_password(data: ForgotPasswordRequest):
     reset_code = generate_verification_code()
     expires_at = get_verification_code_expiry()
 
-    # Save reset code
+    # Queue password reset email, then save the reset code (and sync both)
+    enqueue_email("password_reset", data.email, reset_code=reset_code, user_name=user.get("name") or "")
     set_verification_code(user["id"], reset_code, expires_at)
 
-    # Send password reset email
-    email_sent = send_password_reset_email(data.email, reset_code, user.get("name", ""))
-
     return {
         "message": "Se este email estiver cadastrado, você receberá um código de redefinição.",
         "email": data.email,
-        "email_sent": email_sent
+        "email_sent": True
     }
 
 
@@ -469,7 +477,7 @@ async def reset_password(data: ResetPasswordRequest):
         )
 
     # Hash new password and update
-    hashed_password = get_password_hash(data.new_password)
+    hashed_password = await get_password_hash_async(data.new_password)
     success = update_user_password(user["id"], hashed_password)
 
     if not success:
@@ -487,11 +495,7 @@ async def reset_password(data: ResetPasswordRequest):
 @app.get("/api/auth/me")
 async def get_current_user(user_id: int = Depends(verify_token)):
     """Get current authenticated user."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    user = dict_from_row(cursor.fetchone())
-    conn.close()
+    user = get_user_by_id(user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
@@ -557,38 +561,119 @@ async def get_players(sport: Optional[str] = None, user_id: int = Depends(verify
     return players
 
 
+@app.get("/api/players/search")
+async def search_players_by_name(
+    q: str,
+    sport: Optional[str] = None,
+    limit: int = 10,
+    user_id: int = Depends(verify_token)
+):
+    """Fuzzy search players by name (case and accent insensitive), best matches first."""
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
+
+    return search_players(user_id, q, sport, max(1, min(limit, 50)))
+
+
+@app.get("/api/players/{player_id}/head-to-head")
+async def get_player_head_to_head(
+    player_id: int,
+    role: str = "opponent",
+    game_type: Optional[str] = None,
+    last: int = 10,
+    period: str = "all",
+    user_id: int = Depends(verify_token)
+):
+    """Get record, set/point totals, streaks and last meetings against (or with) a player (period: "all" or days)."""
+    if role not in H2H_ROLES:
+        raise HTTPException(status_code=400, detail=f"Papel inválido: {role}")
+    if game_type and game_type not in GAME_TYPES:
+        raise HTTPException(status_code=400, detail=f"Tipo de jogo inválido: {game_type}")
+    period = validate_period(period)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM players WHERE id = ? AND user_id = ?", (player_id, user_id))
+    player = dict_from_row(cursor.fetchone())
+    conn.close()
+
+    if not player:
+        raise HTTPException(status_code=404, detail="Jogador não encontrado")
+
+    h2h = get_head_to_head(user_id, player_id, role, game_type, max(0, min(last, H2H_MAX_MEETINGS)), period)
+    h2h["player"] = player
+    return h2h
+
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_CONFLICT_DETAIL = "Idempotency-Key já utilizada em outra requisição"
+
+
+def validate_idempotency_key(key: Optional[str]) -> Optional[str]:
+    """Check an Idempotency-Key header value (None when absent)."""
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key inválida")
+    return key
+
+
 @app.post("/api/players")
-async def create_player(player: PlayerCreate, user_id: int = Depends(verify_token)):
-    """Create a new player."""
+async def create_player(
+    player: PlayerCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    user_id: int = Depends(verify_token)
+):
+    """Create a new player. Retries with the same Idempotency-Key return the first response."""
     if player.sport not in SPORTS:
         raise HTTPException(status_code=400, detail=f"Esporte inválido: {player.sport}")
+    idempotency_key = validate_idempotency_key(idempotency_key)
 
     conn = get_db_connection()
     cursor = conn.cursor()
 
-    # Check for duplicate name (same user, same sport, case-insensitive)
+    if idempotency_key:
+        request_hash = idempotency_fingerprint("POST /api/players", player.dict())
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            previous = get_idempotent_response(cursor, user_id, idempotency_key, request_hash)
+        except IdempotencyConflict:
+            conn.close()
+            raise HTTPException(status_code=409, detail=IDEMPOTENCY_CONFLICT_DETAIL)
+        if previous is not None:
+            conn.close()
+            response.headers["Idempotent-Replayed"] = "true"
+            return previous
+
+    # Check for duplicate name (same user, same sport, case and accent insensitive)
+    normalized_name = normalize_name(player.name)
     cursor.execute("""
         SELECT id FROM players
-        WHERE user_id = ? AND sport = ? AND LOWER(name) = LOWER(?)
-    """, (user_id, player.sport, player.name))
+        WHERE user_id = ? AND sport = ? AND normalized_name = ?
+    """, (user_id, player.sport, normalized_name))
 
     if cursor.fetchone():
         conn.close()
         raise HTTPException(status_code=400, detail=f"Já existe um jogador com o nome '{player.name}' neste esporte")
 
     cursor.execute("""
-        INSERT INTO players (user_id, sport, name, dominant_hand, level, play_style, age_group, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (user_id, player.sport, player.name, player.dominant_hand,
+        INSERT INTO players (user_id, sport, name, normalized_name, dominant_hand, level, play_style, age_group, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (user_id, player.sport, player.name, normalized_name, player.dominant_hand,
           player.level, player.play_style, player.age_group, player.notes))
-
-    conn.commit()
     player_id = cursor.lastrowid
 
     cursor.execute("SELECT * FROM players WHERE id = ?", (player_id,))
     new_player = dict_from_row(cursor.fetchone())
+    if idempotency_key:
+        save_idempotent_response(cursor, user_id, idempotency_key, request_hash, new_player)
+    conn.commit()
     conn.close()
 
+    get_game_store().record_unchanged(user_id, bump_data_version(user_id))
+
     # Save to Cloud Storage
     save_to_cloud()
 
@@ -612,8 +697,8 @@ async def update_player(player_id: int, player: PlayerUpdate, user_id: int = Dep
     if player.name:
         cursor.execute("""
             SELECT id FROM players
-            WHERE user_id = ? AND sport = ? AND LOWER(name) = LOWER(?) AND id != ?
-        """, (user_id, current_player["sport"], player.name, player_id))
+            WHERE user_id = ? AND sport = ? AND normalized_name = ? AND id != ?
+        """, (user_id, current_player["sport"], normalize_name(player.name), player_id))
 
         if cursor.fetchone():
             conn.close()
@@ -626,6 +711,9 @@ async def update_player(player_id: int, player: PlayerUpdate, user_id: int = Dep
         if value is not None:
             updates.append(f"{field} = ?")
             values.append(value)
+            if field == "name":
+                updates.append("normalized_name = ?")
+                values.append(normalize_name(value))
 
     if updates:
         updates.append("updated_at = ?")
@@ -639,6 +727,8 @@ async def update_player(player_id: int, player: PlayerUpdate, user_id: int = Dep
     updated_player = dict_from_row(cursor.fetchone())
     conn.close()
 
+    get_game_store().record_unchanged(user_id, bump_data_version(user_id))
+
     # Save to Cloud Storage
     save_to_cloud()
 
@@ -671,6 +761,8 @@ async def delete_player(player_id: int, user_id: int = Depends(verify_token)):
     conn.commit()
     conn.close()
 
+    get_game_store().record_unchanged(user_id, bump_data_version(user_id))
+
     # Save to Cloud Storage
     save_to_cloud()
 
@@ -720,78 +812,113 @@ async def get_games(sport: Optional[str] = None, user_id: int = Depends(verify_t
     return games
 
 
-@app.post("/api/games")
-async def create_game(game: GameCreate, user_id: int = Depends(verify_token)):
-    """Create a new game."""
-    if game.sport not in SPORTS:
-        raise HTTPException(status_code=400, detail=f"Esporte inválido: {game.sport}")
+def build_fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return ""
+    return " ".join(f'"{word}"' for word in words) + "*"
 
-    if game.game_type not in GAME_TYPES:
-        raise HTTPException(status_code=400, detail=f"Tipo de jogo inválido: {game.game_type}")
 
-    if game.result not in RESULTS:
-        raise HTTPException(status_code=400, detail=f"Resultado inválido: {game.result}")
+# Control characters that cannot appear in notes or locations mark the matches,
+# so the snippet text can be escaped before the <mark> tags go in
+SNIPPET_OPEN, SNIPPET_CLOSE = "\x02", "\x03"
 
-    # Validate game type for sport
-    sport_config = SPORTS[game.sport]
-    if game.game_type not in sport_config["game_types"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"{sport_config['name']} não suporta jogos de {game.game_type}"
-        )
 
-    # Validate doubles requirements
-    if game.game_type == "doubles":
-        if not game.partner_id:
-            raise HTTPException(status_code=400, detail="Parceiro é obrigatório para jogos de duplas")
-        if not game.opponent2_id:
-            raise HTTPException(status_code=400, detail="Segundo adversário é obrigatório para jogos de duplas")
+def highlight_snippet(snippet: Optional[str]) -> Optional[str]:
+    """HTML-escape an FTS snippet and turn its match markers into <mark> tags."""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_OPEN, "<mark>").replace(SNIPPET_CLOSE, "</mark>")
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
-    cursor.execute("""
-        INSERT INTO games (user_id, sport, game_type, opponent_id, opponent2_id, partner_id,
-                          game_date, result, score, detailed_score, location, notes)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (user_id, game.sport, game.game_type, game.opponent_id, game.opponent2_id,
-          game.partner_id, game.game_date, game.result, game.score, game.detailed_score,
-          game.location, game.notes))
+@app.get("/api/games/search")
+async def search_games(
+    q: str,
+    sport: Optional[str] = None,
+    limit: int = 20,
+    user_id: int = Depends(verify_token)
+):
+    """Full-text search over game notes and locations, best matches first, with highlighted snippets."""
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
 
-    conn.commit()
-    game_id = cursor.lastrowid
+    fts_query = build_fts_query(q)
+    if not fts_query:
+        return []
 
-    cursor.execute("""
+    query = """
         SELECT g.*,
                p1.name as opponent_name,
                p2.name as opponent2_name,
-               p3.name as partner_name
-        FROM games g
+               p3.name as partner_name,
+               snippet(games_fts, 0, ?, ?, '…', 12) as notes_snippet,
+               snippet(games_fts, 1, ?, ?, '…', 8) as location_snippet,
+               games_fts.rank as rank
+        FROM games_fts
+        JOIN games g ON g.id = games_fts.rowid
         LEFT JOIN players p1 ON g.opponent_id = p1.id
         LEFT JOIN players p2 ON g.opponent2_id = p2.id
         LEFT JOIN players p3 ON g.partner_id = p3.id
-        WHERE g.id = ?
-    """, (game_id,))
+        WHERE games_fts MATCH ? AND g.user_id = ?
+    """
+    params = [SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_OPEN, SNIPPET_CLOSE, fts_query, user_id]
+    if sport:
+        query += " AND g.sport = ?"
+        params.append(sport)
+    query += " ORDER BY games_fts.rank LIMIT ?"
+    params.append(max(1, min(limit, 100)))
 
-    new_game = dict_from_row(cursor.fetchone())
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    games = [dict_from_row(row) for row in cursor.fetchall()]
     conn.close()
 
-    # Save to Cloud Storage
-    save_to_cloud()
+    for game in games:
+        game["notes_snippet"] = highlight_snippet(game["notes_snippet"])
+        game["location_snippet"] = highlight_snippet(game["location_snippet"])
+    return games
+
+
+@app.post("/api/games")
+async def create_game(
+    game: GameCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    user_id: int = Depends(verify_token)
+):
+    """Create a new game. Retries with the same Idempotency-Key return the first response."""
+    error = validate_new_game(game)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+    idempotency_key = validate_idempotency_key(idempotency_key)
 
-    # Update streak for gamification
     try:
-        from api.database import update_user_streak
-        update_user_streak(user_id, game.game_date)
-    except Exception as e:
-        print(f"[API] Error updating streak: {e}")
+        created = create_game_with_effects(user_id, game.dict(), idempotency_key)
+    except IdempotencyConflict:
+        raise HTTPException(status_code=409, detail=IDEMPOTENCY_CONFLICT_DETAIL)
+    new_game = created["game"]
+
+    if created["replayed"]:
+        response.headers["Idempotent-Replayed"] = "true"
+        return {**new_game, "streak": created["streak"], "newly_unlocked": created["newly_unlocked"]}
+
+    get_game_store().record_upsert(user_id, new_game, bump_data_version(user_id))
+
+    # Save to Cloud Storage
+    save_to_cloud()
 
-    return new_game
+    return {**new_game, "streak": created["streak"], "newly_unlocked": created["newly_unlocked"]}
 
 
 @app.put("/api/games/{game_id}")
 async def update_game(game_id: int, game: GameUpdate, user_id: int = Depends(verify_token)):
     """Update a game."""
+    error = validate_game_update(game)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
     conn = get_db_connection()
     cursor = conn.cursor()
 
@@ -808,6 +935,9 @@ async def update_game(game_id: int, game: GameUpdate, user_id: int = Depends(ver
         if value is not None:
             updates.append(f"{field} = ?")
             values.append(value)
+            if field == "location":
+                updates.append("venue_id = ?")
+                values.append(get_or_create_venue(cursor, user_id, value))
 
     if updates:
         updates.append("updated_at = ?")
@@ -832,6 +962,8 @@ async def update_game(game_id: int, game: GameUpdate, user_id: int = Depends(ver
     updated_game = dict_from_row(cursor.fetchone())
     conn.close()
 
+    get_game_store().record_upsert(user_id, updated_game, bump_data_version(user_id))
+
     # Save to Cloud Storage
     save_to_cloud()
 
@@ -854,12 +986,191 @@ async def delete_game(game_id: int, user_id: int = Depends(verify_token)):
     conn.commit()
     conn.close()
 
+    get_game_store().record_delete(user_id, game_id, bump_data_version(user_id))
+
     # Save to Cloud Storage
     save_to_cloud()
 
     return {"message": "Jogo excluído com sucesso"}
 
 
+# =============================================================================
+# BATCH ENDPOINTS
+# =============================================================================
+
+@app.post("/api/batch")
+async def batch_mutations(batch: BatchRequest, user_id: int = Depends(verify_token)):
+    """
+    Apply create/update/delete operations on games and players atomically.
+    If any operation fails nothing is written and the error names its index.
+    """
+    if not batch.operations:
+        return {"results": []}
+
+    try:
+        outcome = apply_batch(user_id, batch.operations)
+    except BatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=f"Operação {e.index}: {e}")
+
+    get_game_store().record_batch(user_id, outcome["games"], bump_data_version(user_id))
+
+    response = {"results": outcome["results"]}
+    if outcome["dates_changed"]:
+        from api.database import recompute_user_streak, check_and_unlock_achievements
+        response["streak"] = recompute_user_streak(user_id)
+        response["newly_unlocked"] = check_and_unlock_achievements(user_id)
+
+    # Save to Cloud Storage
+    save_to_cloud()
+
+    return response
+
+
+# =============================================================================
+# VENUES ENDPOINTS
+# =============================================================================
+
+@app.get("/api/venues")
+async def get_venues(q: Optional[str] = None, limit: int = 20, user_id: int = Depends(verify_token)):
+    """Autocomplete venues: names where a word starts with q, most played first."""
+    prefix = normalize_name(q or "")
+    limit = max(1, min(limit, 100))
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT v.id, v.name, COUNT(g.id) as games, MAX(g.game_date) as last_played
+        FROM venues v
+        JOIN games g ON g.user_id = v.user_id AND g.venue_id = v.id
+        WHERE v.user_id = ? AND (' ' || v.canonical_name) LIKE ?
+        GROUP BY v.id
+        ORDER BY v.canonical_name LIKE ? DESC, games DESC, v.name
+        LIMIT ?
+    """, (user_id, f"% {prefix}%", f"{prefix}%", limit))
+
+    venues = [dict_from_row(row) for row in cursor.fetchall()]
+    conn.close()
+
+    return venues
+
+
+@app.get("/api/venues/stats")
+async def get_venue_stats(sport: Optional[str] = None, user_id: int = Depends(verify_token)):
+    """Get games, results and win rate per venue."""
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
+
+    query = """
+        SELECT v.id, v.name, COUNT(*) as games,
+               SUM(g.result = 'win') as wins,
+               SUM(g.result = 'loss') as losses,
+               SUM(g.result = 'draw') as draws,
+               MAX(g.game_date) as last_played
+        FROM games g
+        JOIN venues v ON g.venue_id = v.id
+        WHERE g.user_id = ?
+    """
+    params = [user_id]
+    if sport:
+        query += " AND g.sport = ?"
+        params.append(sport)
+    query += " GROUP BY v.id ORDER BY games DESC, v.name"
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    venues = [dict_from_row(row) for row in cursor.fetchall()]
+    conn.close()
+
+    for venue in venues:
+        venue["win_rate"] = round(venue["wins"] / venue["games"] * 100, 1)
+
+    return venues
+
+
+# =============================================================================
+# IMPORT / EXPORT ENDPOINTS
+# =============================================================================
+
+@app.post("/api/import")
+async def import_games(request: Request, format: Optional[str] = None, user_id: int = Depends(verify_token)):
+    """
+    Bulk import games from CSV or JSON (raw body or a multipart "file" field).
+    Players are matched by name per sport and created when missing.
+    """
+    content_type = request.headers.get("content-type", "")
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Arquivo maior que {MAX_IMPORT_BYTES // (1024 * 1024)} MB"
+    )
+
+    # Reject by Content-Length before reading, then stop reading as soon as the body
+    # passes the limit (chunked uploads have no Content-Length)
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_IMPORT_REQUEST_BYTES:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_IMPORT_REQUEST_BYTES:
+            raise too_large
+    data = bytes(body)
+
+    filename = ""
+    if content_type.startswith("multipart/form-data"):
+        # Parse the multipart form from the buffered body
+        async def receive():
+            return {"type": "http.request", "body": data, "more_body": False}
+
+        form = await Request(request.scope, receive).form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Arquivo não enviado")
+        filename = upload.filename or ""
+        data = await upload.read()
+
+    fmt = format or ("csv" if "csv" in content_type or filename.lower().endswith(".csv") else "json")
+
+    try:
+        players, games = parse_import(data, fmt)
+    except ImportFileError as e:
+        raise HTTPException(status_code=400, detail=f"Importação inválida: {e}")
+
+    report = import_records(user_id, players, games)
+    print(f"[IMPORT] User {user_id}: {report['games_imported']} games, "
+          f"{report['players_created']} players, {len(report['rejected'])} rejected "
+          f"({report['rows_per_second']} rows/s)")
+
+    if report["games_imported"] or report["players_created"]:
+        bump_data_version(user_id)
+
+        from api.database import recompute_user_streak, check_and_unlock_achievements
+        report["streak"] = recompute_user_streak(user_id)
+        report["newly_unlocked"] = check_and_unlock_achievements(user_id)
+
+        # Save to Cloud Storage
+        save_to_cloud()
+
+    return report
+
+
+@app.get("/api/export")
+async def export_games(format: str = "ndjson", sport: Optional[str] = None, user_id: int = Depends(verify_token)):
+    """Stream the full game history as NDJSON, CSV or Parquet."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato inválido: {format}")
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
+
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f"racket_pro_{sport or 'todos'}_{datetime.utcnow():%Y%m%d}.{extension}"
+    return StreamingResponse(
+        STREAMERS[format](user_id, sport),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 # =============================================================================
 # STATISTICS ENDPOINTS
 # =============================================================================
@@ -939,6 +1250,126 @@ async def get_statistics(sport: Optional[str] = None, user_id: int = Depends(ver
         return overall
 
 
+# =============================================================================
+# ANALYTICS ENDPOINTS
+# =============================================================================
+
+def validate_period(period: str) -> str:
+    """Validate an analytics period: "all" or a positive number of days."""
+    if period != "all" and not (period.isdigit() and int(period) > 0):
+        raise HTTPException(status_code=400, detail=f"Período inválido: {period}")
+    return period
+
+
+@app.get("/api/analytics/charts")
+async def get_analytics_charts(
+    sport: Optional[str] = None,
+    period: str = "all",
+    user_id: int = Depends(verify_token)
+):
+    """Get precomputed series for the analytics charts (period: "all" or days)."""
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
+
+    return get_chart_data(user_id, sport, validate_period(period))
+
+
+@app.get("/api/analytics/timeseries")
+async def get_analytics_timeseries(
+    sport: Optional[str] = None,
+    period: str = "all",
+    group_by: str = "none",
+    games: Optional[str] = "10,30",
+    days: Optional[str] = None,
+    ema_alpha: float = 0.2,
+    user_id: int = Depends(verify_token)
+):
+    """
+    Get rolling win rates per sport/opponent/partner.
+    games and days are comma-separated window sizes (e.g. games=5,10,30&days=30,90).
+    """
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
+    if group_by not in GROUP_BY_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"Agrupamento inválido: {group_by}")
+    if not 0 < ema_alpha <= 1:
+        raise HTTPException(status_code=400, detail="ema_alpha deve estar entre 0 e 1")
+
+    try:
+        game_windows = parse_windows(games, MAX_GAME_WINDOW)
+        day_windows = parse_windows(days, MAX_DAY_WINDOW)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Janelas inválidas: {e}")
+
+    return get_timeseries(
+        user_id, group_by, sport, validate_period(period),
+        game_windows, day_windows, ema_alpha
+    )
+
+
+@app.get("/api/analytics/calendar")
+async def get_analytics_calendar(
+    year: Optional[int] = None,
+    sport: Optional[str] = None,
+    user_id: int = Depends(verify_token)
+):
+    """Get a year activity heatmap with weekday and month histograms."""
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
+    if year is not None and not MIN_YEAR <= year <= MAX_YEAR:
+        raise HTTPException(status_code=400, detail=f"Ano inválido: {year}")
+
+    return get_calendar(user_id, year, sport)
+
+
+@app.get("/api/analytics/report")
+async def get_analytics_report(
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    sport: Optional[str] = None,
+    user_id: int = Depends(verify_token)
+):
+    """
+    Get a period summary: totals, per sport/month records, new opponents,
+    best/worst matchups and achievements unlocked.
+    period is a year ("2026"), month ("2026-03") or quarter ("2026-Q1");
+    a custom season uses start and end dates (inclusive) instead.
+    """
+    if sport and sport not in SPORTS:
+        raise HTTPException(status_code=400, detail=f"Esporte inválido: {sport}")
+
+    try:
+        first, last = parse_period(period, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Período inválido: {e}")
+
+    return get_period_report(user_id, first, last, sport)
+
+
+@app.get("/api/analytics/predict")
+async def get_analytics_prediction(
+    opponent_id: int,
+    best_of: Optional[int] = None,
+    user_id: int = Depends(verify_token)
+):
+    """Estimate the odds of beating an opponent by simulating matches in the opponent's sport."""
+    if best_of is not None and (best_of < 1 or best_of > 7 or best_of % 2 == 0):
+        raise HTTPException(status_code=400, detail="best_of deve ser 1, 3, 5 ou 7")
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name, sport FROM players WHERE id = ? AND user_id = ?", (opponent_id, user_id))
+    opponent = dict_from_row(cursor.fetchone())
+    conn.close()
+
+    if not opponent:
+        raise HTTPException(status_code=404, detail="Jogador não encontrado")
+
+    prediction = predict_match(user_id, opponent["sport"], opponent_id, best_of)
+    return {**prediction, "opponent_name": opponent["name"]}
+
+
 # =============================================================================
 # UTILITY ENDPOINTS
 # =============================================================================
@@ -959,35 +1390,48 @@ async def health_check():
 # STATIC FILES & PAGES
 # =============================================================================
 
-# Mount static files
+# Mount static files (text assets are answered from the in-memory static cache)
 static_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
 if os.path.exists(static_path):
-    app.mount("/static", StaticFiles(directory=static_path), name="static")
+    app.mount("/static", CachedStaticFiles(directory=static_path), name="static")
 
 # Serve HTML pages
 @app.get("/", response_class=HTMLResponse)
-async def serve_index():
-    index_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "index.html")
-    if os.path.exists(index_path):
-        with open(index_path, "r", encoding="utf-8") as f:
-            return f.read()
+async def serve_index(request: Request):
+    page = get_static_cache().page("index.html", request.cookies.get(LANGUAGE_COOKIE))
+    if page:
+        return page.response(request.headers)
     return HTMLResponse("<h1>Racket Pro Analyzer</h1>")
 
 
 @app.get("/{filename}.html", response_class=HTMLResponse)
-async def serve_html(filename: str):
-    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), f"{filename}.html")
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+async def serve_html(filename: str, request: Request):
+    page = get_static_cache().page(f"{filename}.html", request.cookies.get(LANGUAGE_COOKIE))
+    if page:
+        return page.response(request.headers)
     raise HTTPException(status_code=404, detail="Página não encontrada")
 
 
+@app.get("/api/locales/{language}")
+async def get_locale_keys(language: str, keys: str):
+    """
+    Translations for keys a page's bundle does not include (comma separated),
+    merged with the pt-BR fallback. Keys that do not exist are left out.
+    """
+    locales = get_static_cache().locales
+    if language not in locales:
+        raise HTTPException(status_code=404, detail="Idioma não encontrado")
+
+    requested = [key for key in keys.split(",") if key][:MAX_LOOKUP_KEYS]
+    values = {key: lookup(locales[language], key) for key in requested}
+    return {key: value for key, value in values.items() if value is not None}
+
+
 @app.get("/manifest.json")
-async def serve_manifest():
-    manifest_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "manifest.json")
-    if os.path.exists(manifest_path):
-        return FileResponse(manifest_path)
+async def serve_manifest(request: Request):
+    manifest = get_static_cache().page("manifest.json")
+    if manifest:
+        return manifest.response(request.headers)
     raise HTTPException(status_code=404, detail="Manifest não encontrado")
 
 
@@ -996,11 +1440,11 @@ async def serve_manifest():
 # =============================================================================
 
 @app.get("/api/gamification/achievements")
-async def get_achievements(current_user: dict = Depends(get_current_user)):
+async def get_achievements(user_id: int = Depends(verify_token)):
     """Get all achievements with user's unlock status."""
     try:
         from api.database import get_user_achievements
-        achievements = get_user_achievements(current_user["id"])
+        achievements = get_user_achievements(user_id)
         return {"success": True, "achievements": achievements}
     except Exception as e:
         print(f"[API] Error getting achievements: {e}")
@@ -1008,11 +1452,11 @@ async def get_achievements(current_user: dict = Depends(get_current_user)):
 
 
 @app.get("/api/gamification/streak")
-async def get_streak(current_user: dict = Depends(get_current_user)):
+async def get_streak(user_id: int = Depends(verify_token)):
     """Get user's streak information."""
     try:
         from api.database import get_user_streak
-        streak = get_user_streak(current_user["id"])
+        streak = get_user_streak(user_id)
         return {"success": True, "streak": streak}
     except Exception as e:
         print(f"[API] Error getting streak: {e}")
@@ -1020,12 +1464,12 @@ async def get_streak(current_user: dict = Depends(get_current_user)):
 
 
 @app.post("/api/gamification/check-achievements")
-async def check_achievements(current_user: dict = Depends(get_current_user)):
+async def check_achievements(user_id: int = Depends(verify_token)):
     """Check and unlock any new achievements for user."""
     try:
         from api.database import check_and_unlock_achievements, get_user_streak
-        newly_unlocked = check_and_unlock_achievements(current_user["id"])
-        streak = get_user_streak(current_user["id"])
+        newly_unlocked = check_and_unlock_achievements(user_id)
+        streak = get_user_streak(user_id)
         return {
             "success": True,
             "newly_unlocked": newly_unlocked,
@@ -0,0 +1,161 @@
+"""
+Racket Pro Analyzer - Match Simulator
+Estimates the odds of beating an opponent by simulating whole matches with
+NumPy, from the user's point (or game) history against them, shrunk toward
+their overall rate in the sport
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from api.database import get_data_version
+from api.game_store import get_game_store, WIN
+from api.models import SPORTS
+
+# Random draws per prediction; the number of simulated matches follows from it
+SIMULATION_BUDGET = 200_000
+SIMULATION_SEED = 20240601
+# Extra rallies allowed past the target in uncapped win-by-2 sets
+DEUCE_ALLOWANCE = 20
+# Prior weight, in points (or games for tennis-style scoring)
+PRIOR_STRENGTH = {"sets": 60, "tennis": 12}
+PREDICTION_CACHE_SIZE = 256
+
+_prediction_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_prediction_cache_lock = threading.Lock()
+
+
+def set_format(sport: str) -> Dict:
+    """Race length of one set: first to `target` by 2, decided at `cap` if set."""
+    config = SPORTS[sport]
+    if config["score_type"] == "tennis":
+        # 6 games by 2, tie-break at 6-6 modeled as one deciding game
+        target = config["games_per_set"]
+        return {"unit": "game", "target": target, "cap": target + 1}
+    return {"unit": "point", "target": config["points_to_win"], "cap": config.get("max_points")}
+
+
+def simulate_sets(p: float, n: int, target: int, cap: Optional[int], rng) -> tuple:
+    """
+    Simulate n independent sets won rally by rally with probability p.
+
+    Returns:
+        (won, points won, points lost) arrays of length n
+    """
+    length = 2 * cap - 1 if cap else 2 * target + DEUCE_ALLOWANCE
+    rallies = rng.random((n, length)) < p
+    won_so_far = np.cumsum(rallies, axis=1)
+    lost_so_far = np.arange(1, length + 1) - won_so_far
+
+    over = ((won_so_far >= target) | (lost_so_far >= target)) & (np.abs(won_so_far - lost_so_far) >= 2)
+    if cap:
+        over |= (won_so_far >= cap) | (lost_so_far >= cap)
+    finished = over.any(axis=1)
+    end = np.where(finished, over.argmax(axis=1), length - 1)
+
+    rows = np.arange(n)
+    points_won, points_lost = won_so_far[rows, end], lost_so_far[rows, end]
+    # Sets still level after the deuce allowance are settled by one more rally
+    won = np.where(points_won == points_lost, rng.random(n) < p, points_won > points_lost)
+    return won, points_won, points_lost
+
+
+def simulate_match(p: float, best_of: int, target: int, cap: Optional[int], seed: int = SIMULATION_SEED) -> Dict:
+    """Simulate best-of-N matches within SIMULATION_BUDGET random draws."""
+    rng = np.random.default_rng(seed)
+    length = 2 * cap - 1 if cap else 2 * target + DEUCE_ALLOWANCE
+    matches = max(1, SIMULATION_BUDGET // (best_of * length))
+    needed = best_of // 2 + 1
+
+    won, _, _ = simulate_sets(p, matches * best_of, target, cap, rng)
+    set_wins = won.reshape(matches, best_of).astype(np.int64)
+
+    # Sets are independent, so playing all of them does not change the winner;
+    # the final score is read at the set where one side reaches `needed`
+    wins_so_far = np.cumsum(set_wins, axis=1)
+    losses_so_far = np.arange(1, best_of + 1) - wins_so_far
+    end = ((wins_so_far == needed) | (losses_so_far == needed)).argmax(axis=1)
+    rows = np.arange(matches)
+    final = wins_so_far[rows, end] * 10 + losses_so_far[rows, end]
+    scores, counts = np.unique(final, return_counts=True)
+
+    distribution = sorted(
+        ({"score": f"{s // 10}-{s % 10}", "probability": round(c / matches, 4)}
+         for s, c in zip(scores.tolist(), counts.tolist())),
+        key=lambda d: d["probability"], reverse=True
+    )
+    return {
+        "simulations": matches,
+        "win_probability": round(float((wins_so_far[:, -1] >= needed).mean()), 4),
+        "set_win_probability": round(float(won.mean()), 4),
+        "score_distribution": distribution,
+    }
+
+
+def load_point_history(user_id: int, sport: str, opponent_id: int) -> Dict:
+    """Points (games for tennis-style sports) and sets won/lost in the sport and against one opponent."""
+    games = get_game_store().get(user_id).select(sport)
+    # Games without a set count in score fall back to the sets in detailed_score
+    no_score = (games["sets_won"] == 0) & (games["sets_lost"] == 0)
+    sets_won = np.where(no_score, games["detail_sets_won"], games["sets_won"])
+    sets_lost = np.where(no_score, games["detail_sets_lost"], games["sets_lost"])
+    against = (games["opponent_id"] == opponent_id) | (games["opponent2_id"] == opponent_id)
+
+    history = {}
+    for scope, mask in (("sport", slice(None)), ("opponent", against)):
+        history[scope] = {
+            "games": int(len(games["id"][mask])),
+            "wins": int((games["result"][mask] == WIN).sum()),
+            "points_won": int(games["points_won"][mask].sum()),
+            "points_lost": int(games["points_lost"][mask].sum()),
+            "sets_won": int(sets_won[mask].sum()),
+            "sets_lost": int(sets_lost[mask].sum()),
+        }
+    return history
+
+
+def shrunk_rate(won: int, lost: int, prior: float, strength: float) -> float:
+    """Win rate pulled toward prior as if `strength` extra observations at the prior rate were seen."""
+    return (won + prior * strength) / (won + lost + strength)
+
+
+def predict_match(user_id: int, sport: str, opponent_id: int, best_of: Optional[int] = None) -> Dict:
+    """Estimate per-point odds against an opponent and simulate a best-of-N match."""
+    best_of = best_of or SPORTS[sport]["max_sets"]
+    key = (user_id, sport, opponent_id, best_of, get_data_version(user_id))
+
+    with _prediction_cache_lock:
+        cached = _prediction_cache.get(key)
+        if cached is not None:
+            _prediction_cache.move_to_end(key)
+            return cached
+
+    fmt = set_format(sport)
+    strength = PRIOR_STRENGTH[SPORTS[sport]["score_type"]]
+    history = load_point_history(user_id, sport, opponent_id)
+    sport_stats, opponent_stats = history["sport"], history["opponent"]
+
+    # Sport-level rate shrunk toward an even match, then the opponent rate toward it
+    prior = shrunk_rate(sport_stats["points_won"], sport_stats["points_lost"], 0.5, strength)
+    p = shrunk_rate(opponent_stats["points_won"], opponent_stats["points_lost"], prior, strength)
+
+    data = {
+        "sport": sport,
+        "opponent_id": opponent_id,
+        "best_of": best_of,
+        "format": fmt,
+        f"{fmt['unit']}_win_probability": round(p, 4),
+        "prior": round(prior, 4),
+        "observed": opponent_stats,
+        **simulate_match(p, best_of, fmt["target"], fmt["cap"]),
+    }
+
+    with _prediction_cache_lock:
+        _prediction_cache[key] = data
+        if len(_prediction_cache) > PREDICTION_CACHE_SIZE:
+            _prediction_cache.popitem(last=False)
+
+    return data
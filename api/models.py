@@ -11,13 +11,20 @@ from pydantic import BaseModel
 # =============================================================================
 
 SPORTS = {
-    "table_tennis": {"name": "Tênis de Mesa", "icon": "🏓", "game_types": ["singles", "doubles"]},
-    "badminton": {"name": "Badminton", "icon": "🏸", "game_types": ["singles", "doubles"]},
-    "tennis": {"name": "Tênis", "icon": "🎾", "game_types": ["singles", "doubles"]},
-    "squash": {"name": "Squash", "icon": "🟠", "game_types": ["singles"]},
-    "padel": {"name": "Padel", "icon": "🏓", "game_types": ["doubles"]},
-    "beach_tennis": {"name": "Beach Tennis", "icon": "🏖️", "game_types": ["doubles"]},
-    "pickleball": {"name": "Pickleball", "icon": "🥒", "game_types": ["singles", "doubles"]},
+    "table_tennis": {"name": "Tênis de Mesa", "icon": "🏓", "game_types": ["singles", "doubles"],
+                     "score_type": "sets", "max_sets": 7, "points_to_win": 11},
+    "badminton": {"name": "Badminton", "icon": "🏸", "game_types": ["singles", "doubles"],
+                  "score_type": "sets", "max_sets": 3, "points_to_win": 21, "max_points": 30},
+    "tennis": {"name": "Tênis", "icon": "🎾", "game_types": ["singles", "doubles"],
+               "score_type": "tennis", "max_sets": 5, "games_per_set": 6},
+    "squash": {"name": "Squash", "icon": "🟠", "game_types": ["singles"],
+               "score_type": "sets", "max_sets": 5, "points_to_win": 11},
+    "padel": {"name": "Padel", "icon": "🏓", "game_types": ["doubles"],
+              "score_type": "tennis", "max_sets": 3, "games_per_set": 6},
+    "beach_tennis": {"name": "Beach Tennis", "icon": "🏖️", "game_types": ["doubles"],
+                     "score_type": "tennis", "max_sets": 3, "games_per_set": 6},
+    "pickleball": {"name": "Pickleball", "icon": "🥒", "game_types": ["singles", "doubles"],
+                   "score_type": "sets", "max_sets": 3, "points_to_win": 11},
 }
 
 LEVELS = ["beginner", "intermediate", "advanced", "professional"]
@@ -127,6 +134,16 @@ class GameResponse(BaseModel):
     opponent2_name: Optional[str] = None
     partner_name: Optional[str] = None
 
+# ----- Batch -----
+class BatchOperation(BaseModel):
+    action: str  # create, update, delete
+    entity: str  # game or player
+    id: Optional[int] = None  # For update and delete
+    data: Optional[dict] = None  # GameCreate/PlayerCreate or GameUpdate/PlayerUpdate fields
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation]
+
 # ----- Statistics -----
 class SportStatistics(BaseModel):
     sport: str
@@ -0,0 +1,109 @@
+"""
+Racket Pro Analyzer - Player Search
+Fuzzy player-name search for voice entry over the players_fts trigram index
+(normalized names), ranked by match type and trigram similarity
+"""
+
+from typing import Dict, List, Optional
+
+from api.database import get_db_connection, dict_from_row, normalize_name
+
+# Candidates fetched from the index before ranking
+MAX_CANDIDATES = 50
+MIN_SIMILARITY = 0.3
+PREFIX_RANGE_END = "\U0010ffff"  # Highest code point: upper bound of a prefix range
+
+# Score per match type; fuzzy matches score their trigram similarity times "fuzzy"
+MATCH_SCORES = {"exact": 1.0, "word_prefix": 0.9, "contains": 0.8, "fuzzy": 0.75}
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of each word, padded so short names still have some."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two strings' trigram sets."""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def classify_match(query: str, name: str) -> Optional[tuple]:
+    """(match type, score) of a normalized name against a normalized query, or None if too different."""
+    if name == query:
+        return "exact", MATCH_SCORES["exact"]
+    if any(word.startswith(query) for word in name.split()) or name.startswith(query):
+        return "word_prefix", MATCH_SCORES["word_prefix"]
+    if query in name:
+        return "contains", MATCH_SCORES["contains"]
+    # Spoken queries are often just a first name, so also compare word by word
+    best = max([similarity(query, name)] + [similarity(query, word) for word in name.split()])
+    if best < MIN_SIMILARITY:
+        return None
+    return "fuzzy", round(best * MATCH_SCORES["fuzzy"], 3)
+
+
+def _fts_query(query: str) -> str:
+    """Match any trigram of the query's words (each quoted as an FTS5 string)."""
+    grams = {word[i:i + 3] for word in query.split() if len(word) >= 3 for i in range(len(word) - 2)}
+    return " OR ".join('"' + gram.replace('"', '""') + '"' for gram in sorted(grams))
+
+
+def search_players(user_id: int, q: str, sport: Optional[str] = None, limit: int = 10) -> List[Dict]:
+    """Players whose name matches q, best first, each with match type and score."""
+    query = normalize_name(q)
+    if not query:
+        return []
+
+    sport_filter = " AND p.sport = ?" if sport else ""
+    sport_params = [sport] if sport else []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # Exact and prefix matches come straight from the (user_id, sport, normalized_name) index;
+    # the range ends at query + the highest code point, which sorts after any continuation
+    prefix_params = [user_id, query, query + PREFIX_RANGE_END] + sport_params
+    cursor.execute(f"""
+        SELECT p.* FROM players p
+        WHERE p.user_id = ? AND p.normalized_name >= ? AND p.normalized_name < ?{sport_filter}
+        LIMIT {MAX_CANDIDATES}
+    """, prefix_params)
+    candidates = {row["id"]: dict_from_row(row) for row in cursor.fetchall()}
+
+    # Trigram index: names sharing any trigram with the query (words of 3+ letters)
+    if any(len(word) >= 3 for word in query.split()):
+        cursor.execute(f"""
+            SELECT p.* FROM players_fts
+            JOIN players p ON p.id = players_fts.rowid
+            WHERE players_fts MATCH ? AND p.user_id = ?{sport_filter}
+            ORDER BY players_fts.rank
+            LIMIT {MAX_CANDIDATES}
+        """, [_fts_query(query), user_id] + sport_params)
+        for row in cursor.fetchall():
+            candidates.setdefault(row["id"], dict_from_row(row))
+    else:
+        # Too short for trigrams: match the start of any word
+        cursor.execute(f"""
+            SELECT p.* FROM players p
+            WHERE p.user_id = ? AND (' ' || p.normalized_name) LIKE ?{sport_filter}
+            LIMIT {MAX_CANDIDATES}
+        """, [user_id, f"% {query}%"] + sport_params)
+        for row in cursor.fetchall():
+            candidates.setdefault(row["id"], dict_from_row(row))
+
+    conn.close()
+
+    results = []
+    for player in candidates.values():
+        match = classify_match(query, player["normalized_name"] or "")
+        if match:
+            results.append({**player, "match": match[0], "score": match[1]})
+
+    results.sort(key=lambda p: (-p["score"], p["name"]))
+    return results[:limit]
@@ -0,0 +1,164 @@
+"""
+Rate limiting for Racket Pro Analyzer
+In-memory token buckets that shed load on expensive auth endpoints
+(bcrypt hashing, SendGrid calls) before any work is done
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+# Configuration
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() != "false"
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "50000"))
+# Proxies in front of the app that append to X-Forwarded-For (Cloud Run's front end)
+TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", "1"))
+
+# action -> {scope: (capacity, refill period in seconds for the whole bucket)}
+AUTH_LIMITS = {
+    "login": {"ip": (20, 60), "email": (5, 60)},
+    "register": {"ip": (5, 300)},
+    "resend-verification": {"ip": (5, 300), "email": (3, 900)},
+    "forgot-password": {"ip": (5, 300), "email": (3, 900)},
+}
+# Scopes only charged by record_failed_attempt, so a correct password isn't
+# locked out by someone else guessing at the same account
+FAILURE_ONLY_SCOPES = {"login": {"email"}}
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by string, stored in an LRU ordered by last use.
+    A bucket untouched for a full refill period is full again, so it can be
+    dropped; sweeping from the oldest end keeps memory bounded in O(1) amortized.
+    """
+
+    def __init__(self, capacity: int, period: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period  # tokens per second
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sweep(self, now: float):
+        """Drop idle (refilled) buckets from the oldest end, and the oldest if over budget"""
+        while self._buckets:
+            _, updated_at = next(iter(self._buckets.values()))
+            if now - updated_at < self.period and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def retry_after(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Check key without taking a token
+
+        Returns:
+            0 if a token is available, otherwise seconds until one is
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._tokens(key, now)
+            return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def consume(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Take one token for key
+
+        Returns:
+            0 if allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._tokens(key, now)
+            self._buckets.pop(key, None)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                retry_after = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                retry_after = (1 - tokens) / self.rate
+
+            self._sweep(now)
+            return retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+_limiters = {
+    (action, scope): TokenBucketLimiter(capacity, period)
+    for action, scopes in AUTH_LIMITS.items()
+    for scope, (capacity, period) in scopes.items()
+}
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    Client IP from X-Forwarded-For: each trusted proxy appends the address it
+    saw, so the entry TRUSTED_PROXY_COUNT from the right is the real client
+    (anything left of it is client-controlled)
+    """
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and TRUSTED_PROXY_COUNT > 0:
+        entries = [entry.strip() for entry in forwarded.split(",") if entry.strip()]
+        if entries:
+            return entries[-min(TRUSTED_PROXY_COUNT, len(entries))]
+    return request.client.host if request.client else "unknown"
+
+
+def _normalize_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+def check_rate_limit(request: Request, action: str, email: Optional[str] = None):
+    """
+    Enforce the per-IP and per-email limits for an auth action.
+    Every bucket is checked before any is charged, so a denied attempt
+    costs nothing; scopes in FAILURE_ONLY_SCOPES are checked but not charged.
+
+    Raises:
+        HTTPException: 429 with Retry-After if any bucket is empty
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+
+    keys = {"ip": get_client_ip(request), "email": _normalize_email(email)}
+    scopes = [scope for scope in AUTH_LIMITS[action] if keys[scope]]
+    retry_after = max(
+        (_limiters[(action, scope)].retry_after(keys[scope]) for scope in scopes),
+        default=0.0,
+    )
+
+    if retry_after == 0:
+        failure_only = FAILURE_ONLY_SCOPES.get(action, set())
+        for scope in scopes:
+            if scope not in failure_only:
+                retry_after = max(retry_after, _limiters[(action, scope)].consume(keys[scope]))
+
+    if retry_after > 0:
+        print(f"[RATE_LIMIT] {action} limited for {keys['ip']} (retry in {retry_after:.0f}s)")
+        raise HTTPException(
+            status_code=429,
+            detail="Muitas tentativas. Tente novamente mais tarde.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def record_failed_attempt(action: str, email: Optional[str]):
+    """Charge the failure-only buckets of an action (e.g. a wrong login password)"""
+    key = _normalize_email(email)
+    if not RATE_LIMIT_ENABLED or not key:
+        return
+    for scope in FAILURE_ONLY_SCOPES.get(action, set()):
+        _limiters[(action, scope)].consume(key)
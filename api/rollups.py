@@ -0,0 +1,365 @@
+"""
+Racket Pro Analyzer - Rollups
+Calendar views and period reports built from the game_daily_stats and
+game_monthly_stats rollups (kept current by triggers on games) instead of
+scanning every game
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.analytics import round_half_up
+from api.database import get_db_connection, get_data_version
+
+# Calendar cache: (user_id, year, sport, data_version) -> calendar (LRU)
+CALENDAR_CACHE_SIZE = 256
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+MAX_REPORT_DAYS = 3660
+MIN_MATCHUP_GAMES = 2
+MATCHUPS_IN_REPORT = 3
+
+_YEAR = re.compile(r"^(\d{4})$")
+_MONTH = re.compile(r"^(\d{4})-(\d{2})$")
+_QUARTER = re.compile(r"^(\d{4})-Q([1-4])$", re.IGNORECASE)
+
+_calendar_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_calendar_cache_lock = threading.Lock()
+
+
+def load_daily_stats(user_id: int, start: str, end: str, sport: Optional[str] = None) -> list:
+    """Fetch rollup rows for start <= game_date < end, summed over sports unless one is given."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    query = """
+        SELECT game_date, SUM(games) as games, SUM(wins) as wins,
+               SUM(losses) as losses, SUM(draws) as draws
+        FROM game_daily_stats
+        WHERE user_id = ? AND game_date >= ? AND game_date < ?
+    """
+    params = [user_id, start, end]
+    if sport:
+        query += " AND sport = ?"
+        params.append(sport)
+    query += " GROUP BY game_date ORDER BY game_date"
+
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def win_rates(wins: np.ndarray, games: np.ndarray) -> list:
+    """Win rate (%) per bucket, 0 for empty buckets."""
+    return round_half_up(np.divide(
+        wins * 100, games, out=np.zeros(len(games)), where=games > 0
+    )).tolist()
+
+
+def build_calendar(year: int, rows: list) -> Dict:
+    """Year heatmap plus weekday and month histograms from daily rollup rows."""
+    days = [{
+        "date": row["game_date"],
+        "games": row["games"],
+        "wins": row["wins"],
+        "losses": row["losses"],
+        "draws": row["draws"],
+    } for row in rows]
+
+    day_numbers = np.array([row["game_date"] for row in rows], dtype="datetime64[D]")
+    games = np.array([row["games"] for row in rows], dtype=np.int64)
+    wins = np.array([row["wins"] for row in rows], dtype=np.int64)
+
+    # 0 = Sunday (1970-01-01 was a Thursday), as in the day of week chart
+    weekday = (day_numbers.astype(np.int64) + 4) % 7
+    weekday_games = np.bincount(weekday, weights=games, minlength=7).astype(int)
+    weekday_wins = np.bincount(weekday, weights=wins, minlength=7).astype(int)
+
+    month = day_numbers.astype("datetime64[M]").astype(np.int64) % 12
+    month_games = np.bincount(month, weights=games, minlength=12).astype(int)
+    month_wins = np.bincount(month, weights=wins, minlength=12).astype(int)
+
+    total = int(games.sum())
+    return {
+        "year": year,
+        "total_games": total,
+        "wins": int(wins.sum()),
+        "active_days": len(rows),
+        "max_games_per_day": int(games.max()) if total else 0,
+        "days": days,
+        "weekday": {
+            "games": weekday_games.tolist(),
+            "wins": weekday_wins.tolist(),
+            "win_rate": win_rates(weekday_wins, weekday_games),
+        },
+        "month": {
+            "games": month_games.tolist(),
+            "wins": month_wins.tolist(),
+            "win_rate": win_rates(month_wins, month_games),
+        },
+    }
+
+
+def get_calendar(user_id: int, year: Optional[int] = None, sport: Optional[str] = None) -> Dict:
+    """Get a user's activity calendar for a year (defaults to the current year)."""
+    year = year or date.today().year
+    key = (user_id, year, sport, get_data_version(user_id))
+
+    with _calendar_cache_lock:
+        cached = _calendar_cache.get(key)
+        if cached is not None:
+            _calendar_cache.move_to_end(key)
+            return cached
+
+    rows = load_daily_stats(user_id, f"{year:04d}-01-01", f"{year + 1:04d}-01-01", sport)
+    data = {"sport": sport, **build_calendar(year, rows)}
+
+    with _calendar_cache_lock:
+        _calendar_cache[key] = data
+        if len(_calendar_cache) > CALENDAR_CACHE_SIZE:
+            _calendar_cache.popitem(last=False)
+
+    return data
+
+
+# =============================================================================
+# PERIOD REPORTS
+# =============================================================================
+
+def _month_start(day: date, months_ahead: int = 0) -> date:
+    """First day of the month `months_ahead` months after day's month."""
+    index = day.year * 12 + day.month - 1 + months_ahead
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def parse_period(
+    period: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> Tuple[date, date]:
+    """
+    Resolve a report period to [start, end) dates.
+    period is "2026", "2026-03" or "2026-Q1"; a custom season uses start/end (inclusive).
+
+    Raises:
+        ValueError: If the period is malformed or too long
+    """
+    if period:
+        if _YEAR.match(period):
+            first = date(int(period), 1, 1)
+            last = date(first.year + 1, 1, 1)
+        elif _MONTH.match(period):
+            year, month = _MONTH.match(period).groups()
+            first = date(int(year), int(month), 1)
+            last = _month_start(first, 1)
+        elif _QUARTER.match(period):
+            year, quarter = _QUARTER.match(period).groups()
+            first = date(int(year), 3 * int(quarter) - 2, 1)
+            last = _month_start(first, 3)
+        else:
+            raise ValueError(f"período inválido: {period}")
+    elif start and end:
+        first = date.fromisoformat(start)
+        last = date.fromisoformat(end) + timedelta(days=1)
+    else:
+        raise ValueError("informe period ou start e end")
+
+    if not first < last or (last - first).days > MAX_REPORT_DAYS:
+        raise ValueError(f"o período deve ter entre 1 e {MAX_REPORT_DAYS} dias")
+    return first, last
+
+
+def load_period_totals(user_id: int, first: date, last: date, sport: Optional[str] = None) -> list:
+    """
+    Per month and sport totals for [first, last): whole months come from the
+    monthly rollup, the partial months at either edge from the daily rollup.
+    """
+    full_start = first if first.day == 1 else _month_start(first, 1)
+    full_end = _month_start(last)
+    sport_filter = " AND sport = ?" if sport else ""
+    sport_params = [sport] if sport else []
+
+    queries, params = [], []
+    if full_start < full_end:
+        queries.append(
+            "SELECT month, sport, games, wins, losses, draws FROM game_monthly_stats "
+            f"WHERE user_id = ? AND month >= ? AND month < ?{sport_filter}"
+        )
+        params += [user_id, full_start.isoformat()[:7], full_end.isoformat()[:7]] + sport_params
+        edges = [(first, full_start), (full_end, last)]
+    else:
+        edges = [(first, last)]
+
+    for edge_start, edge_end in edges:
+        if edge_start < edge_end:
+            queries.append(
+                "SELECT substr(game_date, 1, 7) as month, sport, SUM(games), SUM(wins), SUM(losses), SUM(draws) "
+                "FROM game_daily_stats "
+                f"WHERE user_id = ? AND game_date >= ? AND game_date < ?{sport_filter} "
+                "GROUP BY substr(game_date, 1, 7), sport"
+            )
+            params += [user_id, edge_start.isoformat(), edge_end.isoformat()] + sport_params
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(" UNION ALL ".join(queries) + " ORDER BY month, sport", params)
+    rows = [tuple(row) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def _record(games: int, wins: int, losses: int, draws: int) -> Dict:
+    """Win/loss record with its win rate (%)."""
+    return {
+        "games": games,
+        "wins": wins,
+        "losses": losses,
+        "draws": draws,
+        "win_rate": round(wins / games * 100, 1) if games else 0,
+    }
+
+
+def load_matchups(user_id: int, first: date, last: date, sport: Optional[str] = None) -> Dict:
+    """Opponents first met in the period, and the best/worst records against opponents in it."""
+    sport_filter = " AND sport = ?" if sport else ""
+    params = [user_id] + ([sport] if sport else [])
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    # First meeting per opponent, read from the (user_id, opponent column, game_date) indexes
+    cursor.execute(f"""
+        SELECT player_id, MIN(first_meeting) as first_meeting FROM (
+            SELECT opponent_id as player_id, MIN(game_date) as first_meeting
+            FROM games WHERE user_id = ?{sport_filter} GROUP BY opponent_id
+            UNION ALL
+            SELECT opponent2_id, MIN(game_date)
+            FROM games WHERE user_id = ? AND opponent2_id IS NOT NULL{sport_filter} GROUP BY opponent2_id
+        )
+        GROUP BY player_id
+        HAVING MIN(first_meeting) >= ? AND MIN(first_meeting) < ?
+        ORDER BY first_meeting
+    """, params * 2 + [first.isoformat(), last.isoformat()])
+    new_opponents = [{"player_id": row["player_id"], "first_meeting": row["first_meeting"]}
+                     for row in cursor.fetchall()]
+
+    period_params = [user_id, first.isoformat(), last.isoformat()] + ([sport] if sport else [])
+    cursor.execute(f"""
+        SELECT player_id, COUNT(*) as games, SUM(result = 'win') as wins,
+               SUM(result = 'loss') as losses, SUM(result = 'draw') as draws
+        FROM (
+            SELECT opponent_id as player_id, result FROM games
+            WHERE user_id = ? AND game_date >= ? AND game_date < ?{sport_filter}
+            UNION ALL
+            SELECT opponent2_id, result FROM games
+            WHERE user_id = ? AND game_date >= ? AND game_date < ?{sport_filter} AND opponent2_id IS NOT NULL
+        )
+        GROUP BY player_id
+        HAVING COUNT(*) >= ?
+    """, period_params * 2 + [MIN_MATCHUP_GAMES])
+    records = [{"player_id": row["player_id"], **_record(row["games"], row["wins"], row["losses"], row["draws"])}
+               for row in cursor.fetchall()]
+    conn.close()
+
+    best = sorted(records, key=lambda r: (-r["win_rate"], -r["games"]))
+    worst = sorted(records, key=lambda r: (r["win_rate"], -r["games"]))
+    return {
+        "new_opponents": new_opponents,
+        "best_matchups": best[:MATCHUPS_IN_REPORT],
+        "worst_matchups": worst[:MATCHUPS_IN_REPORT],
+    }
+
+
+def load_unlocked_achievements(user_id: int, first: date, last: date) -> List[Dict]:
+    """Achievements unlocked during the period."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT a.id, a.name, a.icon, a.rarity, ua.unlocked_at
+        FROM user_achievements ua
+        JOIN achievements a ON ua.achievement_id = a.id
+        WHERE ua.user_id = ? AND ua.unlocked_at >= ? AND ua.unlocked_at < ?
+        ORDER BY ua.unlocked_at
+    """, (user_id, first.isoformat(), last.isoformat()))
+    achievements = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return achievements
+
+
+def build_period_report(user_id: int, first: date, last: date, sport: Optional[str] = None) -> Dict:
+    """Assemble a period report from the rollups plus the period's matchups and achievements."""
+    totals = [0, 0, 0, 0]
+    by_sport: Dict[str, list] = {}
+    by_month: Dict[str, list] = {}
+    for month, row_sport, *counts in load_period_totals(user_id, first, last, sport):
+        for bucket in (totals, by_sport.setdefault(row_sport, [0, 0, 0, 0]),
+                       by_month.setdefault(month, [0, 0, 0, 0])):
+            for i, value in enumerate(counts):
+                bucket[i] += value
+
+    return {
+        "start": first.isoformat(),
+        "end": (last - timedelta(days=1)).isoformat(),
+        "sport": sport,
+        **_record(*totals),
+        "by_sport": {name: _record(*counts) for name, counts in by_sport.items()},
+        "by_month": [{"month": month, **_record(*counts)} for month, counts in by_month.items()],
+        **load_matchups(user_id, first, last, sport),
+        "achievements_unlocked": load_unlocked_achievements(user_id, first, last),
+    }
+
+
+def _attach_player_names(report: Dict, user_id: int) -> Dict:
+    """Fill current player names (not stored, since players can be renamed)."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, name FROM players WHERE user_id = ?", (user_id,))
+    names = {row["id"]: row["name"] for row in cursor.fetchall()}
+    conn.close()
+
+    for section in ("new_opponents", "best_matchups", "worst_matchups"):
+        for entry in report[section]:
+            entry["name"] = names.get(entry["player_id"])
+    return report
+
+
+def get_period_report(user_id: int, first: date, last: date, sport: Optional[str] = None) -> Dict:
+    """
+    Get the report for [first, last). Once the period has ended the report is
+    stored in period_reports; triggers on games drop it if a game up to the
+    period's end is later added, deleted or changed (date, result, players).
+    """
+    closed = last <= date.today()
+    key = (user_id, sport or "", first.isoformat(), last.isoformat())
+
+    if closed:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT report FROM period_reports
+            WHERE user_id = ? AND sport = ? AND start_date = ? AND end_date = ?
+        """, key)
+        row = cursor.fetchone()
+        conn.close()
+        if row:
+            return _attach_player_names({**json.loads(row["report"]), "closed": True}, user_id)
+
+    report = build_period_report(user_id, first, last, sport)
+
+    if closed:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO period_reports (user_id, sport, start_date, end_date, report)
+            VALUES (?, ?, ?, ?, ?)
+        """, key + (json.dumps(report),))
+        conn.commit()
+        conn.close()
+
+    return _attach_player_names({**report, "closed": closed}, user_id)
@@ -0,0 +1,563 @@
+"""
+Racket Pro Analyzer - Static Cache & Compression
+HTML pages and text assets are read once at startup, run through the asset
+pipeline (assets.py) and kept in memory as raw, gzip and brotli variants with
+strong ETags; JSON API responses above a size threshold are compressed on the fly.
+The slow static compression is done at image build time
+(python -m api.static_cache --precompress) and read back from PRECOMPRESSED_DIR
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+from api.assets import (
+    build_assets, fingerprint, rewrite_urls, render_service_worker, SERVICE_WORKER, IMMUTABLE_CACHE_CONTROL
+)
+from api.images import find_variants, add_srcset, negotiate_image
+from api.locales import (
+    load_locales, referenced_keys, page_bundle, uses_i18n, bundle_path, encode_bundle, inline_bundle,
+    resolve_language, DEFAULT_LANGUAGE, LOCALES_DIR, BUNDLES_DIR
+)
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Configuration
+STATIC_CACHE_ENABLED = os.environ.get("STATIC_CACHE_ENABLED", "true").lower() != "false"
+# Re-read files whose mtime changed (for editing pages locally)
+STATIC_CACHE_RELOAD = os.environ.get("STATIC_CACHE_RELOAD", "false").lower() == "true"
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT_DIR, "static")
+# Compressed variants by content hash; written to only if the directory exists
+PRECOMPRESSED_DIR = os.environ.get("STATIC_PRECOMPRESSED_DIR", os.path.join(ROOT_DIR, ".precompressed"))
+
+# Files kept in memory; anything else (images, ...) is served from disk
+CACHED_EXTENSIONS = {".html", ".js", ".css", ".json", ".svg", ".txt", ".webmanifest"}
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml",
+                      "application/manifest+json")
+
+# Precompressed variants use the slowest settings; live responses favour speed
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+LIVE_GZIP_LEVEL = 6
+LIVE_BROTLI_QUALITY = 4
+
+PAGE_CACHE_CONTROL = "no-cache"
+
+# Bundle report: <link> rels fetched with the page vs. ahead of use
+INITIAL_LINK_RELS = {"stylesheet", "preload"}
+DEFERRED_LINK_RELS = {"prefetch"}
+PARSE_TIMING_RUNS = 5
+
+_PAGE_SCRIPT = re.compile(r'<script\b[^>]*\bsrc="/static/([^"]+)"')
+_PAGE_LINK = re.compile(r"<link\b[^>]*>")
+_LINK_REL = re.compile(r'\brel="([^"]+)"')
+_LINK_HREF = re.compile(r'\bhref="/static/([^"]+)"')
+
+
+# =============================================================================
+# COMPRESSION
+# =============================================================================
+
+def negotiate_encoding(accept_encoding: Optional[str], available=("br", "gzip")) -> str:
+    """Best encoding the client accepts among the available ones ("identity" if none)."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+
+    best, best_q = "identity", 0.0
+    for encoding in available:
+        if encoding == "br" and brotli is None:
+            continue
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, live: bool = True) -> bytes:
+    """Compress data with gzip or brotli."""
+    if encoding == "br":
+        return brotli.compress(data, quality=LIVE_BROTLI_QUALITY if live else STATIC_BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=LIVE_GZIP_LEVEL if live else STATIC_GZIP_LEVEL, mtime=0)
+    return data
+
+
+def precompress(data: bytes, digest: str, encoding: str) -> bytes:
+    """
+    Static-quality compression of data (whose sha256 is digest), read from
+    PRECOMPRESSED_DIR when it was compressed before, and stored there otherwise.
+    """
+    level = STATIC_BROTLI_QUALITY if encoding == "br" else STATIC_GZIP_LEVEL
+    path = os.path.join(PRECOMPRESSED_DIR, f"{digest}.{encoding}{level}")
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+
+    compressed = compress(data, encoding, live=False)
+    if os.path.isdir(PRECOMPRESSED_DIR):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+    return compressed
+
+
+def is_compressible(media_type: str) -> bool:
+    """Whether a content type is worth compressing."""
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+# =============================================================================
+# STATIC CACHE
+# =============================================================================
+
+class CachedFile:
+    """One file's bytes in every encoding worth keeping, with per-encoding ETags."""
+
+    def __init__(self, path: str, data: Optional[bytes] = None, media_type: Optional[str] = None,
+                 vary: str = "Accept-Encoding"):
+        self.path = path
+        self.vary = vary
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        self.mtime = os.stat(path).st_mtime
+        self.media_type = media_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        # (Starlette adds the charset to text/* itself)
+        if self.media_type.endswith(("javascript", "json")) and not self.media_type.startswith("text/"):
+            self.media_type += "; charset=utf-8"
+
+        full_digest = hashlib.sha256(data).hexdigest()
+        digest = full_digest[:20]
+        self.variants: Dict[str, bytes] = {"identity": data}
+        self.etags: Dict[str, str] = {"identity": f'"{digest}"'}
+        if is_compressible(self.media_type) and len(data) >= COMPRESSION_MIN_BYTES:
+            for encoding in ("br", "gzip"):
+                if encoding == "br" and brotli is None:
+                    continue
+                compressed = precompress(data, full_digest, encoding)
+                if len(compressed) < len(data):
+                    self.variants[encoding] = compressed
+                    self.etags[encoding] = f'"{digest}-{encoding}"'
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(data) for data in self.variants.values())
+
+    def is_stale(self) -> bool:
+        """Whether the file on disk changed since it was read."""
+        try:
+            return os.stat(self.path).st_mtime != self.mtime
+        except OSError:
+            return True
+
+    def response(self, request_headers: Headers, cache_control: str = PAGE_CACHE_CONTROL,
+                 method: str = "GET") -> Response:
+        """The best variant for the request, or 304 if the client's copy is current."""
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"), tuple(self.variants))
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": cache_control,
+            "Vary": self.vary,
+        }
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags or self.etags[encoding] in tags:
+                return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        body = self.variants[encoding]
+        if method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=headers, media_type=self.media_type)
+        return Response(body, headers=headers, media_type=self.media_type)
+
+
+class StaticCache:
+    """
+    In-memory copies of the HTML pages (by file name) and text assets under
+    static/, minified and fingerprinted by the asset pipeline. Assets answer at
+    their plain path (revalidated) and their fingerprinted path (immutable).
+    """
+
+    def __init__(self, root_dir: str = ROOT_DIR, static_dir: str = STATIC_DIR):
+        self.root_dir = root_dir
+        self.static_dir = static_dir
+        self.pages: Dict[str, CachedFile] = {}
+        # (page, language) -> page with that language's bundle inlined
+        self.localized_pages: Dict[tuple, CachedFile] = {}
+        self.assets: Dict[str, CachedFile] = {}
+        # Fingerprinted path -> plain path, for every file under static/
+        self.fingerprinted: Dict[str, str] = {}
+        # Image variant PNG -> its AVIF/WebP versions, by format
+        self.image_alternatives: Dict[str, Dict[str, str]] = {}
+        # Language -> full translations merged over the default language
+        self.locales: Dict[str, Dict] = {}
+
+    def build(self):
+        """Run the asset pipeline, then read, rewrite and compress every page."""
+        paths = []
+        if os.path.isdir(self.static_dir):
+            for directory, _, files in os.walk(self.static_dir):
+                for name in files:
+                    path = os.path.join(directory, name)
+                    paths.append(os.path.relpath(path, self.static_dir).replace(os.sep, "/"))
+        variants = find_variants(self.static_dir)
+        built = build_assets(self.static_dir, paths, variants)
+        urls = dict(built["urls"])
+
+        page_data = {}
+        for name in sorted(os.listdir(self.root_dir)):
+            if name.endswith(".html") or name == "manifest.json":
+                with open(os.path.join(self.root_dir, name), "rb") as f:
+                    page_data[name] = rewrite_urls(add_srcset(f.read(), variants), built["refs"])
+
+        # Locale bundles: the keys each page and the scripts it loads use
+        locales = load_locales(self.static_dir)
+        plain = {fingerprinted: path for path, fingerprinted in urls.items()}
+        bundles: Dict[str, Dict[str, bytes]] = {}
+        for name, data in page_data.items():
+            if not name.endswith(".html") or not uses_i18n(data) or DEFAULT_LANGUAGE not in locales:
+                continue
+            texts = [data.decode("utf-8")] + [
+                built["files"][plain[path]].decode("utf-8")
+                for paths_by_load in page_assets(data).values() for path in paths_by_load
+                if plain.get(path, "").endswith(".js")
+            ]
+            referenced = referenced_keys(texts)
+            bundles[name] = {
+                language: page_bundle(language, tree, referenced) for language, tree in locales.items()
+            }
+            for language, bundle in bundles[name].items():
+                path = bundle_path(name, language)
+                built["files"][path] = encode_bundle(bundle)
+                urls[path] = fingerprint(path, built["files"][path])
+
+        localized = {}
+        for name, by_language in bundles.items():
+            bundle_urls = {language: "/static/" + urls[bundle_path(name, language)] for language in by_language}
+            for language, bundle in by_language.items():
+                localized[(name, language)] = inline_bundle(page_data[name], bundle, bundle_urls)
+            page_data[name] = localized[(name, DEFAULT_LANGUAGE)]
+
+        # Localized pages depend on the language cookie
+        localized_pages = {
+            key: CachedFile(os.path.join(self.root_dir, key[0]), data, vary="Accept-Encoding, Cookie")
+            for key, data in localized.items()
+        }
+        pages = {
+            name: localized_pages.get((name, DEFAULT_LANGUAGE)) or CachedFile(os.path.join(self.root_dir, name), data)
+            for name, data in page_data.items()
+        }
+
+        assets = {}
+        for path, data in built["files"].items():
+            if os.path.splitext(path)[1].lower() not in CACHED_EXTENSIONS:
+                continue
+            if path == SERVICE_WORKER:
+                data = render_service_worker(data, page_data, urls)
+            source = path
+            if path.startswith(BUNDLES_DIR + "/"):
+                # Stale when its source locale changes
+                source = f"{LOCALES_DIR}/{os.path.basename(path)}"
+            cached = CachedFile(os.path.join(self.static_dir, source), data)
+            assets[path] = cached
+            if path in urls:
+                assets[urls[path]] = cached
+
+        self.pages, self.localized_pages, self.assets, self.locales = pages, localized_pages, assets, locales
+        self.fingerprinted = {fingerprinted: path for path, fingerprinted in urls.items()}
+        self.image_alternatives = {
+            formats["png"]: {fmt: path for fmt, path in formats.items() if fmt != "png"}
+            for widths in variants.values() for formats in widths.values()
+            if "png" in formats and len(formats) > 1
+        }
+        print(f"[STATIC] Cached {len(pages)} pages and {len(set(map(id, assets.values())))} assets, "
+              f"fingerprinted {len(urls)} files, {len(localized_pages)} localized pages "
+              f"({self.stats()['bytes'] // 1024} KB with compressed variants)")
+
+    def _get(self, attribute: str, key) -> Optional[CachedFile]:
+        """A cached file, rebuilding everything first if reloading is on and it changed on disk."""
+        cached = getattr(self, attribute).get(key)
+        if cached is not None and STATIC_CACHE_RELOAD and cached.is_stale():
+            self.build()
+            cached = getattr(self, attribute).get(key)
+        return cached
+
+    def page(self, name: str, language: Optional[str] = None) -> Optional[CachedFile]:
+        """A page by file name (e.g. "games.html"), with the language's locale bundle inlined."""
+        if not STATIC_CACHE_ENABLED:
+            path = os.path.join(self.root_dir, os.path.basename(name))
+            return CachedFile(path) if os.path.isfile(path) else None
+        if language:
+            cached = self._get("localized_pages", (name, resolve_language(language, self.locales)))
+            if cached is not None:
+                return cached
+        return self._get("pages", name)
+
+    def asset(self, path: str) -> Optional[CachedFile]:
+        """A static asset by plain or fingerprinted path relative to static/ (e.g. "js/games.js")."""
+        return self._get("assets", path)
+
+    def stats(self) -> Dict:
+        """Cached files and bytes used."""
+        files = {
+            id(f): f for group in (self.pages, self.localized_pages, self.assets) for f in group.values()
+        }.values()
+        return {"files": len(files), "bytes": sum(f.nbytes for f in files)}
+
+
+# Singleton instance
+_static_cache = None
+
+
+def get_static_cache():
+    """Get singleton StaticCache instance"""
+    global _static_cache
+    if _static_cache is None:
+        _static_cache = StaticCache()
+        if STATIC_CACHE_ENABLED:
+            _static_cache.build()
+    return _static_cache
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that answers from the static cache when the file is in it"""
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        cache = get_static_cache()
+        path = path.replace(os.sep, "/")
+        immutable = path in cache.fingerprinted
+        cached = cache.asset(path)
+        if cached is not None:
+            return cached.response(
+                Headers(scope=scope),
+                IMMUTABLE_CACHE_CONTROL if immutable else PAGE_CACHE_CONTROL,
+                scope["method"]
+            )
+
+        # Fingerprinted files kept on disk (images, ...) are served from their plain path,
+        # image variants as AVIF or WebP when the client accepts them
+        path = cache.fingerprinted.get(path, path)
+        alternatives = cache.image_alternatives.get(path)
+        if alternatives:
+            path = negotiate_image(Headers(scope=scope).get("accept"), alternatives) or path
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            if immutable:
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            if alternatives:
+                response.headers.add_vary_header("Accept")
+        return response
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+class CompressionMiddleware:
+    """
+    Compress JSON responses of at least COMPRESSION_MIN_BYTES with brotli or
+    gzip. Other content types (streams, files, cached pages) pass through.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        chunks = []
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if ("content-encoding" in headers
+                        or not headers.get("content-type", "").startswith("application/json")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            if len(body) >= self.minimum_size:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
+
+
+# =============================================================================
+# BUNDLE REPORT
+# =============================================================================
+
+# Median V8 compile time per file: node -e PARSE_TIMER <runs> <file>...
+PARSE_TIMER = """
+const fs = require('fs'), vm = require('vm');
+const [runs, ...files] = process.argv.slice(1);
+for (const file of files) {
+    const source = fs.readFileSync(file, 'utf8'), times = [];
+    for (let i = 0; i < Number(runs); i++) {
+        const start = process.hrtime.bigint();
+        new vm.Script(source, { filename: `${file}#${i}` });  // new name: no compile cache
+        times.push(Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    times.sort((a, b) => a - b);
+    console.log(times[times.length >> 1]);
+}
+"""
+
+
+def page_assets(page: bytes) -> Dict[str, List[str]]:
+    """Fingerprinted static paths a page loads with it ("initial") and ahead of use ("deferred")."""
+    text = page.decode("utf-8")
+    assets = {"initial": [], "deferred": []}
+    for path in _PAGE_SCRIPT.findall(text):
+        assets["initial"].append(path)
+    for tag in _PAGE_LINK.findall(text):
+        rel, href = _LINK_REL.search(tag), _LINK_HREF.search(tag)
+        if not rel or not href:
+            continue
+        if rel.group(1) in INITIAL_LINK_RELS:
+            assets["initial"].append(href.group(1))
+        elif rel.group(1) in DEFERRED_LINK_RELS:
+            assets["deferred"].append(href.group(1))
+    return {load: list(dict.fromkeys(paths)) for load, paths in assets.items()}
+
+
+def measure_parse_ms(scripts: Dict[str, bytes], runs: int = PARSE_TIMING_RUNS) -> Dict[str, float]:
+    """Median compile time of each script in Node's V8 (empty if node is not installed)."""
+    node = shutil.which("node")
+    if not node or not scripts:
+        return {}
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i, data in enumerate(scripts.values()):
+            files.append(os.path.join(tmp, f"{i}.js"))
+            with open(files[-1], "wb") as f:
+                f.write(data)
+        output = subprocess.run([node, "-e", PARSE_TIMER, str(runs)] + files,
+                                capture_output=True, text=True, check=True).stdout.split()
+    return dict(zip(scripts, map(float, output)))
+
+
+def bundle_report(cache: StaticCache) -> Dict[str, List[Dict]]:
+    """
+    Per page, one row for the page itself and one per asset it loads: served
+    bytes (minified, gzip, brotli), when it is loaded and, for scripts, the
+    V8 compile time.
+    """
+    scripts = {
+        path: cached.variants["identity"] for path, cached in cache.assets.items()
+        if path in cache.fingerprinted and path.endswith(".js")
+    }
+    parse_ms = measure_parse_ms(scripts)
+    report = {}
+    for name, page in sorted(cache.pages.items()):
+        if not name.endswith(".html"):
+            continue
+        files = [(name, "initial", page)]
+        for load, paths in page_assets(page.variants["identity"]).items():
+            files += [(path, load, cache.assets[path]) for path in paths if path in cache.assets]
+        report[name] = [{
+            "path": cache.fingerprinted.get(path, path),
+            "load": load,
+            "bytes": len(cached.variants["identity"]),
+            "gzip": len(cached.variants.get("gzip", cached.variants["identity"])),
+            "br": len(cached.variants.get("br", cached.variants["identity"])),
+            "parse_ms": parse_ms.get(path),
+        } for path, load, cached in files]
+    return report
+
+
+def print_bundle_report(report: Dict[str, List[Dict]]):
+    """Table per page with initial and deferred totals."""
+    columns = ("bytes", "gzip", "br", "parse_ms")
+    for name, rows in report.items():
+        print(f"\n{name}")
+        print(f"  {'asset':<34}{'load':>10}" + "".join(f"{c:>10}" for c in columns))
+        for row in rows:
+            parse = f"{row['parse_ms']:.2f}" if row["parse_ms"] is not None else "-"
+            print(f"  {row['path']:<34}{row['load']:>10}{row['bytes']:>10}{row['gzip']:>10}{row['br']:>10}{parse:>10}")
+        for load in ("initial", "deferred"):
+            selected = [row for row in rows if row["load"] == load]
+            parse = sum(row["parse_ms"] or 0 for row in selected)
+            print(f"  {'total':<34}{load:>10}" + "".join(
+                f"{sum(row[c] for row in selected):>10}" for c in ("bytes", "gzip", "br")
+            ) + f"{parse:>10.2f}")
+
+
+if __name__ == "__main__":
+    # python -m api.static_cache [root dir]: served size and parse cost of each page's assets
+    # python -m api.static_cache --precompress [root dir]: fill PRECOMPRESSED_DIR (image build)
+    args = sys.argv[1:]
+    precompress_only = "--precompress" in args
+    args = [arg for arg in args if arg != "--precompress"]
+    root = args[0] if args else ROOT_DIR
+    if precompress_only:
+        os.makedirs(PRECOMPRESSED_DIR, exist_ok=True)
+    static_cache = StaticCache(root, os.path.join(root, "static"))
+    static_cache.build()
+    if not precompress_only:
+        print_bundle_report(bundle_report(static_cache))
@@ -0,0 +1,224 @@
+"""
+Racket Pro Analyzer - Time Series
+Rolling N-game / N-day win rates, exponential moving averages and regression
+slopes per sport, opponent or partner, computed in one vectorized pass
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from api.analytics import period_cutoff, round_half_up
+from api.database import get_db_connection, get_data_version
+from api.game_store import get_game_store, SPORT_CODES, WIN
+
+GROUP_BY_OPTIONS = ["none", "sport", "opponent", "partner"]
+MAX_WINDOWS = 5
+MAX_GAME_WINDOW = 1000
+MAX_DAY_WINDOW = 3650
+TIMESERIES_CACHE_SIZE = 256
+
+_timeseries_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_timeseries_cache_lock = threading.Lock()
+
+
+def parse_windows(value: Optional[str], maximum: int) -> List[int]:
+    """
+    Parse a comma-separated list of window sizes like "10,30".
+
+    Raises:
+        ValueError: If a size is not an integer in 1..maximum or there are too many
+    """
+    if not value:
+        return []
+    windows = sorted({int(part) for part in value.split(",") if part.strip()})
+    if len(windows) > MAX_WINDOWS or any(w < 1 or w > maximum for w in windows):
+        raise ValueError(f"até {MAX_WINDOWS} janelas entre 1 e {maximum}")
+    return windows
+
+
+def load_game_groups(user_id: int, group_by: str, sport: Optional[str] = None, since: Optional[str] = None):
+    """
+    Get (group keys, day numbers, wins) with one entry per game and group, in date order.
+    In doubles a game belongs to both opponents, so it appears under each of them.
+    """
+    games = get_game_store().get(user_id).select(sport, since)
+
+    if group_by == "opponent":
+        key_columns = ["opponent_id", "opponent2_id"]
+    elif group_by == "partner":
+        key_columns = ["partner_id"]
+    else:
+        key_columns = [None]
+
+    keys, days, wins, ids = [], [], [], []
+    for column in key_columns:
+        present = games[column] != 0 if column else np.ones(len(games["id"]), dtype=bool)
+        if group_by == "sport":
+            keys.append(np.array(SPORT_CODES, dtype=object)[games["sport"][present]])
+        elif column:
+            keys.append(games[column][present].astype(object))
+        else:
+            keys.append(np.full(int(present.sum()), "all", dtype=object))
+        days.append(games["day"][present].astype(np.int64))
+        wins.append((games["result"][present] == WIN).astype(np.int64))
+        ids.append(games["id"][present])
+
+    keys, days, wins, ids = (np.concatenate(parts) for parts in (keys, days, wins, ids))
+    order = np.lexsort((ids, days))
+
+    names = {}
+    if group_by in ("opponent", "partner"):
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name FROM players WHERE user_id = ?", (user_id,))
+        names = {row["id"]: row["name"] for row in cursor.fetchall()}
+        conn.close()
+
+    return keys[order], days[order], wins[order], names
+
+
+def grouped_ema(values: np.ndarray, group_starts: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponential moving average restarted at each group start (values >= 0, grouped contiguously).
+
+    Within a group the average at i is sum(w_j * v_j * (1 - alpha) ** (i - j)), with w = 1 at
+    the group start and alpha after it: a running sum of terms scaled by (1 - alpha) ** -j.
+    The running sum is taken over the whole array in log space (np.logaddexp.accumulate,
+    which cannot overflow), and each group then drops what had accumulated before its start.
+    """
+    n = len(values)
+    if alpha >= 1:
+        return values.astype(float)
+    log_decay = np.log1p(-alpha)
+    position = np.arange(n)
+    weights = np.full(n, alpha)
+    weights[group_starts] = 1.0
+    counts = np.diff(np.append(group_starts, n))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals = np.logaddexp.accumulate(np.log(weights * values) - position * log_decay)
+        before_group = np.concatenate(([-np.inf], totals))[np.repeat(group_starts, counts)]
+        ema = np.exp(totals + position * log_decay) * -np.expm1(before_group - totals)
+    # Nothing accumulated yet (only zeros so far) gives -inf - -inf above
+    ema[np.isneginf(totals)] = 0.0
+    return ema
+
+
+def build_timeseries(
+    group_keys: np.ndarray,
+    days: np.ndarray,
+    wins: np.ndarray,
+    names: Dict,
+    game_windows: List[int],
+    day_windows: List[int],
+    ema_alpha: float
+) -> List[Dict]:
+    """Compute every series for every group in a single pass over the grouped games (in date order)."""
+    n = len(group_keys)
+    if n == 0:
+        return []
+
+    unique_keys, group_codes = np.unique(group_keys.astype(str), return_inverse=True)
+
+    # Stable sort by group keeps each group's games in date order and contiguous
+    order = np.argsort(group_codes, kind="stable")
+    group_codes, days, wins = group_codes[order], days[order], wins[order]
+    original_keys = [group_keys[i] for i in order]
+
+    counts = np.bincount(group_codes, minlength=len(unique_keys))
+    group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position = np.arange(n)
+    start_of_group = group_starts[group_codes]
+    index_in_group = position - start_of_group
+
+    cumulative = np.concatenate(([0], np.cumsum(wins)))
+    end = position + 1
+
+    rolling_games = {}
+    for window in game_windows:
+        start = np.maximum(start_of_group, end - window)
+        rolling_games[str(window)] = round_half_up((cumulative[end] - cumulative[start]) / (end - start) * 100)
+
+    # N-day windows: first game of the same group on or after day - (N - 1)
+    composite = group_codes.astype(np.int64) * 10_000_000 + days
+    rolling_days = {}
+    for window in day_windows:
+        start = np.searchsorted(composite, composite - (window - 1), side="left")
+        rolling_days[str(window)] = round_half_up((cumulative[end] - cumulative[start]) / (end - start) * 100)
+
+    # Rounded to 9 decimals first so exact ties (common with alpha = 0.5, 0.25, ...) round up as before
+    ema = round_half_up(np.round(grouped_ema(wins.astype(float), group_starts, ema_alpha) * 100, 9))
+
+    # Least-squares slope of win (1) / loss (-1) against game number, per group
+    x = index_in_group + 1.0
+    y = np.where(wins == 1, 1.0, -1.0)
+    sum_x = np.bincount(group_codes, weights=x)
+    sum_y = np.bincount(group_codes, weights=y)
+    sum_xy = np.bincount(group_codes, weights=x * y)
+    sum_xx = np.bincount(group_codes, weights=x * x)
+    denominator = counts * sum_xx - sum_x ** 2
+    slopes = np.divide(counts * sum_xy - sum_x * sum_y, denominator,
+                       out=np.zeros(len(counts)), where=denominator != 0)
+
+    series = []
+    for code in range(len(unique_keys)):
+        lo, hi = group_starts[code], group_starts[code] + counts[code]
+        key = original_keys[lo]
+        series.append({
+            "key": key,
+            "name": names.get(key, key),
+            "games": int(counts[code]),
+            "dates": [str(np.datetime64(int(d), "D")) for d in days[lo:hi]],
+            "results": wins[lo:hi].tolist(),
+            "rolling_games": {w: values[lo:hi].tolist() for w, values in rolling_games.items()},
+            "rolling_days": {w: values[lo:hi].tolist() for w, values in rolling_days.items()},
+            "ema": ema[lo:hi].tolist(),
+            "slope": round(float(slopes[code]), 4),
+        })
+
+    series.sort(key=lambda s: s["games"], reverse=True)
+    return series
+
+
+def get_timeseries(
+    user_id: int,
+    group_by: str = "none",
+    sport: Optional[str] = None,
+    period: str = "all",
+    game_windows: Optional[List[int]] = None,
+    day_windows: Optional[List[int]] = None,
+    ema_alpha: float = 0.2
+) -> Dict:
+    """Get rolling series for a user, recomputing only when their games changed."""
+    game_windows = game_windows or []
+    day_windows = day_windows or []
+    since = period_cutoff(period)
+    key = (user_id, group_by, sport, since, tuple(game_windows), tuple(day_windows),
+           ema_alpha, get_data_version(user_id))
+
+    with _timeseries_cache_lock:
+        cached = _timeseries_cache.get(key)
+        if cached is not None:
+            _timeseries_cache.move_to_end(key)
+            return cached
+
+    group_keys, days, wins, names = load_game_groups(user_id, group_by, sport, since)
+    data = {
+        "group_by": group_by,
+        "sport": sport,
+        "period": period,
+        "game_windows": game_windows,
+        "day_windows": day_windows,
+        "ema_alpha": ema_alpha,
+        "series": build_timeseries(group_keys, days, wins, names, game_windows, day_windows, ema_alpha),
+    }
+
+    with _timeseries_cache_lock:
+        _timeseries_cache[key] = data
+        if len(_timeseries_cache) > TIMESERIES_CACHE_SIZE:
+            _timeseries_cache.popitem(last=False)
+
+    return data
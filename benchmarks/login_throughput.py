@@ -0,0 +1,82 @@
+"""
+Login throughput benchmark for Racket Pro Analyzer
+Runs concurrent email/password logins against a temporary database and
+reports logins/sec, latency and event loop lag for each concurrency level.
+
+Usage:
+    python -m benchmarks.login_throughput [--logins 64] [--concurrency 1 4 16]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from api import auth, database
+
+
+async def _measure_loop_lag(stop: asyncio.Event, samples: list):
+    """Record how late a 10 ms ticker wakes up while logins are running"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append((time.perf_counter() - start - 0.01) * 1000)
+
+
+async def _run_level(email: str, password: str, logins: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_login():
+        async with semaphore:
+            start = time.perf_counter()
+            user = await database.authenticate_user(email, password)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert user is not None
+
+    stop = asyncio.Event()
+    lag_samples = []
+    lag_task = asyncio.create_task(_measure_loop_lag(stop, lag_samples))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await lag_task
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "logins_per_sec": logins / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "max_loop_lag_ms": max(lag_samples) if lag_samples else 0.0,
+    }
+
+
+async def main(logins: int, levels: list):
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DATABASE_PATH = os.path.join(tmp, "bench.db")
+        database.init_db()
+        auth.calibrate_password_hashing()
+
+        email, password = "bench@localhost", "bench-password"
+        database.create_user(email, await auth.get_password_hash_async(password), "Bench")
+
+        print(f"bcrypt rounds={auth.bcrypt_rounds} workers={auth.PASSWORD_HASH_WORKERS} logins={logins}")
+        print(f"{'conc':>5} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'loop lag ms':>12}")
+        for concurrency in levels:
+            r = await _run_level(email, password, logins, concurrency)
+            print(f"{r['concurrency']:>5} {r['logins_per_sec']:>10.1f} {r['p50_ms']:>9.1f} "
+                  f"{r['p95_ms']:>9.1f} {r['max_loop_lag_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
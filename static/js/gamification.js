@@ -361,7 +361,10 @@ function closeAchievementsModal() {
 
 async function checkAchievementsAfterGame() {
     const result = await checkAchievements();
+    await showGameRewards(result);
+}
 
+async function showGameRewards(result) {
     // Update streak badge
     updateStreakBadge(result.streak);
 
@@ -396,18 +399,25 @@ async function initGamification() {
     updateAchievementsButtonCount(unlockedCount);
 }
 
-// Auto-init when DOM is ready
-document.addEventListener('DOMContentLoaded', () => {
+// Auto-init when DOM is ready (games.js loads this script later, on idle)
+function autoInitGamification() {
     // Only init if user is logged in
     if (localStorage.getItem('token')) {
         // Delay init slightly to ensure other scripts are loaded
         setTimeout(initGamification, 500);
     }
-});
+}
+
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', autoInitGamification);
+} else {
+    autoInitGamification();
+}
 
 // Export functions for external use
 window.gamification = {
     checkAchievementsAfterGame,
+    showGameRewards,
     loadAchievementsSection,
     openAchievementsModal,
     closeAchievementsModal,
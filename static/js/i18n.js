@@ -5,22 +5,64 @@
 window.i18n = {
     currentLanguage: 'pt-BR',
     translations: {},
+    // Set from the bundle the server inlines (window.I18N_BUNDLE): page bundle
+    // URLs by language, and keys no locale defines (never requested)
+    bundles: null,
+    missing: new Set(),
+    pendingKeys: new Set(),
+    partial: false,
+    ready: false,
 
     async init() {
         this.currentLanguage = localStorage.getItem('language') || 'pt-BR';
-        await this.loadTranslations(this.currentLanguage);
+        const inline = window.I18N_BUNDLE;
+        if (inline) {
+            this.bundles = inline.bundles;
+        }
+        if (inline && inline.language === this.currentLanguage) {
+            this.useBundle(inline);
+        } else {
+            await this.loadTranslations(this.currentLanguage);
+        }
+        this.rememberLanguage(this.currentLanguage);
         this.applyTranslations();
         this.updateLanguageFlags();
+        this.ready = true;
 
         // Set HTML lang attribute for native elements (like date picker)
         document.documentElement.lang = this.currentLanguage;
     },
 
+    // Page bundle: only the keys this page uses, already merged with pt-BR
+    useBundle(bundle) {
+        this.translations = bundle.translations;
+        this.missing = new Set(bundle.missing || []);
+        this.partial = true;
+    },
+
+    // Cookie read by the server to inline the right bundle on the next page load
+    rememberLanguage(lang) {
+        document.cookie = `language=${lang}; path=/; max-age=31536000; SameSite=Lax`;
+    },
+
     async loadTranslations(lang) {
+        if (this.bundles) {
+            try {
+                const response = await fetch(this.bundles[lang] || this.bundles['pt-BR']);
+                if (response.ok) {
+                    this.useBundle(await response.json());
+                    return;
+                }
+            } catch (error) {
+                console.error('Error loading translation bundle:', error);
+            }
+        }
+
         try {
             const response = await fetch(`/static/locales/${lang}.json`);
             if (response.ok) {
                 this.translations = await response.json();
+                this.partial = false;
             } else {
                 console.warn(`Translation file not found for ${lang}, falling back to pt-BR`);
                 if (lang !== 'pt-BR') {
@@ -32,9 +74,36 @@ window.i18n = {
         }
     },
 
+    // Keys a page bundle lacks (e.g. built at runtime) are fetched in one batch
+    requestKey(key) {
+        this.missing.add(key); // Once per page load
+        this.pendingKeys.add(key);
+        if (this.pendingKeys.size === 1) {
+            setTimeout(() => this.loadPendingKeys(), 0);
+        }
+    },
+
+    async loadPendingKeys() {
+        const lang = this.currentLanguage;
+        const keys = [...this.pendingKeys];
+        this.pendingKeys.clear();
+        try {
+            const response = await fetch(`/api/locales/${lang}?keys=${encodeURIComponent(keys.join(','))}`);
+            if (!response.ok || lang !== this.currentLanguage) return;
+
+            const values = await response.json();
+            if (Object.keys(values).length === 0) return;
+            Object.entries(values).forEach(([key, value]) => this.set(key, value));
+            this.applyTranslations();
+        } catch (error) {
+            console.error('Error loading translation keys:', error);
+        }
+    },
+
     async setLanguage(lang) {
         this.currentLanguage = lang;
         localStorage.setItem('language', lang);
+        this.rememberLanguage(lang);
         await this.loadTranslations(lang);
         this.applyTranslations();
         this.updateLanguageFlags();
@@ -85,13 +154,33 @@ window.i18n = {
             if (value && typeof value === 'object') {
                 value = value[k];
             } else {
-                return null;
+                value = undefined;
+                break;
             }
         }
 
+        if (value === undefined || value === null) {
+            if (this.partial && !this.missing.has(key)) {
+                this.requestKey(key);
+            }
+            return null;
+        }
         return value;
     },
 
+    set(key, value) {
+        const keys = key.split('.');
+        const last = keys.pop();
+        let node = this.translations;
+        for (const k of keys) {
+            if (!node[k] || typeof node[k] !== 'object') {
+                node[k] = {};
+            }
+            node = node[k];
+        }
+        node[last] = value;
+    },
+
     updateLanguageFlags() {
         document.querySelectorAll('.language-flag').forEach(flag => {
             flag.classList.remove('active');
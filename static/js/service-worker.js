@@ -3,22 +3,18 @@
  * Enables PWA functionality including offline support and app installation
  */
 
-const CACHE_NAME = 'rpa-cache-v1';
-const STATIC_ASSETS = [
-    '/',
-    '/index.html',
-    '/login.html',
-    '/games.html',
-    '/static/css/styles.css',
-    '/static/js/app.js',
-    '/static/js/i18n.js',
-    '/static/js/games.js',
-    '/static/js/sports.js',
-    '/static/js/gamification.js',
-    '/static/images/icon-192.png',
-    '/static/images/icon-512.png',
-    '/manifest.json'
-];
+// Filled in by the server's asset pipeline (api/assets.py) with the pages and
+// the fingerprinted assets they reference; the version changes with any of them
+const PRECACHE_MANIFEST = /* precache-manifest */ {
+    version: 'dev',
+    urls: ['/', '/index.html', '/login.html', '/games.html', '/manifest.json']
+};
+
+const CACHE_NAME = `rpa-cache-${PRECACHE_MANIFEST.version}`;
+const STATIC_ASSETS = PRECACHE_MANIFEST.urls;
+
+// Fingerprinted assets (e.g. /static/js/games.1a2b3c4d5e.js) never change
+const FINGERPRINTED_ASSET = /\/static\/.+\.[0-9a-f]{10}\.\w+$/;
 
 // Install event - cache static assets
 self.addEventListener('install', (event) => {
@@ -48,7 +44,7 @@ self.addEventListener('activate', (event) => {
     );
 });
 
-// Fetch event - network first, fallback to cache
+// Fetch event
 self.addEventListener('fetch', (event) => {
     // Skip non-GET requests
     if (event.request.method !== 'GET') {
@@ -60,6 +56,25 @@ self.addEventListener('fetch', (event) => {
         return;
     }
 
+    // Fingerprinted assets - cache first, the network is only asked once per version
+    if (FINGERPRINTED_ASSET.test(new URL(event.request.url).pathname)) {
+        event.respondWith(
+            caches.match(event.request).then((cachedResponse) => {
+                return cachedResponse || fetch(event.request).then((response) => {
+                    if (response.ok) {
+                        const responseClone = response.clone();
+                        caches.open(CACHE_NAME).then((cache) => {
+                            cache.put(event.request, responseClone);
+                        });
+                    }
+                    return response;
+                });
+            })
+        );
+        return;
+    }
+
+    // Pages and other files - network first, fallback to cache
     event.respondWith(
         fetch(event.request)
             .then((response) => {
@@ -8,6 +8,7 @@
 // Voice Game Entry State
 const voiceGameEntry = {
     isActive: false,
+    venues: null,
     currentStep: 0,
     recognition: null,
     listeningTimeout: null,
@@ -414,9 +415,30 @@ function matchesKeywords(text, keywordType) {
 }
 
 /**
- * Search player by name (fuzzy matching)
+ * Search player by name on the server (trigram index), falling back to local matching
  */
-function searchPlayerByVoice(spokenName) {
+async function searchPlayerByVoice(spokenName) {
+    try {
+        const token = window.currentToken || localStorage.getItem('token');
+        const params = new URLSearchParams({ q: spokenName, sport: window.currentSport });
+        const response = await fetch(`${API_URL}/api/players/search?${params}`, {
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (response.ok) {
+            const matches = await response.json();
+            if (matches.length > 0 && matches[0].match === 'exact') return [matches[0]];
+            return matches;
+        }
+    } catch (error) {
+        console.error('Error searching players:', error);
+    }
+    return searchPlayerLocally(spokenName);
+}
+
+/**
+ * Search player by name among loaded players (fuzzy matching)
+ */
+function searchPlayerLocally(spokenName) {
     const lowerSpoken = spokenName.toLowerCase().trim();
     console.log('Searching for:', lowerSpoken, 'in', voiceGameEntry.players.length, 'players');
 
@@ -566,9 +588,30 @@ function calculateSimilarity(str1, str2) {
 }
 
 /**
- * Get unique locations from existing games
+ * Load the user's venues from the server (most played first)
+ */
+async function loadVenuesForVoice() {
+    voiceGameEntry.venues = null;
+    try {
+        const token = window.currentToken || localStorage.getItem('token');
+        const response = await fetch(`${API_URL}/api/venues?limit=100`, {
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (response.ok) {
+            voiceGameEntry.venues = (await response.json()).map(venue => venue.name);
+        }
+    } catch (error) {
+        console.error('Error loading venues for voice:', error);
+    }
+}
+
+/**
+ * Get unique locations from the server venues, or from loaded games as a fallback
  */
 function getExistingLocations() {
+    if (voiceGameEntry.venues) {
+        return voiceGameEntry.venues;
+    }
     if (!window.games || !Array.isArray(window.games)) {
         return [];
     }
@@ -680,6 +723,7 @@ function sportSupportsSingles() {
  */
 function openVoiceGameModal() {
     loadPlayersForVoice();
+    loadVenuesForVoice();
 
     // Reset state
     voiceGameEntry.currentStep = 1;
@@ -1401,9 +1445,9 @@ function processVoiceGameInput(step, transcript) {
 /**
  * Handle player search
  */
-function handlePlayerSearch(transcript, playerType, onSelect) {
+async function handlePlayerSearch(transcript, playerType, onSelect) {
     const responseEl = document.getElementById('voiceGameResponse');
-    const matches = searchPlayerByVoice(transcript);
+    const matches = await searchPlayerByVoice(transcript);
 
     if (matches.length === 1) {
         responseEl.innerHTML = getVoiceGameText('step3_found')
@@ -1579,16 +1623,20 @@ async function saveVoiceGame() {
             notes: voiceGameEntry.gameData.notes
         };
 
+        // Retries (button or network) reuse the key, so the game is stored once
+        const body = JSON.stringify(gameData);
         const response = await fetch(`${API_URL}/api/games`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
-                'Authorization': `Bearer ${token}`
+                'Authorization': `Bearer ${token}`,
+                'Idempotency-Key': idempotencyKeyFor('/api/games', body)
             },
-            body: JSON.stringify(gameData)
+            body
         });
 
         if (response.ok) {
+            clearIdempotencyKey('/api/games');
             responseEl.innerHTML = getVoiceGameText('step8_saved');
             if (typeof loadGames === 'function') loadGames();
             if (typeof loadStatistics === 'function') loadStatistics();
@@ -0,0 +1,81 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database, with emails written to
+a file, cheap bcrypt, no rate limits and no network at startup
+"""
+
+import itertools
+import json
+import os
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="rpa-tests-")
+_CERTS_FILE = os.path.join(_TMP_DIR, "google_certs.json")
+with open(_CERTS_FILE, "w", encoding="utf-8") as f:
+    json.dump({}, f)
+
+os.environ.update({
+    "EMAIL_TRANSPORT": "file",
+    "EMAIL_SINK_PATH": os.path.join(_TMP_DIR, "email_sink.jsonl"),
+    "BCRYPT_ROUNDS": "10",
+    "RATE_LIMIT_ENABLED": "false",
+    "STATIC_CACHE_ENABLED": "false",
+    "GOOGLE_CERTS_FILE": _CERTS_FILE,
+})
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api import database  # noqa: E402
+
+_emails = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client(tmp_path_factory):
+    """TestClient with startup run against a fresh database"""
+    database.DATABASE_PATH = str(tmp_path_factory.mktemp("db") / "racket_analyzer.db")
+    from api.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def register_user(client) -> dict:
+    """Register a new user and return their Authorization header"""
+    response = client.post("/api/auth/register", json={
+        "email": f"user{next(_emails)}@example.com",
+        "password": "senha-segura-123",
+        "name": "Test User",
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization header of a newly registered user"""
+    return register_user(client)
+
+
+@pytest.fixture
+def make_player(client, auth_headers):
+    """Create a table tennis player for the current user"""
+    def make(name: str) -> dict:
+        response = client.post("/api/players", json={"sport": "table_tennis", "name": name},
+                               headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return make
+
+
+def game_payload(opponent_id: int, **fields) -> dict:
+    """A valid singles game against opponent_id"""
+    return {
+        "sport": "table_tennis",
+        "game_type": "singles",
+        "opponent_id": opponent_id,
+        "game_date": "2026-03-01",
+        "result": "win",
+        "score": "3-1",
+        **fields,
+    }
@@ -0,0 +1,66 @@
+import pytest
+
+from api import auth
+from api.database import get_app_setting, get_db_connection
+
+
+@pytest.fixture(autouse=True)
+def restore_rounds():
+    """Put the bcrypt cost back after tests that change it"""
+    rounds = auth.bcrypt_rounds
+    yield
+    auth.set_bcrypt_rounds(rounds)
+
+
+def stored_hash(email: str) -> str:
+    conn = get_db_connection()
+    [value] = conn.execute("SELECT password_hash FROM users WHERE email = ?", (email,)).fetchone()
+    conn.close()
+    return value
+
+
+def test_only_lower_costs_need_rehash():
+    auth.set_bcrypt_rounds(11)
+    assert auth.password_needs_rehash("$2b$10$" + "a" * 53)
+    assert not auth.password_needs_rehash("$2b$11$" + "a" * 53)
+    assert not auth.password_needs_rehash("$2b$12$" + "a" * 53)
+    assert auth.password_needs_rehash("not-a-bcrypt-hash")
+
+
+def test_rounds_are_clamped():
+    auth.set_bcrypt_rounds(4)
+    assert auth.bcrypt_rounds == auth.BCRYPT_MIN_ROUNDS
+    auth.set_bcrypt_rounds(30)
+    assert auth.bcrypt_rounds == auth.BCRYPT_MAX_ROUNDS
+
+
+def test_stored_calibration_wins_over_timing(monkeypatch):
+    monkeypatch.setattr(auth, "BCRYPT_ROUNDS", None)
+    assert auth.calibrate_password_hashing("11") == 11
+
+
+def test_startup_stores_the_cost(client):
+    assert get_app_setting(auth.BCRYPT_ROUNDS_SETTING) == str(auth.bcrypt_rounds)
+
+
+def test_login_upgrades_a_lower_cost_hash_only(client):
+    email, password = "rehash@example.com", "senha-segura-123"
+    assert client.post("/api/auth/register", json={"email": email, "password": password}).status_code == 200
+    assert auth.get_hash_rounds(stored_hash(email)) == 10
+
+    auth.set_bcrypt_rounds(11)
+    assert client.post("/api/auth/login", json={"email": email, "password": password}).status_code == 200
+    upgraded = stored_hash(email)
+    assert auth.get_hash_rounds(upgraded) == 11
+
+    # Lowering the cost again does not downgrade the stored hash
+    auth.set_bcrypt_rounds(10)
+    assert client.post("/api/auth/login", json={"email": email, "password": password}).status_code == 200
+    assert stored_hash(email) == upgraded
+
+
+def test_wrong_password_is_rejected(client):
+    email = "wrong-password@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": "senha-segura-123"})
+    response = client.post("/api/auth/login", json={"email": email, "password": "outra-senha-123"})
+    assert response.status_code == 401
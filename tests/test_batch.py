@@ -0,0 +1,89 @@
+import pytest
+
+from api.batch import BatchError, apply_batch
+from api.models import BatchOperation
+from tests.conftest import game_payload, register_user
+
+
+@pytest.fixture
+def other_headers(client):
+    return register_user(client)
+
+
+def create_game(client, headers, opponent_id, **fields):
+    response = client.post("/api/games", json=game_payload(opponent_id, **fields), headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def list_games(client, headers):
+    return {game["id"]: game for game in client.get("/api/games", headers=headers).json()}
+
+
+def test_batch_applies_every_operation(client, auth_headers, make_player):
+    opponent = make_player("Ivo Prado")
+    game = create_game(client, auth_headers, opponent["id"])
+    response = client.post("/api/batch", json={"operations": [
+        {"action": "update", "entity": "game", "id": game["id"], "data": {"result": "loss"}},
+        {"action": "create", "entity": "game", "data": game_payload(opponent["id"], game_date="2026-03-02")},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [r["action"] for r in results] == ["update", "create"]
+    games = list_games(client, auth_headers)
+    assert games[game["id"]]["result"] == "loss"
+    assert len(games) == 2
+
+
+def test_foreign_game_rolls_back_the_whole_batch(client, auth_headers, other_headers, make_player):
+    opponent = make_player("João Cruz")
+    mine = create_game(client, auth_headers, opponent["id"])
+    their_opponent = client.post("/api/players", json={"sport": "table_tennis", "name": "Rival"},
+                                 headers=other_headers).json()
+    theirs = create_game(client, other_headers, their_opponent["id"])
+
+    response = client.post("/api/batch", json={"operations": [
+        {"action": "create", "entity": "player", "data": {"sport": "table_tennis", "name": "Novo"}},
+        {"action": "update", "entity": "game", "id": mine["id"], "data": {"result": "loss"}},
+        {"action": "delete", "entity": "game", "id": theirs["id"]},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 404
+    assert response.json()["detail"].startswith("Operação 2:")
+    assert list_games(client, auth_headers)[mine["id"]]["result"] == "win"
+    assert theirs["id"] in list_games(client, other_headers)
+    names = [p["name"] for p in client.get("/api/players", headers=auth_headers).json()]
+    assert "Novo" not in names
+
+
+def test_foreign_player_reference_rolls_back(client, auth_headers, other_headers, make_player):
+    opponent = make_player("Lia Rocha")
+    their_player = client.post("/api/players", json={"sport": "table_tennis", "name": "Alheio"},
+                               headers=other_headers).json()
+
+    user_id = client.get("/api/auth/me", headers=auth_headers).json()["id"]
+    with pytest.raises(BatchError) as error:
+        apply_batch(user_id, [
+            BatchOperation(action="create", entity="game", data=game_payload(opponent["id"])),
+            BatchOperation(action="create", entity="game", data=game_payload(their_player["id"])),
+        ])
+    assert error.value.index == 1
+    assert error.value.status_code == 404
+    assert list_games(client, auth_headers) == {}
+
+
+def test_failure_after_writes_rolls_back(client, auth_headers, make_player):
+    opponent = make_player("Marta Luz")
+    game = create_game(client, auth_headers, opponent["id"])
+    response = client.post("/api/batch", json={"operations": [
+        {"action": "delete", "entity": "game", "id": game["id"]},
+        {"action": "create", "entity": "player", "data": {"sport": "table_tennis", "name": "Nuno"}},
+        {"action": "create", "entity": "player", "data": {"sport": "table_tennis", "name": "nuno"}},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Operação 2:")
+    assert game["id"] in list_games(client, auth_headers)
+    names = [p["name"] for p in client.get("/api/players", headers=auth_headers).json()]
+    assert names == ["Marta Luz"]
@@ -0,0 +1,65 @@
+import time
+from datetime import datetime, timedelta
+
+from api.database import get_db_connection
+from api.email_outbox import EMAIL_MAX_ATTEMPTS, _record_results, purge_outbox
+
+
+def outbox_rows(where: str, params=()) -> list:
+    conn = get_db_connection()
+    rows = [dict(row) for row in conn.execute(f"SELECT * FROM email_outbox WHERE {where}", params)]
+    conn.close()
+    return rows
+
+
+def insert_row(status: str, created_at: datetime, sent_at=None, attempts: int = 0) -> int:
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO email_outbox (kind, to_email, payload, status, attempts, next_attempt_at, created_at, sent_at)
+        VALUES ('welcome', 'old@example.com', '{"user_name": "x"}', ?, ?, ?, ?, ?)
+    """, (status, attempts, created_at, created_at, sent_at))
+    conn.commit()
+    row_id = cursor.lastrowid
+    conn.close()
+    return row_id
+
+
+def test_delivered_verification_email_drops_its_code(client):
+    response = client.post("/api/auth/register", json={
+        "email": "outbox@example.com", "password": "senha-segura-123", "name": "Outbox",
+    })
+    assert response.status_code == 200
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        [row] = outbox_rows("to_email = ?", ("outbox@example.com",))
+        if row["status"] == "sent":
+            break
+        time.sleep(0.05)
+    assert row["status"] == "sent"
+    assert row["payload"] == ""
+
+
+def test_dead_lettered_email_drops_its_payload(client):
+    row_id = insert_row("sending", datetime.utcnow(), attempts=EMAIL_MAX_ATTEMPTS)
+    _record_results([({"id": row_id, "kind": "welcome", "to_email": "old@example.com",
+                      "attempts": EMAIL_MAX_ATTEMPTS}, "smtp down")])
+
+    [row] = outbox_rows("id = ?", (row_id,))
+    assert (row["status"], row["payload"], row["last_error"]) == ("failed", "", "smtp down")
+
+
+def test_purge_keeps_recent_and_pending_rows(client):
+    now = datetime.utcnow()
+    long_ago = now - timedelta(days=30)
+    old_sent = insert_row("sent", long_ago, sent_at=long_ago)
+    old_failed = insert_row("failed", long_ago)
+    old_pending = insert_row("pending", long_ago)
+    recent_sent = insert_row("sent", now, sent_at=now)
+    recent_failed = insert_row("failed", now)
+
+    assert purge_outbox() >= 2
+    remaining = {row["id"] for row in outbox_rows("to_email = 'old@example.com'")}
+    assert old_sent not in remaining and old_failed not in remaining
+    assert {old_pending, recent_sent, recent_failed} <= remaining
@@ -0,0 +1,43 @@
+from api.main import build_fts_query
+from tests.conftest import game_payload, register_user
+
+
+def test_fts_query_quotes_every_word():
+    assert build_fts_query('saque" OR notes:*') == '"saque" "OR" "notes"*'
+    assert build_fts_query("  --  ") == ""
+
+
+def test_snippets_are_escaped_around_the_highlight(client, auth_headers, make_player):
+    opponent = make_player("Fábio Reis")
+    game = game_payload(opponent["id"], notes='<img src=x onerror="alert(1)"> backhand falhou',
+                        location="Clube <b>Pinheiros</b>")
+    assert client.post("/api/games", json=game, headers=auth_headers).status_code == 200
+
+    response = client.get("/api/games/search", params={"q": "backh"}, headers=auth_headers)
+    assert response.status_code == 200
+    [result] = response.json()
+    assert result["notes_snippet"] == (
+        '&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>backhand</mark> falhou'
+    )
+
+    [result] = client.get("/api/games/search", params={"q": "pinheiros"}, headers=auth_headers).json()
+    assert result["location_snippet"] == "Clube &lt;b&gt;<mark>Pinheiros</mark>&lt;/b&gt;"
+
+
+def test_search_syntax_in_query_is_literal(client, auth_headers, make_player):
+    opponent = make_player("Gil Moura")
+    game = game_payload(opponent["id"], notes="bom saque")
+    assert client.post("/api/games", json=game, headers=auth_headers).status_code == 200
+
+    for q in ['saque"', "saque OR", "NEAR(saque", "notes:saque", "*"]:
+        response = client.get("/api/games/search", params={"q": q}, headers=auth_headers)
+        assert response.status_code == 200, q
+
+
+def test_search_only_returns_own_games(client, auth_headers, make_player):
+    opponent = make_player("Hugo Neves")
+    game = game_payload(opponent["id"], notes="voleio exclusivo")
+    assert client.post("/api/games", json=game, headers=auth_headers).status_code == 200
+
+    response = client.get("/api/games/search", params={"q": "exclusivo"}, headers=register_user(client))
+    assert response.json() == []
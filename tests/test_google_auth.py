@@ -0,0 +1,66 @@
+import threading
+import time
+
+from api import google_auth
+from api.google_auth import GoogleCertVerifier
+
+
+class CountingVerifier(GoogleCertVerifier):
+    """Verifier whose fetch is slow and counted instead of hitting the network"""
+
+    def __init__(self, max_age: float = 3600):
+        super().__init__(certs_url="https://example.invalid/certs", certs_file="")
+        self.fetches = 0
+        self.max_age = max_age
+
+    def _fetch(self):
+        self.fetches += 1
+        time.sleep(0.05)
+        self._certs = {"key-1": "cert"}
+        self._expires_at = time.time() + self.max_age
+        self._fetched_at = time.time()
+        return self._certs
+
+
+def test_concurrent_cold_callers_share_one_fetch():
+    verifier = CountingVerifier()
+    threads = [threading.Thread(target=verifier.get_certs) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert verifier.fetches == 1
+
+
+def test_forced_refetch_is_rate_limited():
+    verifier = CountingVerifier()
+    verifier.get_certs()
+    for _ in range(5):
+        assert verifier.get_certs(force_refresh=True) == {"key-1": "cert"}
+    assert verifier.fetches == 1
+
+    verifier._fetched_at -= google_auth.MIN_FORCED_REFRESH_INTERVAL
+    verifier.get_certs(force_refresh=True)
+    assert verifier.fetches == 2
+
+
+def test_expired_certs_are_refetched():
+    verifier = CountingVerifier(max_age=-1)
+    verifier.get_certs()
+    verifier.get_certs()
+    assert verifier.fetches == 2
+
+
+def test_near_expiry_refreshes_in_background():
+    verifier = CountingVerifier(max_age=google_auth.REFRESH_MARGIN - 1)
+    verifier.get_certs()
+    assert verifier.get_certs() == {"key-1": "cert"}  # served from cache while refreshing
+    deadline = time.monotonic() + 2
+    while verifier.fetches < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert verifier.fetches == 2
+
+
+def test_invalid_token_is_rejected(client):
+    response = client.post("/api/auth/google", json={"token": "not-a-jwt"})
+    assert response.status_code == 401
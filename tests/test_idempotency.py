@@ -0,0 +1,54 @@
+from tests.conftest import game_payload, register_user
+
+
+def test_player_retry_replays_first_response(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "player-1"}
+    body = {"sport": "table_tennis", "name": "Ana Souza"}
+    first = client.post("/api/players", json=body, headers=headers)
+    retry = client.post("/api/players", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert retry.json() == first.json()
+    players = client.get("/api/players", headers=auth_headers).json()
+    assert [p["name"] for p in players] == ["Ana Souza"]
+
+
+def test_game_retry_replays_without_second_insert(client, auth_headers, make_player):
+    opponent = make_player("Bruno Lima")
+    headers = {**auth_headers, "Idempotency-Key": "game-1"}
+    first = client.post("/api/games", json=game_payload(opponent["id"]), headers=headers)
+    retry = client.post("/api/games", json=game_payload(opponent["id"]), headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert retry.json()["id"] == first.json()["id"]
+    assert len(client.get("/api/games", headers=auth_headers).json()) == 1
+
+
+def test_key_reused_with_other_body_conflicts(client, auth_headers, make_player):
+    opponent = make_player("Carla Dias")
+    headers = {**auth_headers, "Idempotency-Key": "game-2"}
+    assert client.post("/api/games", json=game_payload(opponent["id"]), headers=headers).status_code == 200
+
+    response = client.post("/api/games", json=game_payload(opponent["id"], result="loss"), headers=headers)
+    assert response.status_code == 409
+    assert len(client.get("/api/games", headers=auth_headers).json()) == 1
+
+
+def test_keys_are_scoped_per_user(client, auth_headers):
+    body = {"sport": "table_tennis", "name": "Diego Alves"}
+    mine = client.post("/api/players", json=body, headers={**auth_headers, "Idempotency-Key": "shared"})
+    theirs = client.post("/api/players", json=body,
+                         headers={**register_user(client), "Idempotency-Key": "shared"})
+
+    assert theirs.status_code == 200
+    assert "Idempotent-Replayed" not in theirs.headers
+    assert theirs.json()["id"] != mine.json()["id"]
+
+
+def test_invalid_key_is_rejected(client, auth_headers):
+    response = client.post("/api/players", json={"sport": "table_tennis", "name": "Eva"},
+                           headers={**auth_headers, "Idempotency-Key": "x" * 256})
+    assert response.status_code == 400
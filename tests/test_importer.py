@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from api.importer import ImportFileError, parse_import, validate_scalars
+
+
+@pytest.mark.parametrize("row", [
+    {},
+    {"sport": "tennis", "score": 3, "ratio": 0.5, "won": True, "notes": None},
+])
+def test_validate_scalars_accepts_single_values(row):
+    assert validate_scalars(row) is None
+
+
+@pytest.mark.parametrize("value", [["a", "b"], {"name": "x"}, ()])
+def test_validate_scalars_rejects_lists_and_objects(value):
+    assert validate_scalars({"sport": "tennis", "opponent": value}) == (
+        "Valor inválido para opponent: esperado texto ou número"
+    )
+
+
+def test_parse_import_maps_aliases_and_blanks():
+    data = "sport,opponent_name,notes\ntable_tennis, Ana ,  \n".encode("utf-8-sig")
+    players, games = parse_import(data, "csv")
+    assert players == []
+    assert games == [{"sport": "table_tennis", "opponent": "Ana", "notes": None}]
+
+
+@pytest.mark.parametrize("data, fmt", [
+    (b"{not json", "json"),
+    (b'{"games": {"a": 1}}', "json"),
+    (b"\xff\xfe", "csv"),
+    (b"[]", "xml"),
+])
+def test_parse_import_rejects_bad_files(data, fmt):
+    with pytest.raises(ImportFileError):
+        parse_import(data, fmt)
+
+
+def test_import_reports_non_scalar_rows_and_keeps_the_rest(client, auth_headers):
+    good = {"sport": "table_tennis", "game_date": "2026-03-01", "result": "win", "opponent": "Ana"}
+    bad = {**good, "opponent": ["Ana", "Bia"]}
+    response = client.post("/api/import?format=json", content=json.dumps([good, bad]), headers=auth_headers)
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["games_imported"] == 1
+    assert report["rejected"] == [{"row": 2, "error": "Valor inválido para opponent: esperado texto ou número"}]
+
+
+def test_import_rejects_oversized_body(client, auth_headers):
+    response = client.post("/api/import?format=csv", content=b"x" * (11 * 1024 * 1024), headers=auth_headers)
+    assert response.status_code == 413
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from api.match_simulator import set_format, shrunk_rate, simulate_match, simulate_sets
+from tests.conftest import game_payload
+
+
+def test_even_points_give_even_match():
+    result = simulate_match(0.5, 5, 11, None)
+    assert result["win_probability"] == pytest.approx(0.5, abs=0.02)
+    assert sum(d["probability"] for d in result["score_distribution"]) == pytest.approx(1, abs=1e-3)
+
+
+def test_stronger_player_wins_more_and_is_deterministic():
+    strong = simulate_match(0.6, 5, 11, None)
+    assert strong["win_probability"] > 0.9
+    assert simulate_match(0.6, 5, 11, None) == strong
+
+
+def test_best_of_one_scores():
+    result = simulate_match(0.55, 1, 11, None)
+    assert {d["score"] for d in result["score_distribution"]} == {"1-0", "0-1"}
+
+
+def test_sets_end_by_two_points_or_at_the_cap():
+    won, points_won, points_lost = simulate_sets(0.5, 5000, 21, 30, np.random.default_rng(1))
+    winner, loser = np.where(won, points_won, points_lost), np.where(won, points_lost, points_won)
+    assert ((winner == 30) | ((winner >= 21) & (winner - loser >= 2))).all()
+    assert (winner <= 30).all()
+
+
+def test_tennis_sets_race_to_games():
+    assert set_format("tennis") == {"unit": "game", "target": 6, "cap": 7}
+
+
+def test_shrunk_rate_without_data_is_the_prior():
+    assert shrunk_rate(0, 0, 0.4, 60) == pytest.approx(0.4)
+    assert shrunk_rate(100, 0, 0.5, 60) == pytest.approx(130 / 160)
+
+
+def test_predict_endpoint(client, auth_headers, make_player):
+    opponent = make_player("Otávio Reis")
+    game = game_payload(opponent["id"], detailed_score="11-5,11-7,8-11,11-9")
+    assert client.post("/api/games", json=game, headers=auth_headers).status_code == 200
+
+    response = client.get("/api/analytics/predict", params={"opponent_id": opponent["id"], "best_of": 5},
+                          headers=auth_headers)
+    assert response.status_code == 200, response.text
+    prediction = response.json()
+    assert prediction["opponent_name"] == "Otávio Reis"
+    assert prediction["observed"]["points_won"] > prediction["observed"]["points_lost"]
+    assert 0.5 < prediction["win_probability"] < 1
+
+    bad = client.get("/api/analytics/predict", params={"opponent_id": opponent["id"], "best_of": 4},
+                     headers=auth_headers)
+    assert bad.status_code == 400
@@ -0,0 +1,56 @@
+import sqlite3
+
+import pytest
+
+from api.player_search import PREFIX_RANGE_END, classify_match, similarity
+
+
+def test_similarity_bounds():
+    assert similarity("joao", "joao") == 1.0
+    assert similarity("joao", "") == 0.0
+
+
+@pytest.mark.parametrize("name", ["joao~", "joaoz", "joaoø", "joao田中", "joao\U0001f3d3"])
+def test_prefix_range_end_sorts_after_any_continuation(name):
+    conn = sqlite3.connect(":memory:")
+    [(inside,)] = conn.execute("SELECT ? >= ? AND ? < ?", (name, "joao", name, "joao" + PREFIX_RANGE_END))
+    conn.close()
+    assert inside
+
+
+@pytest.mark.parametrize("query, name, expected", [
+    ("ana", "ana", "exact"),
+    ("sil", "jose silva", "word_prefix"),
+    ("ilv", "jose silva", "contains"),
+    ("jozé", "jose", None),  # not normalized: too different
+    ("silvia", "jose silva", "fuzzy"),
+])
+def test_classify_match(query, name, expected):
+    match = classify_match(query, name)
+    assert (match[0] if match else None) == expected
+
+
+@pytest.fixture
+def players(make_player):
+    for name in ["José Silva", "Joana Prado", "田中太郎", "Ølaf Berg"]:
+        make_player(name)
+
+
+def search(client, headers, q):
+    response = client.get("/api/players/search", params={"q": q}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [(p["name"], p["match"]) for p in response.json()]
+
+
+def test_search_is_case_and_accent_insensitive(client, auth_headers, players):
+    assert search(client, auth_headers, "JOSE SILVA")[0] == ("José Silva", "exact")
+    assert search(client, auth_headers, "jo")[:2] == [("Joana Prado", "word_prefix"), ("José Silva", "word_prefix")]
+
+
+@pytest.mark.parametrize("q, name", [("田中", "田中太郎"), ("田中太", "田中太郎"), ("øla", "Ølaf Berg")])
+def test_prefix_matches_beyond_ascii(client, auth_headers, players, q, name):
+    assert (name, "word_prefix") in search(client, auth_headers, q)
+
+
+def test_fuzzy_match_for_misheard_names(client, auth_headers, players):
+    assert ("José Silva", "fuzzy") in search(client, auth_headers, "silvia")
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from api import rate_limiter
+from api.rate_limiter import TokenBucketLimiter, check_rate_limit, record_failed_attempt
+
+
+def make_request(ip: str):
+    return SimpleNamespace(headers={}, client=SimpleNamespace(host=ip))
+
+
+@pytest.fixture
+def limiters(monkeypatch):
+    """Fresh buckets with rate limiting on"""
+    monkeypatch.setattr(rate_limiter, "RATE_LIMIT_ENABLED", True)
+    fresh = {
+        (action, scope): TokenBucketLimiter(capacity, period)
+        for action, scopes in rate_limiter.AUTH_LIMITS.items()
+        for scope, (capacity, period) in scopes.items()
+    }
+    monkeypatch.setattr(rate_limiter, "_limiters", fresh)
+    return fresh
+
+
+def test_bucket_denies_when_empty_and_refills():
+    limiter = TokenBucketLimiter(capacity=2, period=10)
+    assert limiter.consume("k", now=0) == 0
+    assert limiter.consume("k", now=0) == 0
+    assert limiter.consume("k", now=0) == pytest.approx(5)
+    assert limiter.consume("k", now=5) == 0
+
+
+def test_retry_after_does_not_take_a_token():
+    limiter = TokenBucketLimiter(capacity=1, period=10)
+    assert limiter.retry_after("k", now=0) == 0
+    assert limiter.retry_after("k", now=0) == 0
+    assert limiter.consume("k", now=0) == 0
+    assert limiter.retry_after("k", now=0) == pytest.approx(10)
+
+
+def test_lru_evicts_oldest_key_over_budget():
+    limiter = TokenBucketLimiter(capacity=1, period=100, max_keys=2)
+    limiter.consume("a", now=0)
+    limiter.consume("b", now=1)
+    limiter.consume("a", now=2)  # "a" is now the most recently used
+    limiter.consume("c", now=3)
+    assert len(limiter) == 2
+    assert list(limiter._buckets) == ["a", "c"]
+
+
+def test_idle_buckets_are_swept():
+    limiter = TokenBucketLimiter(capacity=1, period=10)
+    limiter.consume("a", now=0)
+    limiter.consume("b", now=20)
+    assert list(limiter._buckets) == ["b"]
+
+
+def test_denied_attempt_charges_no_bucket(limiters):
+    capacity, _ = rate_limiter.AUTH_LIMITS["forgot-password"]["email"]
+    for i in range(capacity):
+        check_rate_limit(make_request(f"10.0.0.{i}"), "forgot-password", "a@example.com")
+
+    ip_bucket = limiters[("forgot-password", "ip")]
+    with pytest.raises(HTTPException) as error:
+        check_rate_limit(make_request("10.0.1.1"), "forgot-password", "A@example.com")
+    assert error.value.status_code == 429
+    assert int(error.value.headers["Retry-After"]) > 0
+    # The IP bucket was checked but not charged
+    assert ip_bucket.retry_after("10.0.1.1") == 0
+    assert "10.0.1.1" not in ip_bucket._buckets
+
+
+def test_login_email_bucket_only_counts_failed_passwords(limiters):
+    capacity, _ = rate_limiter.AUTH_LIMITS["login"]["email"]
+    for i in range(capacity * 2):
+        check_rate_limit(make_request(f"10.0.0.{i}"), "login", "a@example.com")
+    assert len(limiters[("login", "email")]) == 0
+
+    for _ in range(capacity):
+        record_failed_attempt("login", "a@example.com")
+    with pytest.raises(HTTPException):
+        check_rate_limit(make_request("10.0.2.1"), "login", "a@example.com")
+    # Another account is unaffected
+    check_rate_limit(make_request("10.0.2.1"), "login", "b@example.com")
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from api.timeseries import grouped_ema
+
+
+def ema_loop(values, group_starts, alpha):
+    """The plain recurrence: restart at each group start, then alpha * v + (1 - alpha) * previous"""
+    starts = set(group_starts.tolist())
+    result = []
+    for i, value in enumerate(values):
+        result.append(value if i in starts else alpha * value + (1 - alpha) * result[-1])
+    return np.array(result)
+
+
+def group_starts_of(sizes):
+    return np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(int)
+
+
+@pytest.mark.parametrize("alpha", [0.05, 0.2, 0.5, 0.9, 0.999])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_recurrence_on_wins(alpha, seed):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 40, size=8)
+    values = rng.integers(0, 2, size=sizes.sum()).astype(float)
+    starts = group_starts_of(sizes)
+    np.testing.assert_allclose(grouped_ema(values, starts, alpha), ema_loop(values, starts, alpha),
+                               rtol=1e-9, atol=1e-12)
+
+
+def test_matches_recurrence_on_non_negative_values():
+    rng = np.random.default_rng(42)
+    values = rng.random(300) * 10
+    starts = group_starts_of([1, 120, 7, 172])
+    np.testing.assert_allclose(grouped_ema(values, starts, 0.3), ema_loop(values, starts, 0.3), rtol=1e-9)
+
+
+def test_leading_zeros_and_all_zero_groups():
+    values = np.array([0, 0, 1, 0, 0, 0, 0, 1], dtype=float)
+    starts = np.array([0, 4])
+    np.testing.assert_allclose(grouped_ema(values, starts, 0.5), ema_loop(values, starts, 0.5), atol=1e-12)
+
+
+def test_long_group_does_not_overflow():
+    values = np.tile([1.0, 0.0, 1.0], 5000)
+    starts = np.array([0])
+    result = grouped_ema(values, starts, 0.5)
+    assert np.isfinite(result).all()
+    np.testing.assert_allclose(result, ema_loop(values, starts, 0.5), rtol=1e-9)
+
+
+def test_alpha_one_is_the_values():
+    values = np.array([1.0, 0.0, 1.0])
+    np.testing.assert_array_equal(grouped_ema(values, np.array([0]), 1.0), values)